@@ -0,0 +1,198 @@
+import random
+import numpy as np
+from rules import REGRET_CALL, REGRET_FOLD, REGRET_RAISE, PlayerAction, append_action, append_card
+
+NUM_PLAYER_ACTIONS = len(PlayerAction)
+# Column of each PlayerAction in action probability arrays, ordered by value
+ACTION_COLUMNS: dict[PlayerAction, int] = {action: action.value - 1 for action in PlayerAction}
+# Regret table column behind each PlayerAction column; check and call share one
+_STORE_COLUMNS = [REGRET_FOLD, REGRET_CALL, REGRET_CALL, REGRET_RAISE]
+
+
+class DecisionState:
+    """What a player sees when it is their turn to act."""
+    __slots__ = ('player_ID', 'hand', 'board', 'legal_actions', 'to_call', 'raise_amount', 'pot', 'stack',
+                 'history')
+
+    def __init__(self, player_ID: int, hand: tuple, board: tuple, legal_actions: list, to_call: int,
+                 raise_amount: int, pot: int, stack: int, history: tuple) -> None:
+        self.player_ID: int = player_ID
+        self.hand: tuple[int, ...] = hand  # Card ids
+        self.board: tuple[int, ...] = board  # Card ids
+        self.legal_actions: list[PlayerAction] = legal_actions
+        self.to_call: int = to_call
+        self.raise_amount: int = raise_amount
+        self.pot: int = pot
+        self.stack: int = stack
+        self.history: tuple[tuple[PlayerAction, ...], ...] = history  # Actions so far, one tuple per betting round
+
+    @property
+    def round(self) -> int:
+        return len(self.history) - 1
+
+
+def public_history(history, board) -> int:
+    """Return the RhodeIslandMCCFR public history code of a betting history and board."""
+    public = 1
+    for round, actions in enumerate(history):
+        if round > 0:
+            public = append_card(public, board[round - 1])
+        for action in actions:
+            public = append_action(public, REGRET_RAISE if action == PlayerAction.RAISE else REGRET_CALL)
+    return public
+
+
+class StateBatch:
+    """A batch of decision states as NumPy arrays, one row per state.
+
+    Card columns are padded with -1 and ``legal`` is a (N, 4) mask over the
+    PlayerAction columns.
+    """
+
+    def __init__(self, player, hand, board, round, to_call, raise_amount, pot, stack, legal, public) -> None:
+        self.player: np.ndarray = player
+        self.hand: np.ndarray = hand
+        self.board: np.ndarray = board
+        self.round: np.ndarray = round
+        self.to_call: np.ndarray = to_call
+        self.raise_amount: np.ndarray = raise_amount
+        self.pot: np.ndarray = pot
+        self.stack: np.ndarray = stack
+        self.legal: np.ndarray = legal
+        self.public: np.ndarray = public
+
+    def __len__(self) -> int:
+        return len(self.player)
+
+    @classmethod
+    def from_states(cls, states: list[DecisionState]) -> 'StateBatch':
+        """Stack a list of decision states into arrays."""
+        n = len(states)
+        hand_width = max((len(state.hand) for state in states), default=0)
+        board_width = max((len(state.board) for state in states), default=0)
+        hand = np.full((n, hand_width), -1, dtype=np.int8)
+        board = np.full((n, board_width), -1, dtype=np.int8)
+        legal = np.zeros((n, NUM_PLAYER_ACTIONS), dtype=bool)
+        for i, state in enumerate(states):
+            hand[i, :len(state.hand)] = state.hand
+            board[i, :len(state.board)] = state.board
+            legal[i, [ACTION_COLUMNS[action] for action in state.legal_actions]] = True
+
+        def column(name, dtype=np.int32) -> np.ndarray:
+            return np.fromiter((getattr(state, name) for state in states), dtype=dtype, count=n)
+
+        return cls(
+            player=column('player_ID'),
+            hand=hand,
+            board=board,
+            round=column('round', np.int8),
+            to_call=column('to_call'),
+            raise_amount=column('raise_amount'),
+            pot=column('pot'),
+            stack=column('stack'),
+            legal=legal,
+            public=np.fromiter((public_history(state.history, state.board) for state in states),
+                               dtype=np.int64, count=n),
+        )
+
+
+def sample_actions(probs: np.ndarray, legal: np.ndarray, rng: np.random.Generator, greedy: bool = False) -> np.ndarray:
+    """Draw one action column per row from weights over the PlayerAction columns.
+
+    Illegal columns are dropped and rows left without weight play their
+    legal actions uniformly.
+    """
+    weights = np.where(legal, probs, 0.0)
+    totals = weights.sum(axis=1, keepdims=True)
+    weights = np.where(totals > 0, weights, legal.astype(weights.dtype))
+    if greedy:
+        return weights.argmax(axis=1)
+    cumulative = np.cumsum(weights, axis=1)
+    draws = rng.random((len(weights), 1)) * cumulative[:, -1:]
+    # The first legal column whose cumulative weight passes the draw
+    return np.minimum((cumulative <= draws).sum(axis=1), NUM_PLAYER_ACTIONS - 1)
+
+
+def to_actions(columns: np.ndarray) -> list[PlayerAction]:
+    """Return the PlayerActions of an array of action columns."""
+    return [PlayerAction(column + 1) for column in columns.tolist()]
+
+
+class Agent:
+    """Chooses actions for a batch of decision states."""
+
+    def act(self, states: list[DecisionState]) -> list[PlayerAction]:
+        """Return one legal action per state."""
+        raise NotImplementedError
+
+
+class RandomAgent(Agent):
+    """Pick a legal action uniformly at random."""
+
+    def __init__(self, rng=None) -> None:
+        # Anything with a choice method, defaults to the global random module
+        self.rng = rng if rng is not None else random
+
+    def act(self, states: list[DecisionState]) -> list[PlayerAction]:
+        return [self.rng.choice(state.legal_actions) for state in states]
+
+
+class TabularAgent(Agent):
+    """Play a fixed strategy looked up per information set.
+
+    ``index`` maps RhodeIslandMCCFR infoset keys to rows of ``weights``, which
+    holds unnormalized action weights over the regret table columns (fold,
+    check/call, raise). Information sets missing from the table play
+    uniformly.
+    """
+
+    def __init__(self, index: dict[int, int], weights: np.ndarray, seed: int = None, greedy: bool = False) -> None:
+        self.index: dict[int, int] = index
+        # One zero row at the end for information sets that are not in the table
+        self.weights: np.ndarray = np.concatenate([np.asarray(weights, dtype=np.float64)[:, _STORE_COLUMNS],
+                                                   np.zeros((1, NUM_PLAYER_ACTIONS))])
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+        self.greedy: bool = greedy
+
+    @classmethod
+    def from_store(cls, store, seed: int = None, greedy: bool = False) -> 'TabularAgent':
+        """Play the average strategy of a RegretStore."""
+        return cls(dict(store.index), store.strategy_sum[:len(store)], seed=seed, greedy=greedy)
+
+    @classmethod
+    def load(cls, path, seed: int = None, greedy: bool = False) -> 'TabularAgent':
+        """Play the average strategy of a RhodeIslandMCCFR checkpoint."""
+        from solvers.mccfr import RegretStore
+        store, _ = RegretStore.load(path)
+        return cls.from_store(store, seed=seed, greedy=greedy)
+
+    def act(self, states) -> list[PlayerAction]:
+        return to_actions(self.act_batch(states if isinstance(states, StateBatch) else StateBatch.from_states(states)))
+
+    def act_batch(self, batch: StateBatch) -> np.ndarray:
+        """Return the chosen action column of every row of a batch."""
+        missing = len(self.weights) - 1
+        # Infoset keys are (public << 6) | hole, see solvers.mccfr.infoset_key
+        keys = (batch.public << 6) | batch.hand[:, 0].astype(np.int64)
+        rows = np.fromiter((self.index.get(key, missing) for key in keys.tolist()), dtype=np.int64, count=len(keys))
+        return sample_actions(self.weights[rows], batch.legal, self.rng, self.greedy)
+
+
+class VectorizedPolicyAgent(Agent):
+    """Play a policy function evaluated on a whole batch of states at once.
+
+    ``policy`` takes a StateBatch and returns (N, 4) action weights over the
+    PlayerAction columns, e.g. a NumPy model of hand strength and pot odds.
+    """
+
+    def __init__(self, policy, seed: int = None, greedy: bool = False) -> None:
+        self.policy = policy
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+        self.greedy: bool = greedy
+
+    def act(self, states) -> list[PlayerAction]:
+        return to_actions(self.act_batch(states if isinstance(states, StateBatch) else StateBatch.from_states(states)))
+
+    def act_batch(self, batch: StateBatch) -> np.ndarray:
+        """Return the chosen action column of every row of a batch."""
+        return sample_actions(np.asarray(self.policy(batch), dtype=np.float64), batch.legal, self.rng, self.greedy)
@@ -0,0 +1,87 @@
+import argparse
+import time
+import numpy as np
+from cardecky import Rank
+from columnar import scan
+from rules import ROUND_LIMITS, STREETS
+
+
+def win_rate_by_rank(directory) -> dict[int, dict]:
+    """Return, per hole-card rank, how many hands were dealt it, the share won and the average stack delta.
+
+    A hand counts as won when the seat ended it with more chips, so split
+    pots count for everyone who gained.
+    """
+    dealt = np.zeros(15, dtype=np.int64)
+    won = np.zeros(15, dtype=np.int64)
+    deltas = np.zeros(15, dtype=np.int64)
+    for chunk in scan(directory, ("hole", "stack_deltas")):
+        ranks = (chunk["hole"].astype(np.int32) >> 2) + 2
+        seated = chunk["hole"] >= 0
+        ranks, stack_deltas = ranks[seated], chunk["stack_deltas"][seated].astype(np.int64)
+        dealt += np.bincount(ranks, minlength=15)
+        won += np.bincount(ranks, weights=stack_deltas > 0, minlength=15).astype(np.int64)
+        deltas += np.bincount(ranks, weights=stack_deltas, minlength=15).astype(np.int64)
+    return {rank.value: {"hands": int(dealt[rank.value]),
+                         "win_rate": won[rank.value] / dealt[rank.value] if dealt[rank.value] else 0.0,
+                         "average_delta": deltas[rank.value] / dealt[rank.value] if dealt[rank.value] else 0.0}
+            for rank in Rank}
+
+
+def showdown_frequency(directory) -> float:
+    """Return the share of hands that went to a showdown."""
+    hands = showdowns = 0
+    for chunk in scan(directory, ("showdown",)):
+        hands += len(chunk["showdown"])
+        showdowns += int(chunk["showdown"].sum())
+    return showdowns / hands if hands else 0.0
+
+
+def pot_distributions(directory) -> list[np.ndarray]:
+    """Return, per betting round, the count of hands by pot size at the end of the round.
+
+    Entry ``[round][pot]`` counts the hands that reached the round and
+    ended it with that pot.
+    """
+    counts = [np.zeros(0, dtype=np.int64) for _ in ROUND_LIMITS]
+    for chunk in scan(directory, ("round_pots",)):
+        for round in range(len(ROUND_LIMITS)):
+            pots = chunk["round_pots"][:, round]
+            chunk_counts = np.bincount(pots[pots >= 0])
+            if len(chunk_counts) > len(counts[round]):
+                counts[round] = np.pad(counts[round], (0, len(chunk_counts) - len(counts[round])))
+            counts[round][:len(chunk_counts)] += chunk_counts
+    return counts
+
+
+def describe(counts: np.ndarray) -> dict:
+    """Return the count, mean and quartiles of a pot-size distribution."""
+    total = int(counts.sum())
+    if not total:
+        return {"hands": 0, "mean": 0.0, "p25": 0, "median": 0, "p75": 0}
+    cumulative = np.cumsum(counts)
+    quantile = lambda q: int(np.searchsorted(cumulative, q * total))
+    return {"hands": total, "mean": float(np.arange(len(counts)) @ counts / total),
+            "p25": quantile(0.25), "median": quantile(0.5), "p75": quantile(0.75)}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Report statistics of a columnar hand dataset.")
+    parser.add_argument("directory", help="dataset written by run.py --export or columnar.py")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    print(f"Showdown frequency: {showdown_frequency(args.directory):.4f}")
+    print("Win rate by hole card:")
+    for rank, stats in win_rate_by_rank(args.directory).items():
+        print(f"  {Rank(rank).name:<5} hands {stats['hands']:>10,}  win rate {stats['win_rate']:.4f}  "
+              f"average delta {stats['average_delta']:+.3f}")
+    print("Pot size at the end of each round:")
+    for street, counts in zip(STREETS, pot_distributions(args.directory)):
+        stats = describe(counts)
+        print(f"  {street:<8} hands {stats['hands']:>10,}  mean {stats['mean']:.2f}  "
+              f"quartiles {stats['p25']}/{stats['median']}/{stats['p75']}")
+    print(f"Query time: {time.perf_counter() - start_time:.3f} seconds")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from betting import LEGAL_ACTIONS, BettingRound
+from cardecky import CARDS, Deck, HandRanker, PartialDeck
+from evaluator import HoldemHandRanker, LookupHandRanker
+from events import NullSink
+from game import Dealer, Game, Player, Pot
+from handstate import HandState
+from rules import MAX_RAISES, PRE_FLOP_LIMIT, START_STACK
+from seeding import shuffle_batch
+from run import play_round, rebuy
+
+SIZES = (1_000, 10_000)
+REPEAT = 5
+# Alternating runs of this tree and a reference tree per benchmark
+ROUNDS = 5
+# A benchmark is flagged when its median speed ratio to the reference is this much below 1
+TOLERANCE = 0.20
+# Results saved on this machine, not committed since throughput only compares on the same host and session
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "benchmarks", "baseline.json")
+
+
+def _players(num_players: int) -> list[Player]:
+    return [Player(player_ID=i, stack=START_STACK, hand=[], status=True, chips_in_play=0) for i in range(num_players)]
+
+
+def _random_hands(rng: random.Random, size: int, num_cards: int) -> list[list]:
+    return [[CARDS[i] for i in rng.sample(range(len(CARDS)), num_cards)] for _ in range(size)]
+
+
+def bench_rank_hand(size: int, seed: int):
+    """HandRanker.rank_hand on random 3-card hands."""
+    hands = _random_hands(random.Random(seed), size, 3)
+    rank_hand = HandRanker.rank_hand
+    return lambda: [rank_hand(hand) for hand in hands]
+
+
+def bench_rank_hand_lookup(size: int, seed: int):
+    """LookupHandRanker.rank_hand on random 3-card hands."""
+    hands = _random_hands(random.Random(seed), size, 3)
+    LookupHandRanker.table()
+    rank_hand = LookupHandRanker.rank_hand
+    return lambda: [rank_hand(hand) for hand in hands]
+
+
+def bench_holdem_batch(size: int, seed: int):
+    """HoldemHandRanker.strength_batch on random 7-card hands."""
+    hands = shuffle_batch(np.random.default_rng(seed), size, 7)
+    HoldemHandRanker.strength_batch(hands[:1])
+    return lambda: HoldemHandRanker.strength_batch(hands)
+
+
+def bench_shuffle_deal(size: int, seed: int):
+    """Deck.shuffle then deal_cards for two hole cards, the flop and the turn."""
+    deck = Deck(rng=random.Random(seed))
+
+    def run():
+        for _ in range(size):
+            deck.shuffle()
+            deck.deal_cards(4)
+    return run
+
+
+def bench_shuffle_deal_partial(size: int, seed: int):
+    """PartialDeck.shuffle then deal_cards for two hole cards, the flop and the turn."""
+    deck = PartialDeck(rng=random.Random(seed))
+
+    def run():
+        for _ in range(size):
+            deck.shuffle()
+            deck.deal_cards(4)
+    return run
+
+
+def bench_betting_round(size: int, seed: int):
+    """Game.betting_round pre-flop between two random players."""
+    rng = random.Random(seed)
+    pot = Pot()
+    dealer = Dealer(pot=pot, deck=Deck(rng=rng))
+    players = _players(2)
+    game = Game(players=players, dealer=dealer, betting_limit=PRE_FLOP_LIMIT, sink=NullSink(), rng=rng)
+    hands = _random_hands(rng, 1, 2)[0]
+
+    def run():
+        for _ in range(size):
+            for player, card in zip(players, hands):
+                player.hand = [card]
+                player.status = True
+                player.stack = START_STACK
+            game.new_hand()
+            game.betting_round(button=0, start_offset=3, round_limit=PRE_FLOP_LIMIT)
+            pot.reset_pot()
+    return run
+
+
+def bench_betting_state(size: int, seed: int):
+    """BettingRound.apply through a pre-flop round between two random players, capped at MAX_RAISES."""
+    rng = random.Random(seed)
+    # The k-th legal action of each decision, for k drawn up front
+    picks = [rng.randrange(12) for _ in range(64)]
+    state = BettingRound([START_STACK, START_STACK], 0b11, 0, PRE_FLOP_LIMIT, MAX_RAISES)
+    columns = [[action.value - 1 for action in actions] for actions in LEGAL_ACTIONS]
+
+    def run():
+        for hand in range(size):
+            state.reset([START_STACK, START_STACK], 0b11, hand & 1, PRE_FLOP_LIMIT, MAX_RAISES)
+            k = hand
+            while state.to_act >= 0:
+                legal = columns[state.legal]
+                state.apply(legal[picks[k & 63] % len(legal)])
+                k += 1
+    return run
+
+
+def bench_hand_state(size: int, seed: int):
+    """HandState.apply down a random line of a two-player hand, then undo back to the start."""
+    rng = random.Random(seed)
+    picks = [rng.randrange(12) for _ in range(64)]
+    state = HandState(rng.sample(range(len(CARDS)), len(CARDS)), [START_STACK, START_STACK], max_raises=MAX_RAISES)
+    columns = [[action.value - 1 for action in actions] for actions in LEGAL_ACTIONS]
+
+    def run():
+        for hand in range(size):
+            k = hand
+            while state.to_act >= 0:
+                legal = columns[state.legal_actions()]
+                state.apply(legal[picks[k & 63] % len(legal)])
+                k += 1
+            for _ in range(k - hand):
+                state.undo()
+    return run
+
+
+def bench_determine_winner(size: int, seed: int):
+    """Dealer.determine_winner at a two-player showdown."""
+    deals = _random_hands(random.Random(seed), size, 4)
+    dealer = Dealer(pot=Pot(), deck=Deck())
+    players = _players(2)
+
+    def run():
+        for hole0, hole1, flop, turn in deals:
+            players[0].hand = [hole0]
+            players[1].hand = [hole1]
+            dealer.board = [flop, turn]
+            dealer.determine_winner(players)
+    return run
+
+
+def bench_play_round(size: int, seed: int):
+    """run.play_round end to end between two random players."""
+    rng = random.Random(seed)
+    pot = Pot()
+    dealer = Dealer(pot=pot, deck=PartialDeck(rng=rng))
+    players = _players(2)
+    dealer.move_button(players=players)
+    game = Game(players=players, dealer=dealer, betting_limit=PRE_FLOP_LIMIT, sink=NullSink(), rng=rng)
+
+    def run():
+        for _ in range(size):
+            rebuy(players)
+            play_round(players, dealer, pot, game, dealer.button)
+    return run
+
+
+BENCHMARKS = {
+    "rank_hand": bench_rank_hand,
+    "rank_hand_lookup": bench_rank_hand_lookup,
+    "holdem_batch": bench_holdem_batch,
+    "shuffle_deal": bench_shuffle_deal,
+    "shuffle_deal_partial": bench_shuffle_deal_partial,
+    "betting_round": bench_betting_round,
+    "betting_state": bench_betting_state,
+    "hand_state": bench_hand_state,
+    "determine_winner": bench_determine_winner,
+    "play_round": bench_play_round,
+}
+
+
+def measure(benchmark, size: int, repeat: int = REPEAT, seed: int = 0) -> float:
+    """Return the best hands per second of a benchmark over repeat runs of size hands, after one untimed run."""
+    benchmark(size, seed)()
+    best = float("inf")
+    for _ in range(repeat):
+        run = benchmark(size, seed)
+        start_time = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start_time)
+    return size / best if best > 0 else float("inf")
+
+
+def run_suite(names=None, sizes=SIZES, repeat: int = REPEAT, seed: int = 0, callback=None) -> dict:
+    """Run benchmarks at every size and return the results keyed by ``name/size``."""
+    results = {}
+    for name in names or BENCHMARKS:
+        for size in sizes:
+            key = f"{name}/{size}"
+            results[key] = {"hands_per_second": measure(BENCHMARKS[name], size, repeat, seed)}
+            if callback is not None:
+                callback(key, results[key])
+    return {"python": platform.python_version(), "machine": platform.machine(),
+            "processor": platform.processor(), "results": results}
+
+
+def compare(current: dict, baseline: dict, tolerance: float = TOLERANCE) -> list[dict]:
+    """Return the benchmarks of both runs with their speed ratio, flagging those slower than the tolerance."""
+    rows = []
+    for key, result in current["results"].items():
+        if key not in baseline["results"]:
+            continue
+        ratio = result["hands_per_second"] / baseline["results"][key]["hands_per_second"]
+        rows.append({"benchmark": key, "baseline": baseline["results"][key]["hands_per_second"],
+                     "current": result["hands_per_second"], "ratio": ratio, "regression": ratio < 1 - tolerance})
+    return rows
+
+
+def run_tree(directory, names, sizes=SIZES, repeat: int = REPEAT, seed: int = 0) -> dict:
+    """Run the bench.py of a source tree in a fresh process, return its results or None if it failed.
+
+    ``directory`` holds the tree's bench.py, e.g. src/poker of a git
+    worktree checked out at the commit to compare against.
+    """
+    with tempfile.TemporaryDirectory() as scratch:
+        output = os.path.join(scratch, "results.json")
+        command = [sys.executable, os.path.join(directory, "bench.py"), *names, "--sizes", *map(str, sizes),
+                   "--repeat", str(repeat), "--seed", str(seed), "--output", output,
+                   "--baseline", os.path.join(scratch, "none.json")]
+        completed = subprocess.run(command, cwd=directory, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if completed.returncode != 0 or not os.path.exists(output):
+            return None
+        return load(output)["results"]
+
+
+def compare_interleaved(reference, names=None, sizes=SIZES, repeat: int = REPEAT, rounds: int = ROUNDS,
+                        seed: int = 0, tolerance: float = TOLERANCE, callback=None) -> tuple[list[dict], list[str]]:
+    """Time each benchmark in this tree and a reference tree in alternating fresh processes.
+
+    Every round runs both trees back to back, swapping which goes first,
+    so drift in the machine's speed hits both. A benchmark's ratio is the
+    median of the rounds' speed ratios and is flagged below 1 - tolerance.
+    Returns the compared rows and the benchmarks the reference tree could
+    not run. Raises RuntimeError if a benchmark fails in this tree.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    rows, skipped = [], []
+    for name in names or BENCHMARKS:
+        runs = {here: [], reference: []}
+        for round in range(rounds):
+            for directory in ((here, reference) if round % 2 == 0 else (reference, here)):
+                results = run_tree(directory, [name], sizes, repeat, seed)
+                if results is None and directory == here:
+                    raise RuntimeError(f"benchmark {name} failed in this tree")
+                runs[directory].append(results)
+            if runs[reference][-1] is None:
+                break
+        if runs[reference][-1] is None:
+            skipped.append(name)
+            continue
+        for size in sizes:
+            key = f"{name}/{size}"
+            current = [results[key]["hands_per_second"] for results in runs[here]]
+            baseline = [results[key]["hands_per_second"] for results in runs[reference]]
+            ratio = statistics.median(c / b for c, b in zip(current, baseline))
+            rows.append({"benchmark": key, "baseline": statistics.median(baseline),
+                         "current": statistics.median(current), "ratio": ratio, "regression": ratio < 1 - tolerance})
+            if callback is not None:
+                callback(rows[-1])
+    return rows, skipped
+
+
+def save(results: dict, path) -> None:
+    """Write benchmark results as JSON."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load(path) -> dict:
+    """Read benchmark results written by save."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def _print_row(row: dict) -> None:
+    flag = "  REGRESSION" if row["regression"] else ""
+    print(f"{row['benchmark']:<28} {row['baseline']:>14,.0f} -> {row['current']:>14,.0f} ({row['ratio']:.2f}x){flag}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the engine against a reference tree or a local baseline.")
+    parser.add_argument("benchmarks", nargs="*", default=[],
+                        help=f"benchmarks to run, all by default: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="hands per timed run")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per size, the best counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write the results to this JSON file")
+    parser.add_argument("--reference", default=None,
+                        help="src/poker of another tree, e.g. a git worktree, to time in alternation with this one")
+    parser.add_argument("--rounds", type=int, default=ROUNDS, help="alternating runs per tree with --reference")
+    parser.add_argument("--baseline", default=BASELINE,
+                        help="local baseline JSON file to compare against, only meaningful from the same host; "
+                             "create it with --save-baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with these results")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="slowdown flagged as a regression")
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    if args.reference:
+        print(f"Median of {args.rounds} alternating runs, {args.reference} -> this tree:")
+        try:
+            rows, skipped = compare_interleaved(args.reference, args.benchmarks, args.sizes, args.repeat, args.rounds,
+                                                args.seed, args.tolerance, callback=_print_row)
+        except RuntimeError as error:
+            sys.exit(str(error))
+        if skipped:
+            print(f"The reference tree could not run: {', '.join(skipped)}")
+        if not rows:
+            sys.exit("No benchmark was compared")
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+        return
+
+    results = run_suite(args.benchmarks, args.sizes, args.repeat, args.seed,
+                        callback=lambda key, result: print(f"{key:<28} {result['hands_per_second']:>14,.0f} hands/sec"))
+    if args.output:
+        save(results, args.output)
+    if args.save_baseline:
+        save(results, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        rows = compare(results, load(args.baseline), args.tolerance)
+        print(f"Compared with {args.baseline}:")
+        for row in rows:
+            _print_row(row)
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+    else:
+        print(f"No baseline at {args.baseline}, create one on this machine with --save-baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import sys
+from rules import PlayerAction
+
+# Action columns (PlayerAction.value - 1), as in agents.ACTION_COLUMNS
+FOLD = PlayerAction.FOLD.value - 1
+CHECK = PlayerAction.CHECK.value - 1
+CALL = PlayerAction.CALL.value - 1
+RAISE = PlayerAction.RAISE.value - 1
+# Bit of each action column in a legal action mask
+FOLD_BIT = 1 << FOLD
+CHECK_BIT = 1 << CHECK
+CALL_BIT = 1 << CALL
+RAISE_BIT = 1 << RAISE
+# The legal PlayerActions of every mask, ordered by value like the lists Game.betting_round used to build
+LEGAL_ACTIONS: tuple[tuple[PlayerAction, ...], ...] = tuple(
+    tuple(action for action in PlayerAction if mask >> (action.value - 1) & 1)
+    for mask in range(1 << len(PlayerAction)))
+
+
+class BettingRound:
+    """One limit betting round as a state machine over a few integers.
+
+    The seats still in the hand are a bitmask, so the next seat to act is
+    found with bit arithmetic rather than a scan. Everyone in the hand acts
+    once from the first seat, and a raise reopens the action to everyone
+    but the raiser, so the round is over when the count of players still
+    to act reaches zero. The legal actions of the seat to act are kept as
+    a mask over action columns, recomputed on every transition.
+
+    As in Game.betting_round, a call puts in the full current bet and a
+    raise the current bet plus the round's limit. ``stacks`` is updated in
+    place and ``pot`` counts the chips bet this round.
+    """
+    __slots__ = ("num_players", "stacks", "active", "num_active", "to_act", "num_to_act", "current_bet",
+                 "round_limit", "raises", "max_raises", "last_raiser", "pot", "legal")
+
+    def __init__(self, stacks: list[int], active: int, start: int, round_limit: int, max_raises: int = None) -> None:
+        self.reset(stacks, active, start, round_limit, max_raises)
+
+    def reset(self, stacks: list[int], active: int, start: int, round_limit: int, max_raises: int = None) -> None:
+        """Start a round between the seats set in the ``active`` bitmask.
+
+        The first of them at or after seat ``start`` acts first, and
+        ``max_raises`` caps the raises of the round, uncapped by default.
+        """
+        self.num_players: int = len(stacks)
+        self.stacks: list[int] = stacks
+        self.active: int = active
+        self.num_active: int = bin(active).count("1")
+        self.num_to_act: int = self.num_active
+        self.current_bet: int = 0
+        self.round_limit: int = round_limit
+        self.raises: int = 0
+        self.max_raises: int = max_raises if max_raises is not None else sys.maxsize
+        self.last_raiser: int = -1
+        self.pot: int = 0
+        self.to_act: int = -1
+        self.legal: int = 0
+        self._advance(start - 1)
+
+    def _advance(self, seat: int) -> None:
+        """Pass the action to the first seat in the hand after ``seat``, or end the round."""
+        if self.num_to_act <= 0:
+            self.to_act = -1
+            self.legal = 0
+            return
+        later = self.active >> (seat + 1) if seat + 1 < self.num_players else 0
+        if later:
+            seat = seat + (later & -later).bit_length()
+        else:
+            seat = (self.active & -self.active).bit_length() - 1
+        self.to_act = seat
+        stack = self.stacks[seat]
+        legal = CHECK_BIT if self.current_bet == 0 else FOLD_BIT | (CALL_BIT if stack >= self.current_bet else 0)
+        if self.raises < self.max_raises and stack >= self.current_bet + self.round_limit:
+            legal |= RAISE_BIT
+        self.legal = legal
+
+    def snapshot(self) -> tuple:
+        """Return the integer fields of the round, everything but the stacks."""
+        return (self.active, self.num_active, self.to_act, self.num_to_act, self.current_bet, self.round_limit,
+                self.raises, self.last_raiser, self.pot, self.legal)
+
+    def restore(self, snapshot: tuple) -> None:
+        """Return to the integer fields of a snapshot, the stacks are restored by the caller."""
+        (self.active, self.num_active, self.to_act, self.num_to_act, self.current_bet, self.round_limit,
+         self.raises, self.last_raiser, self.pot, self.legal) = snapshot
+
+    def copy(self, stacks: list[int] = None) -> 'BettingRound':
+        """Return an independent copy betting from ``stacks``, a copy of this round's stacks by default."""
+        betting = BettingRound.__new__(BettingRound)
+        betting.num_players = self.num_players
+        betting.stacks = list(self.stacks) if stacks is None else stacks
+        betting.max_raises = self.max_raises
+        betting.restore(self.snapshot())
+        return betting
+
+    def limit_raises(self, max_raises: int) -> None:
+        """Cap the raises of the round from now on, e.g. on a copy of Game's uncapped round."""
+        self.max_raises = max_raises
+        if self.raises >= max_raises:
+            self.legal &= ~RAISE_BIT
+
+    def legal_actions(self) -> int:
+        """Return the mask of the action columns open to the seat to act, 0 once the round is over."""
+        return self.legal
+
+    def is_over(self) -> bool:
+        """Return whether every player has acted since the last raise."""
+        return self.to_act < 0
+
+    def apply(self, action: int) -> int:
+        """Play an action column for the seat to act and return the chips it puts in."""
+        if not self.legal >> action & 1:
+            raise ValueError(f"illegal action {action} for seat {self.to_act}")
+        seat = self.to_act
+        if action == RAISE:
+            amount = self.current_bet + self.round_limit
+            self.current_bet = amount
+            self.raises += 1
+            self.last_raiser = seat
+            self.num_to_act = self.num_active - 1
+        else:
+            amount = self.current_bet if action == CALL else 0
+            self.num_to_act -= 1
+            if action == FOLD:
+                self.active &= ~(1 << seat)
+                self.num_active -= 1
+        if amount:
+            self.stacks[seat] -= amount
+            self.pot += amount
+        self._advance(seat)
+        return amount
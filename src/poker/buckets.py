@@ -0,0 +1,215 @@
+import argparse
+import multiprocessing
+import os
+import time
+import numpy as np
+from canonical import MAX_CARDS, Canonicalizer
+from equity import EquityCalculator
+from evaluator import NUM_CARDS
+from seeding import stream
+
+NUM_BINS = 50
+# Buckets per betting round; pre-flop has only 13 canonical hole cards and the
+# turn histograms are single spikes, so at most NUM_BINS of them differ
+NUM_BUCKETS = (13, 64, NUM_BINS)
+# States whose distances to every centroid are computed at once
+CHUNK_SIZE = 512
+MAX_ITERATIONS = 50
+
+# Cumulative histograms of the states being clustered, set once per worker process
+_cdfs = None
+
+
+def equity_histograms(round: int, turn_equities: np.ndarray, num_bins: int = NUM_BINS,
+                      chunk_size: int = CHUNK_SIZE, canonicalizer: Canonicalizer = None) -> np.ndarray:
+    """Return the normalized histogram of final equities of every canonical state of a round.
+
+    A state is the hole card plus the board dealt so far, and its histogram
+    counts the turn equity of every way the rest of the board can fall, so
+    on the turn it is a single spike. ``turn_equities`` is the (hero, flop,
+    turn) matrix of EquityCalculator.equity_matrices.
+    """
+    canonicalizer = canonicalizer or Canonicalizer()
+    states = canonicalizer.representatives(round + 1).astype(np.intp)
+    bins = np.minimum(np.nan_to_num(turn_equities, nan=-1.0) * num_bins, num_bins - 1).astype(np.intp)
+    histograms = np.zeros((len(states), num_bins))
+    for start in range(0, len(states), chunk_size):
+        chunk = states[start:start + chunk_size]
+        if round == 0:
+            chunk_bins = bins[chunk[:, 0]].reshape(len(chunk), -1)
+        elif round == 1:
+            chunk_bins = bins[chunk[:, 0], chunk[:, 1]]
+        else:
+            chunk_bins = bins[chunk[:, 0], chunk[:, 1], chunk[:, 2]][:, None]
+        # NaN equities, where the future cards clash, got a negative bin
+        rows = np.broadcast_to(np.arange(len(chunk))[:, None], chunk_bins.shape)
+        valid = chunk_bins >= 0
+        counts = np.bincount(rows[valid] * num_bins + chunk_bins[valid], minlength=len(chunk) * num_bins)
+        histograms[start:start + len(chunk)] = counts.reshape(len(chunk), num_bins)
+    return histograms / histograms.sum(axis=1, keepdims=True)
+
+
+def emd(cdfs: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the earth mover's distance between every row of two sets of cumulative histograms.
+
+    In one dimension it is the L1 distance between the cumulative
+    histograms, in bin widths.
+    """
+    return np.abs(cdfs[:, None, :] - centroids[None, :, :]).sum(axis=2)
+
+
+def _init_worker(cdfs: np.ndarray) -> None:
+    global _cdfs
+    _cdfs = cdfs
+
+
+def _assign_chunk(centroids: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """Return the nearest centroid of the states in [start, stop)."""
+    return emd(_cdfs[start:stop], centroids).argmin(axis=1)
+
+
+def _assign(pool, centroids: np.ndarray, num_states: int, chunk_size: int) -> np.ndarray:
+    jobs = [(centroids, start, min(start + chunk_size, num_states)) for start in range(0, num_states, chunk_size)]
+    results = pool.starmap(_assign_chunk, jobs) if pool is not None else [_assign_chunk(*job) for job in jobs]
+    return np.concatenate(results)
+
+
+def cluster(histograms: np.ndarray, num_buckets: int, weights: np.ndarray = None, seed: int = 0,
+            workers: int = 1, chunk_size: int = CHUNK_SIZE, max_iterations: int = MAX_ITERATIONS) -> np.ndarray:
+    """Cluster histograms into buckets with k-means under the earth mover's distance, return each state's bucket.
+
+    Centroids start from k-means++ and move to the weighted mean of their
+    cumulative histograms. Distances are computed chunk by chunk, across
+    ``workers`` processes. There are at most as many buckets as distinct
+    histograms with weight, and they are numbered by increasing mean equity.
+    """
+    global _cdfs
+    weights = np.ones(len(histograms)) if weights is None else np.asarray(weights, dtype=np.float64)
+    # Identical histograms, common on later rounds, are clustered once with their weights summed
+    unique, inverse = np.unique(histograms, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    weights = np.bincount(inverse, weights=weights, minlength=len(unique))
+    cdfs = np.cumsum(unique, axis=1).astype(np.float32)
+    num_states = len(cdfs)
+    num_buckets = min(num_buckets, num_states)
+    rng = np.random.default_rng(stream(seed, num_states, num_buckets))
+
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(cdfs,)) if workers > 1 else None
+    _init_worker(cdfs)
+    try:
+        # k-means++: each new centroid is drawn in proportion to the squared distance to the nearest one
+        centroids = cdfs[[rng.choice(num_states, p=weights / weights.sum())]]
+        nearest_distance = emd(cdfs, centroids)[:, 0].astype(np.float64)
+        for _ in range(1, num_buckets):
+            p = weights * nearest_distance ** 2
+            if p.sum() <= 0:
+                # Every weighted state already sits on a centroid, more buckets would stay empty
+                num_buckets = len(centroids)
+                break
+            centroids = np.vstack([centroids, cdfs[rng.choice(num_states, p=p / p.sum())]])
+            nearest_distance = np.minimum(nearest_distance, emd(cdfs, centroids[-1:])[:, 0])
+
+        assignment = None
+        for _ in range(max_iterations):
+            new_assignment = _assign(pool, centroids, num_states, chunk_size)
+            if assignment is not None and np.array_equal(new_assignment, assignment):
+                break
+            assignment = new_assignment
+            totals = np.bincount(assignment, weights=weights, minlength=num_buckets)
+            sums = np.zeros(centroids.shape)
+            np.add.at(sums, assignment, cdfs * weights[:, None])
+            # An empty bucket keeps its centroid
+            filled = totals > 0
+            centroids[filled] = sums[filled] / totals[filled, None]
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        _cdfs = None
+
+    # Mean equity of a cumulative histogram over n bins is 1 - (sum of the cdf - 0.5) / n
+    order = np.argsort(-centroids.sum(axis=1), kind="stable")
+    ranks = np.empty(num_buckets, dtype=np.intp)
+    ranks[order] = np.arange(num_buckets)
+    return ranks[assignment][inverse]
+
+
+class BucketTable:
+    """Card buckets per betting round, looked up by hole card plus board.
+
+    The saved file holds one small array per round indexed by canonical
+    state. On load they are expanded over the raw card ids, so a lookup is
+    a single index into an array.
+    """
+
+    def __init__(self, buckets: list[np.ndarray], canonicalizer: Canonicalizer = None) -> None:
+        canonicalizer = canonicalizer or Canonicalizer()
+        self.buckets: list[np.ndarray] = [np.asarray(b, dtype=np.uint16) for b in buckets]
+        self.num_buckets: list[int] = [int(b.max()) + 1 for b in self.buckets]
+        self._raw: list[np.ndarray] = []
+        for round, buckets in enumerate(self.buckets):
+            table = canonicalizer.raw_table(round + 1)
+            self._raw.append(np.where(table >= 0, buckets[np.maximum(table, 0)], 0).astype(np.uint16))
+
+    def bucket(self, hole: int, board=()) -> int:
+        """Return the bucket of a hole card id on a board of card ids, the round being the board size."""
+        raw = hole
+        for card in board:
+            raw = raw * NUM_CARDS + card
+        return int(self._raw[len(board)][raw])
+
+    def bucket_batch(self, cards: np.ndarray) -> np.ndarray:
+        """Return the buckets of an (N, 1 + board size) array of hole and board card ids."""
+        cards = np.asarray(cards, dtype=np.int64)
+        raw = np.zeros(len(cards), dtype=np.int64)
+        for i in range(cards.shape[1]):
+            raw = raw * NUM_CARDS + cards[:, i]
+        return self._raw[cards.shape[1] - 1][raw]
+
+    def save(self, path, **extra) -> None:
+        """Write the per-round canonical bucket arrays to a .npz file."""
+        np.savez(path, **{f"round{round}": buckets for round, buckets in enumerate(self.buckets)}, **extra)
+
+    @classmethod
+    def load(cls, path) -> 'BucketTable':
+        """Read a bucket file written by save."""
+        with np.load(path) as data:
+            return cls([data[f"round{round}"] for round in range(MAX_CARDS) if f"round{round}" in data.files])
+
+
+def build(num_buckets=NUM_BUCKETS, num_bins: int = NUM_BINS, seed: int = 0, workers: int = 1,
+          chunk_size: int = CHUNK_SIZE, callback=None) -> BucketTable:
+    """Compute equity histograms for every canonical state and cluster each round into buckets."""
+    canonicalizer = Canonicalizer()
+    turn_equities = EquityCalculator().equity_matrices()["turn"]
+    buckets = []
+    for round, k in enumerate(num_buckets):
+        histograms = equity_histograms(round, turn_equities, num_bins, chunk_size, canonicalizer)
+        buckets.append(cluster(histograms, k, weights=canonicalizer.class_sizes(round + 1), seed=seed,
+                               workers=workers, chunk_size=chunk_size))
+        if callback is not None:
+            callback(round, len(histograms), int(buckets[-1].max()) + 1)
+    return BucketTable(buckets, canonicalizer)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Cluster Rhode Island card states into equity-histogram buckets.")
+    parser.add_argument("output", help="path of the .npz bucket file to write")
+    parser.add_argument("--buckets", type=int, nargs="+", default=list(NUM_BUCKETS), help="buckets per round")
+    parser.add_argument("--bins", type=int, default=NUM_BINS, help="equity histogram bins")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to the CPU count")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    table = build(args.buckets, num_bins=args.bins, seed=args.seed, workers=args.workers or os.cpu_count() or 1,
+                  chunk_size=args.chunk_size,
+                  callback=lambda round, states, buckets: print(
+                      f"Round {round}: {states:,} canonical states in {buckets} buckets "
+                      f"({time.perf_counter() - start_time:.2f} seconds)"))
+    table.save(args.output, num_bins=np.array(args.bins), seed=np.array(args.seed))
+    print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import argparse
+import numpy as np
+from evaluator import NUM_CARDS
+
+NUM_RANKS = 13
+NUM_SUITS = 4
+MAX_CARDS = 3  # Hole card, flop and turn
+
+
+def suit_pattern(cards: np.ndarray) -> np.ndarray:
+    """Relabel the suits of (N, k) card ids in order of first appearance, so the first card is suit 0."""
+    suits = cards & 3
+    labels = np.zeros_like(suits)
+    seen = np.full((len(cards), NUM_SUITS), -1, dtype=suits.dtype)
+    rows = np.arange(len(cards))
+    next_label = np.zeros(len(cards), dtype=suits.dtype)
+    for i in range(cards.shape[1]):
+        label = seen[rows, suits[:, i]]
+        new = label < 0
+        label = np.where(new, next_label, label)
+        seen[rows, suits[:, i]] = label
+        next_label += new
+        labels[:, i] = label
+    return labels
+
+
+def _build(num_cards: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the raw-to-canonical index table and the canonical representatives for num_cards cards."""
+    raw = np.indices((NUM_CARDS,) * num_cards).reshape(num_cards, -1).T
+    canonical_cards = (raw >> 2 << 2) | suit_pattern(raw)
+    distinct = np.ones(len(raw), dtype=bool)
+    for i in range(num_cards):
+        for j in range(i):
+            distinct &= raw[:, i] != raw[:, j]
+    keys = np.zeros(len(raw), dtype=np.int64)
+    for i in range(num_cards):
+        keys = keys * NUM_CARDS + canonical_cards[:, i]
+    unique_keys, index = np.unique(keys[distinct], return_inverse=True)
+    table = np.full(len(raw), -1, dtype=np.int32)
+    table[distinct] = index
+    representatives = np.zeros((len(unique_keys), num_cards), dtype=np.int8)
+    for i in reversed(range(num_cards)):
+        representatives[:, i] = unique_keys % NUM_CARDS
+        unique_keys = unique_keys // NUM_CARDS
+    return table, representatives
+
+
+class Canonicalizer:
+    """Map a hole card plus board to an index shared by every suit-isomorphic deal.
+
+    Suits only matter through flushes, so relabeling them by order of first
+    appearance (hole card first, then flop, then turn) gives one canonical
+    deal per class. Card order is kept, since the hole card, flop and turn
+    are seen at different times. Per number of cards, a table over every
+    raw id tuple gives the canonical index in one lookup and an array of
+    representatives unranks it.
+    """
+
+    def __init__(self) -> None:
+        self._tables: dict[int, np.ndarray] = {}
+        self._representatives: dict[int, np.ndarray] = {}
+
+    def _load(self, num_cards: int) -> None:
+        if not 1 <= num_cards <= MAX_CARDS:
+            raise ValueError(f"canonical indexes cover 1 to {MAX_CARDS} cards")
+        if num_cards not in self._tables:
+            self._tables[num_cards], self._representatives[num_cards] = _build(num_cards)
+
+    def num_states(self, num_cards: int) -> int:
+        """Return the number of canonical classes of num_cards cards."""
+        self._load(num_cards)
+        return len(self._representatives[num_cards])
+
+    def class_sizes(self, num_cards: int) -> np.ndarray:
+        """Return the number of raw deals in each canonical class of num_cards cards."""
+        self._load(num_cards)
+        table = self._tables[num_cards]
+        return np.bincount(table[table >= 0], minlength=len(self._representatives[num_cards]))
+
+    def representatives(self, num_cards: int) -> np.ndarray:
+        """Return the (num_states, num_cards) canonical card ids, row i being index i."""
+        self._load(num_cards)
+        return self._representatives[num_cards]
+
+    def raw_table(self, num_cards: int) -> np.ndarray:
+        """Return the canonical index of every raw id tuple, flattened in base 52, -1 where a card repeats."""
+        self._load(num_cards)
+        return self._tables[num_cards]
+
+    def index(self, cards) -> int:
+        """Return the canonical index of a sequence of card ids."""
+        self._load(len(cards))
+        raw = 0
+        for card in cards:
+            raw = raw * NUM_CARDS + card
+        index = int(self._tables[len(cards)][raw])
+        if index < 0:
+            raise ValueError("cards must all differ")
+        return index
+
+    def index_batch(self, cards: np.ndarray) -> np.ndarray:
+        """Return the canonical index of every row of an (N, k) array of card ids, -1 where a card repeats."""
+        cards = np.asarray(cards, dtype=np.int64)
+        self._load(cards.shape[1])
+        raw = np.zeros(len(cards), dtype=np.int64)
+        for i in range(cards.shape[1]):
+            raw = raw * NUM_CARDS + cards[:, i]
+        return self._tables[cards.shape[1]][raw]
+
+    def unindex(self, index: int, num_cards: int) -> tuple[int, ...]:
+        """Return the canonical card ids of an index."""
+        self._load(num_cards)
+        return tuple(self._representatives[num_cards][index].tolist())
+
+    def canonicalize(self, cards) -> tuple[int, ...]:
+        """Return the canonical representative of a sequence of card ids."""
+        return self.unindex(self.index(cards), len(cards))
+
+
+def suit_permutation(cards) -> np.ndarray:
+    """Return the card id mapping that takes cards to their canonical representative.
+
+    Suits that do not appear get the remaining labels in order, so the
+    mapping is a permutation of all 52 ids.
+    """
+    mapping = {}
+    for card in cards:
+        mapping.setdefault(card & 3, len(mapping))
+    for suit in range(NUM_SUITS):
+        mapping.setdefault(suit, len(mapping))
+    ids = np.arange(NUM_CARDS)
+    return (ids >> 2 << 2) | np.array([mapping[suit] for suit in range(NUM_SUITS)])[ids & 3]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Count the suit-isomorphic classes of Rhode Island deals.")
+    parser.parse_args(argv)
+    canonicalizer = Canonicalizer()
+    for num_cards, name in zip(range(1, MAX_CARDS + 1), ("hole card", "hole card + flop", "hole card + flop + turn")):
+        raw = int(np.prod(NUM_CARDS - np.arange(num_cards)))
+        states = canonicalizer.num_states(num_cards)
+        print(f"{name}: {raw:,} deals, {states:,} canonical ({raw / states:.2f}x smaller)")
+
+if __name__ == "__main__":
+    main()
@@ -25,22 +25,47 @@ class Suit(Enum):
     HEARTS = 'H'
     SPADES = 'S'
 
+SUIT_INDEX: dict[Suit, int] = {suit: i for i, suit in enumerate(Suit)}
+
 class Card:
+    """A playing card with a precomputed 0-51 id, ordered by rank then suit."""
+    __slots__ = ('rank', 'suit', 'id')
+
     def __init__(self, rank: Rank, suit: Suit) -> None:
         self.rank: Rank = rank
         self.suit: Suit = suit
+        self.id: int = (rank.value - 2) * 4 + SUIT_INDEX[suit]
+
+    @staticmethod
+    def from_id(card_id: int) -> 'Card':
+        """Return the shared card for an id."""
+        return CARDS[card_id]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Card) and self.id == other.id
+
+    def __hash__(self) -> int:
+        return self.id
 
     def __repr__(self) -> str:
         """Representation of a card."""
         return f"{self.rank.value}{self.suit.value}"
+
+# One shared instance per card, indexed by Card.id
+CARDS: tuple[Card, ...] = tuple(Card(rank, suit) for rank in Rank for suit in Suit)
+
 class Deck:
-    def __init__(self) -> None:
-        self.deck = [Card(rank, suit) for rank in Rank for suit in Suit]
+    __slots__ = ('deck', 'cards_used', 'rng')
+
+    def __init__(self, rng=None) -> None:
+        self.deck = list(CARDS)
         self.cards_used = 0
+        # Anything with a shuffle method, defaults to the global random module
+        self.rng = rng if rng is not None else random
 
     def shuffle(self) -> None:
         """Shuffle the deck."""
-        random.shuffle(self.deck)
+        self.rng.shuffle(self.deck)
         self.cards_used = 0
 
     def cardsLeft(self) -> int:
@@ -69,6 +94,17 @@ class Deck:
                     deal.append(card)
             return deal
 
+    def to_bytes(self) -> bytes:
+        """Return the deck order as one card id per byte."""
+        return bytes(card.id for card in self.deck)
+
+    @classmethod
+    def from_bytes(cls, buffer) -> 'Deck':
+        """Build a deck from card ids, one per byte."""
+        deck = cls()
+        deck.deck = [CARDS[card_id] for card_id in buffer]
+        return deck
+
     def __str__(self) -> str:
         """Representation of the deck."""
         tmp_deck = "Deck: "
@@ -76,6 +112,90 @@ class Deck:
             tmp_deck += str(c) + " "
         return tmp_deck
 
+class CompactDeck(Deck):
+    """A deck that stores its cards as a bytearray of card ids.
+
+    Shuffling permutes 52 bytes instead of 52 object references and dealing
+    returns the shared Card instances from CARDS, so no cards are allocated.
+    """
+    __slots__ = ()
+
+    def __init__(self, rng=None) -> None:
+        super().__init__(rng=rng)
+        self.deck = bytearray(range(len(CARDS)))
+
+    def deal_card(self) -> Card:
+        """Deal a card from the deck."""
+        if self.cards_used >= len(self.deck):
+            print("Error: There are no cards left in the deck.")
+            return None
+        else:
+            self.cards_used += 1
+            return CARDS[self.deck[self.cards_used - 1]]
+
+    def deal_ids(self, num) -> bytes:
+        """Deal a number of card ids from the deck."""
+        if (self.cards_used + num) > len(self.deck):
+            print("Error: There are not enough cards left in the deck.")
+            return b""
+        self.cards_used += num
+        return bytes(self.deck[self.cards_used - num:self.cards_used])
+
+    def to_cards(self) -> list[Card]:
+        """Return the deck order as Card objects."""
+        return [CARDS[card_id] for card_id in self.deck]
+
+    @classmethod
+    def from_cards(cls, cards) -> 'CompactDeck':
+        """Build a deck from Card objects."""
+        deck = cls()
+        deck.deck = bytearray(card.id for card in cards)
+        return deck
+
+    def to_bytes(self) -> bytes:
+        """Return the deck order as one card id per byte."""
+        return bytes(self.deck)
+
+    @classmethod
+    def from_bytes(cls, buffer) -> 'CompactDeck':
+        """Build a deck from card ids, one per byte."""
+        deck = cls()
+        deck.deck = bytearray(buffer)
+        return deck
+
+    def __str__(self) -> str:
+        """Representation of the deck."""
+        return "Deck: " + "".join(str(c) + " " for c in self.to_cards())
+
+class PartialDeck(Deck):
+    """A deck that only shuffles the cards it deals.
+
+    shuffle() takes every card back in the fresh deck order and each
+    deal_card() runs one step of a Fisher-Yates shuffle, swapping a random
+    undealt card to the front. The cards dealt are distributed exactly as
+    after a full shuffle, but a Rhode Island hand pays for 4 random draws
+    instead of 51, and a deal depends only on the generator, not on the
+    hands dealt before it, so a seeded hand replays on its own.
+    """
+    __slots__ = ()
+
+    def shuffle(self) -> None:
+        """Shuffle the deck."""
+        self.deck[:] = CARDS
+        self.cards_used = 0
+
+    def deal_card(self) -> Card:
+        """Deal a card from the deck."""
+        deck = self.deck
+        i = self.cards_used
+        if i >= len(deck):
+            print("Error: There are no cards left in the deck.")
+            return None
+        j = i + int(self.rng.random() * (len(deck) - i))
+        deck[i], deck[j] = deck[j], deck[i]
+        self.cards_used = i + 1
+        return deck[i]
+
 class HandRanker:
     @staticmethod
     def rank_value(card):
@@ -143,5 +263,21 @@ class HandRanker:
         
         high_cards = tuple(sorted(cards, key=HandRanker.rank_value, reverse=True))
         return (6, *high_cards)
+
+    @staticmethod
+    def hand_strength(cards) -> int:
+        """Return the strength of a hand as an integer, higher is better.
+
+        The category from rank_hand is packed above up to three 4-bit rank
+        values, so comparing strengths orders hands exactly like rank_hand
+        including the tie-breaking ranks.
+        """
+        category, *ranks = HandRanker.rank_hand(cards)
+        strength = 6 - category
+        for rank in ranks:
+            if isinstance(rank, Card):
+                rank = rank.rank
+            strength = (strength << 4) | rank.value
+        return strength << 4 * (3 - len(ranks))
     
 
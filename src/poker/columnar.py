@@ -0,0 +1,139 @@
+import argparse
+import glob
+import os
+import numpy as np
+from handlog import RECORD, iter_chunks, read_hands
+from rules import ANTE, ROUND_LIMITS, PlayerAction
+
+CHUNK_SIZE = 1 << 20
+# Columns copied from the hand records; hole cards and stack deltas are cut to the seats in use
+RECORD_COLUMNS = ("seed", "button", "showdown", "truncated", "pot", "num_actions", "hole", "board", "stack_deltas")
+_CALL = PlayerAction.CALL.value - 1
+_RAISE = PlayerAction.RAISE.value - 1
+
+
+def round_pots(records: np.ndarray, num_players: int) -> np.ndarray:
+    """Return the pot at the end of each betting round, -1 for rounds the hand never reached.
+
+    The amounts are replayed from the packed actions: a call puts in the
+    round's current bet and a raise the current bet plus the round limit.
+    """
+    longest = int(records["num_actions"].max()) if len(records) else 0
+    codes = records["actions"][:, :longest]
+    valid = np.arange(longest) < records["num_actions"][:, None]
+    rounds = codes >> 2 & 3
+    columns = codes & 3
+    pots = np.empty((len(records), len(ROUND_LIMITS)), dtype=np.int16)
+    pot = np.full(len(records), ANTE * num_players, dtype=np.int32)
+    for round, limit in enumerate(ROUND_LIMITS):
+        in_round = valid & (rounds == round)
+        raises = in_round & (columns == _RAISE)
+        raises_before = np.cumsum(raises, axis=1, dtype=np.int16) - raises
+        # A call or raise puts in one round limit per raise before it, a raise one more
+        bets = raises_before * (in_round & (columns == _CALL)) + (raises_before + 1) * raises
+        pot += limit * bets.sum(axis=1, dtype=np.int32)
+        reached = records["board"][:, round - 1] >= 0 if round else np.ones(len(records), dtype=bool)
+        pots[:, round] = np.where(reached, pot, -1)
+    return pots
+
+
+def record_columns(records: np.ndarray, num_players: int) -> dict[str, np.ndarray]:
+    """Split hand records into the columns of one chunk."""
+    columns = {name: np.ascontiguousarray(records[name]) for name in RECORD_COLUMNS}
+    columns["hole"] = np.ascontiguousarray(columns["hole"][:, :num_players])
+    columns["stack_deltas"] = np.ascontiguousarray(columns["stack_deltas"][:, :num_players])
+    columns["round_pots"] = round_pots(records, num_players)
+    return columns
+
+
+class ColumnarWriter:
+    """Write hand records as a directory of columnar chunks.
+
+    Each chunk is an uncompressed ``chunk-NNNNNN.npz`` holding one array per
+    column, so a query only reads the columns it needs. It can stand in for
+    HandHistoryWriter behind a HandHistorySink.
+    """
+
+    def __init__(self, directory, num_players: int, chunk_size: int = CHUNK_SIZE) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.num_players: int = num_players
+        self.buffer: np.ndarray = np.zeros(chunk_size, dtype=RECORD)
+        self.size: int = 0
+        self.chunks: int = len(chunk_paths(directory))
+        self.hands: int = 0
+
+    def next_record(self) -> np.void:
+        """Return the next empty slot of the buffer to fill in."""
+        if self.size == len(self.buffer):
+            self.flush()
+        record = self.buffer[self.size]
+        record["hole"] = -1
+        record["board"] = -1
+        self.size += 1
+        self.hands += 1
+        return record
+
+    def write(self, records: np.ndarray) -> None:
+        """Write an array of RECORD, e.g. a slice of a binary hand history."""
+        self.flush()
+        for chunk in iter_chunks(records, len(self.buffer)):
+            self._save(chunk)
+            self.hands += len(chunk)
+
+    def flush(self) -> None:
+        """Write the buffered records as a chunk."""
+        if self.size:
+            self._save(self.buffer[:self.size])
+            self.buffer[:self.size] = 0
+            self.size = 0
+
+    def _save(self, records: np.ndarray) -> None:
+        path = os.path.join(self.directory, f"chunk-{self.chunks:06d}.npz")
+        np.savez(path, **record_columns(records, self.num_players))
+        self.chunks += 1
+
+    def close(self) -> None:
+        """Write any buffered records."""
+        self.flush()
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def chunk_paths(directory) -> list[str]:
+    """Return the chunk files of a dataset in order."""
+    return sorted(glob.glob(os.path.join(directory, "chunk-*.npz")))
+
+
+def scan(directory, columns):
+    """Yield one dict of the requested column arrays per chunk."""
+    for path in chunk_paths(directory):
+        with np.load(path) as chunk:
+            yield {name: chunk[name] for name in columns}
+
+
+def export(log_path, directory, num_players: int = None, chunk_size: int = CHUNK_SIZE) -> int:
+    """Convert a binary hand history into a columnar dataset, return the number of hands."""
+    hands = read_hands(log_path)
+    if num_players is None:
+        num_players = int(hands["num_players"].max()) if len(hands) else 0
+    with ColumnarWriter(directory, num_players=num_players, chunk_size=chunk_size) as writer:
+        writer.write(hands)
+    return len(hands)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Convert a binary hand history into columnar chunks.")
+    parser.add_argument("log", help="hand-history file written by run.py --log")
+    parser.add_argument("directory", help="dataset directory to write chunks to")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    hands = export(args.log, args.directory, chunk_size=args.chunk_size)
+    print(f"Exported {hands:,} hands to {args.directory}")
+
+if __name__ == "__main__":
+    main()
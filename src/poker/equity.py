@@ -0,0 +1,142 @@
+import argparse
+import time
+from functools import lru_cache
+import numpy as np
+from canonical import suit_permutation
+from cardecky import Card
+from evaluator import NUM_CARDS, LookupHandRanker
+
+BOARD_SIZE = 2  # Flop and turn
+
+
+def card_id(card) -> int:
+    """Return the id of a Card, or the id itself."""
+    return card.id if isinstance(card, Card) else int(card)
+
+
+def uniform_range() -> np.ndarray:
+    """Return the range that holds every card with equal weight."""
+    return np.ones(NUM_CARDS)
+
+
+class EquityCalculator:
+    """Exact heads-up equities, enumerating every remaining board card and opponent hole card.
+
+    For a (hero, board) pair the calculator works out, per opponent hole
+    card, the share of the pot hero wins summed over the remaining boards
+    and how many boards there were. Those two 52-vectors are kept in a
+    bounded LRU cache, so the equity against any range, given as 52 card
+    weights, is two dot products once a key is cached. Keys are the
+    suit-isomorphic canonical deal, so deals that differ only by a suit
+    relabeling share an entry and the vectors are permuted back.
+    """
+
+    def __init__(self, cache_size: int = 4096) -> None:
+        # strength[a, b, c] is the strength of the hand of card ids a, b and c
+        self.strength: np.ndarray = np.frombuffer(LookupHandRanker.table(), dtype=np.uint16) \
+            .reshape(NUM_CARDS, NUM_CARDS, NUM_CARDS).astype(np.int32)
+        self.outcomes = lru_cache(maxsize=cache_size)(self._outcomes)
+
+    def _outcomes(self, hero: int, board: tuple[int, ...]) -> tuple[np.ndarray, np.ndarray]:
+        """Return hero's summed pot share and the number of boards, per opponent hole card."""
+        dead = np.zeros(NUM_CARDS, dtype=bool)
+        dead[[hero, *board]] = True
+        if len(set(board) | {hero}) != len(board) + 1:
+            raise ValueError("hero and board cards must all differ")
+        if len(board) == BOARD_SIZE:
+            flop, turn = board
+            opponents = self.strength[:, flop, turn]
+            share = _pot_share(self.strength[hero, flop, turn], opponents)
+            counts = (~dead).astype(np.float64)
+            return np.where(dead, 0.0, share), counts
+        if len(board) == 1:
+            flop = board[0]
+            # (opponent, turn)
+            opponents = self.strength[:, flop, :]
+            share = _pot_share(self.strength[hero, flop, :][None, :], opponents)
+            valid = ~dead[:, None] & ~dead[None, :] & ~np.eye(NUM_CARDS, dtype=bool)
+            return (share * valid).sum(axis=1), valid.sum(axis=1).astype(np.float64)
+        if len(board) == 0:
+            # (opponent, flop, turn)
+            share = _pot_share(self.strength[hero][None, :, :], self.strength)
+            ids = np.arange(NUM_CARDS)
+            distinct = (ids[:, None, None] != ids[None, :, None]) & (ids[:, None, None] != ids[None, None, :]) \
+                & (ids[None, :, None] != ids[None, None, :])
+            valid = distinct & ~dead[:, None, None] & ~dead[None, :, None] & ~dead[None, None, :]
+            return (share * valid).sum(axis=(1, 2)), valid.sum(axis=(1, 2)).astype(np.float64)
+        raise ValueError(f"a board has at most {BOARD_SIZE} cards")
+
+    def equity(self, hero, board=(), opponent_range=None) -> float:
+        """Return hero's share of the pot against an opponent range, ties counting half."""
+        cards = [card_id(hero), *(card_id(card) for card in board)]
+        permutation = suit_permutation(cards)
+        canonical = permutation[cards].tolist()
+        wins, counts = self.outcomes(canonical[0], tuple(canonical[1:]))
+        wins, counts = wins[permutation], counts[permutation]
+        weights = uniform_range() if opponent_range is None else np.asarray(opponent_range, dtype=np.float64)
+        total = weights @ counts
+        if total <= 0:
+            raise ValueError("the opponent range holds no live cards")
+        return float(weights @ wins / total)
+
+    def equity_vector(self, board=(), opponent_range=None) -> np.ndarray:
+        """Return the equity of every hero card on a board, NaN for cards on the board."""
+        board = tuple(card_id(card) for card in board)
+        equities = np.full(NUM_CARDS, np.nan)
+        for hero in range(NUM_CARDS):
+            if hero not in board:
+                equities[hero] = self.equity(hero, board, opponent_range)
+        return equities
+
+    def equity_matrices(self, opponent_range=None) -> dict[str, np.ndarray]:
+        """Return the equities of every hero card on every board in one pass, NaN where cards clash.
+
+        The result has the keys "turn" (hero, flop, turn), "flop" (hero,
+        flop) and "preflop" (hero,). Unlike equity() nothing is cached, the
+        whole game is enumerated at once.
+        """
+        weights = uniform_range() if opponent_range is None else np.asarray(opponent_range, dtype=np.float64)
+        ids = np.arange(NUM_CARDS)
+        # Opponent weight with the opponent card different from hero, turn and the flop
+        live = weights[None, :, None] * (ids[:, None, None] != ids[None, :, None]) \
+            * (ids[None, :, None] != ids[None, None, :])
+        wins = np.zeros((NUM_CARDS, NUM_CARDS, NUM_CARDS))
+        totals = np.zeros((NUM_CARDS, NUM_CARDS, NUM_CARDS))
+        for flop in range(NUM_CARDS):
+            # (hero, opponent, turn), the opponent may not hold the flop
+            strength = self.strength[:, flop, :]
+            share = _pot_share(strength[:, None, :], strength[None, :, :])
+            weighted = live.copy()
+            weighted[:, flop, :] = 0.0
+            wins[:, flop, :] = np.einsum("hot,hot->ht", share, weighted)
+            totals[:, flop, :] = weighted.sum(axis=1)
+        clash = (ids[:, None, None] == ids[None, :, None]) | (ids[:, None, None] == ids[None, None, :]) \
+            | (ids[None, :, None] == ids[None, None, :])
+        wins[clash] = 0.0
+        totals[clash] = 0.0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return {
+                "turn": np.where(clash, np.nan, wins / totals),
+                "flop": wins.sum(axis=2) / totals.sum(axis=2),
+                "preflop": wins.sum(axis=(1, 2)) / totals.sum(axis=(1, 2)),
+            }
+
+
+def _pot_share(hero: np.ndarray, opponent: np.ndarray) -> np.ndarray:
+    """Return 1 where hero's strength wins, 0.5 on ties and 0 where it loses."""
+    return (np.sign(hero - opponent) + 1) * 0.5
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compute the exact equity of a hole card against a random card.")
+    parser.add_argument("hero", type=int, help="hero card id, 0-51")
+    parser.add_argument("board", type=int, nargs="*", help="flop and turn card ids")
+    args = parser.parse_args(argv)
+    calculator = EquityCalculator()
+    start_time = time.perf_counter()
+    equity = calculator.equity(args.hero, args.board)
+    print(f"Equity of {Card.from_id(args.hero)} on {[Card.from_id(card) for card in args.board]}: {equity:.6f} "
+          f"({time.perf_counter() - start_time:.6f} seconds)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+from array import array
+from itertools import combinations, combinations_with_replacement, permutations
+import numpy as np
+from cardecky import CARDS, HandRanker
+
+NUM_CARDS = 52
+HAND_SIZE = 3
+
+
+class LookupHandRanker:
+    """Rank 3-card Rhode Island hands with a precomputed strength table.
+
+    Every one of the C(52,3) hands is ranked once with HandRanker and the
+    strength is stored for each ordering of its cards in a flat table keyed
+    by the card ids ``(a * 52 + b) * 52 + c``, so ranking a hand is a single
+    lookup.
+    """
+    _table: array = None
+
+    @classmethod
+    def table(cls) -> array:
+        """Return the strength table, building it on first use."""
+        if cls._table is None:
+            table = array('H', bytes(2 * NUM_CARDS ** HAND_SIZE))
+            for hand in combinations(range(NUM_CARDS), HAND_SIZE):
+                strength = HandRanker.hand_strength([CARDS[i] for i in hand])
+                for a, b, c in permutations(hand):
+                    table[(a * NUM_CARDS + b) * NUM_CARDS + c] = strength
+            cls._table = table
+        return cls._table
+
+    @classmethod
+    def strength_from_ids(cls, a: int, b: int, c: int) -> int:
+        """Return the strength of the hand made of three card ids."""
+        return cls.table()[(a * NUM_CARDS + b) * NUM_CARDS + c]
+
+    @classmethod
+    def hand_strength(cls, cards) -> int:
+        """Return the strength of a 3-card hand, higher is better."""
+        if len(cards) != HAND_SIZE:
+            raise ValueError("LookupHandRanker only ranks 3-card hands")
+        a, b, c = cards
+        return cls.table()[(a.id * NUM_CARDS + b.id) * NUM_CARDS + c.id]
+
+    @classmethod
+    def rank_hand(cls, cards) -> int:
+        """Return the strength of a 3-card hand, higher is better."""
+        return cls.hand_strength(cards)
+
+    @staticmethod
+    def category(strength: int) -> int:
+        """Return the rank_hand category (1 best, 6 worst) of a strength."""
+        return 6 - (strength >> 12)
+
+
+def hands_to_array(hands) -> np.ndarray:
+    """Convert a list of 3-card hands into an (N, 3) array of card ids."""
+    return np.array([[card.id for card in hand] for hand in hands], dtype=np.int8).reshape(-1, HAND_SIZE)
+
+
+def rank_hands_batch(hands: np.ndarray) -> np.ndarray:
+    """Return the strength of every hand in an (N, 3) array of card ids.
+
+    The strengths are the same integers HandRanker.hand_strength returns, so
+    they can be sorted and compared directly. Like is_straight, only the
+    A2345 wheel counts as an ace-low straight, so A23 is a high card hand.
+    """
+    hands = np.asarray(hands)
+    if hands.ndim != 2 or hands.shape[1] != HAND_SIZE:
+        raise ValueError("hands must be an (N, 3) array of card ids")
+    hands = hands.astype(np.int32)
+    ranks = -np.sort(-((hands >> 2) + 2), axis=1)
+    suits = hands & 3
+    high, middle, low = ranks[:, 0], ranks[:, 1], ranks[:, 2]
+
+    is_flush = (suits[:, 0] == suits[:, 1]) & (suits[:, 1] == suits[:, 2])
+    is_three_of_a_kind = high == low
+    is_pair = ((high == middle) | (middle == low)) & ~is_three_of_a_kind
+    is_straight = (high - low == 2) & (high != middle) & (middle != low)
+
+    # The middle card always belongs to a pair, the kicker is the other one
+    kicker = high + low - middle
+    all_ranks = (high << 8) | (middle << 4) | low
+    strength = np.select(
+        [is_straight & is_flush, is_three_of_a_kind, is_straight, is_flush, is_pair],
+        [(5 << 12) | (high << 8), (4 << 12) | (high << 8), (3 << 12) | (high << 8),
+         (2 << 12) | all_ranks, (1 << 12) | (middle << 8) | (kicker << 4)],
+        default=all_ranks,
+    )
+    return strength.astype(np.int32)
+
+
+# Per-rank keys, deuce to ace, whose sums differ for every multiset of 5, 6 or 7 ranks with at most four
+# of each, so a sum indexes the rank table of that hand size (checked when a table is built)
+RANK_KEYS = (0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181)
+# Per-suit keys, one octal digit per suit, so a sum holds the count of every suit
+SUIT_KEYS = (1, 8, 64, 512)
+_SUIT_BITS = 12
+# Rows evaluated at once by HoldemHandRanker.strength_batch
+_BATCH_ROWS = 1 << 16
+
+
+def _pack(category: int, *ranks: int) -> int:
+    """Return a comparable 5-card strength from a category and up to five tie-breaking rank indexes."""
+    strength = category
+    for i in range(5):
+        strength = (strength << 4) | (ranks[i] if i < len(ranks) else 0)
+    return strength
+
+
+def _straight_high(mask: int) -> int:
+    """Return the rank index of the top card of the best straight in a 13-bit rank mask, -1 if there is none."""
+    for high in range(12, 3, -1):
+        if (mask >> (high - 4)) & 0x1F == 0x1F:
+            return high
+    # A2345, the wheel, is a five-high straight
+    return 3 if mask & 0x100F == 0x100F else -1
+
+
+def _best_rank_strength(counts) -> int:
+    """Return the best 5-card strength of a multiset of rank counts with no flush."""
+    present = [r for r in range(12, -1, -1) if counts[r]]
+    quads = [r for r in present if counts[r] == 4]
+    trips = [r for r in present if counts[r] == 3]
+    pairs = [r for r in present if counts[r] == 2]
+    if quads:
+        return _pack(7, quads[0], next(r for r in present if r != quads[0]))
+    if trips and (len(trips) > 1 or pairs):
+        return _pack(6, trips[0], max(trips[1:] + pairs))
+    straight = _straight_high(sum(1 << r for r in present))
+    if straight >= 0:
+        return _pack(4, straight)
+    if trips:
+        return _pack(3, trips[0], *[r for r in present if r != trips[0]][:2])
+    if len(pairs) > 1:
+        return _pack(2, pairs[0], pairs[1], next(r for r in present if r not in pairs[:2]))
+    if pairs:
+        return _pack(1, pairs[0], *[r for r in present if r != pairs[0]][:3])
+    return _pack(0, *present[:5])
+
+
+def _best_flush_strength(mask: int) -> int:
+    """Return the best 5-card strength of the ranks of one suit, given as a mask of at least 5 bits."""
+    straight = _straight_high(mask)
+    if straight >= 0:
+        return _pack(8, straight)
+    return _pack(5, *[r for r in range(12, -1, -1) if mask >> r & 1][:5])
+
+
+class HoldemHandRanker:
+    """Rank the best 5-card poker hand out of 5, 6 or 7 cards with lookup tables.
+
+    Strengths are the 7462 classes of 5-card hands numbered 1 (7-5-4-3-2)
+    to 7462 (royal flush). Summing RANK_KEYS over the cards indexes a rank
+    table and summing SUIT_KEYS finds any suit with five cards, whose rank
+    mask then indexes a flush table. A flush rules out quads and full houses
+    with at most 7 cards, so no hand needs both tables.
+    """
+    _classes: np.ndarray = None
+    _rank_tables: dict = {}
+    _flush_table: np.ndarray = None
+    _flush_suit: np.ndarray = None
+    _card_keys: np.ndarray = None
+
+    @classmethod
+    def _class_table(cls) -> np.ndarray:
+        """Return the sorted packed strengths of the 7462 classes, built on first use."""
+        if cls._classes is None:
+            rank_multisets = [c for c in combinations_with_replacement(range(13), 5) if max(map(c.count, c)) <= 4]
+            packed = [_best_rank_strength([c.count(r) for r in range(13)]) for c in rank_multisets]
+            packed += [_best_flush_strength(sum(1 << r for r in c)) for c in combinations(range(13), 5)]
+            cls._classes = np.unique(packed)
+        return cls._classes
+
+    @classmethod
+    def _strength_class(cls, strengths: np.ndarray) -> np.ndarray:
+        """Return the class number of packed 5-card strengths."""
+        return (np.searchsorted(cls._class_table(), strengths) + 1).astype(np.uint16)
+
+    @classmethod
+    def flush_tables(cls) -> tuple[np.ndarray, np.ndarray]:
+        """Return the flush suit of every suit-key sum (-1 for none) and the flush class of every rank mask."""
+        if cls._flush_table is None:
+            sums = np.arange(8 ** 4)
+            suit_counts = np.stack([(sums >> 3 * suit) & 7 for suit in range(4)], axis=1)
+            flush = suit_counts >= 5
+            cls._flush_suit = np.where(flush.any(axis=1), flush.argmax(axis=1), -1).astype(np.int8)
+            masks = [mask for mask in range(1 << 13) if bin(mask).count("1") >= 5]
+            table = np.zeros(1 << 13, dtype=np.uint16)
+            table[masks] = cls._strength_class([_best_flush_strength(mask) for mask in masks])
+            cls._flush_table = table
+            ids = np.arange(NUM_CARDS)
+            cls._card_keys = (np.array(RANK_KEYS, dtype=np.int64)[ids >> 2] << _SUIT_BITS) \
+                | np.array(SUIT_KEYS, dtype=np.int64)[ids & 3]
+        return cls._flush_suit, cls._flush_table
+
+    @classmethod
+    def rank_table(cls, num_cards: int = 7) -> np.ndarray:
+        """Return the table of the best non-flush class of num_cards cards, indexed by their RANK_KEYS sum."""
+        if num_cards not in cls._rank_tables:
+            if not 5 <= num_cards <= 7:
+                raise ValueError("HoldemHandRanker ranks 5, 6 or 7 cards")
+            multisets = [c for c in combinations_with_replacement(range(13), num_cards) if max(map(c.count, c)) <= 4]
+            keys = np.array([sum(RANK_KEYS[r] for r in c) for c in multisets])
+            if len(np.unique(keys)) != len(keys):
+                raise ValueError("RANK_KEYS sums collide")
+            table = np.zeros(keys.max() + 1, dtype=np.uint16)
+            table[keys] = cls._strength_class([_best_rank_strength([c.count(r) for r in range(13)])
+                                               for c in multisets])
+            cls._rank_tables[num_cards] = table
+        return cls._rank_tables[num_cards]
+
+    @classmethod
+    def strength_from_ids(cls, ids) -> int:
+        """Return the class of the best hand of 5 to 7 card ids."""
+        flush_suit, flush_table = cls.flush_tables()
+        rank_table = cls.rank_table(len(ids))
+        rank_sum = suit_sum = 0
+        for card in ids:
+            rank_sum += RANK_KEYS[card >> 2]
+            suit_sum += SUIT_KEYS[card & 3]
+        suit = flush_suit[suit_sum]
+        if suit < 0:
+            return int(rank_table[rank_sum])
+        return int(flush_table[sum(1 << (card >> 2) for card in ids if card & 3 == suit)])
+
+    @classmethod
+    def hand_strength(cls, cards) -> int:
+        """Return the class of the best 5-card hand of 5 to 7 cards, higher is better."""
+        return cls.strength_from_ids([card.id for card in cards])
+
+    @classmethod
+    def rank_hand(cls, cards) -> int:
+        """Return the class of the best 5-card hand of 5 to 7 cards, higher is better."""
+        return cls.hand_strength(cards)
+
+    @classmethod
+    def category(cls, strength: int) -> int:
+        """Return the category of a class, 0 for high card up to 8 for a straight flush."""
+        return int(cls._class_table()[strength - 1] >> 20)
+
+    @classmethod
+    def strength_batch(cls, hands: np.ndarray) -> np.ndarray:
+        """Return the class of every row of an (N, 5 to 7) array of card ids."""
+        hands = np.asarray(hands)
+        if hands.ndim != 2:
+            raise ValueError("hands must be an (N, k) array of card ids")
+        flush_suit, flush_table = cls.flush_tables()
+        rank_table = cls.rank_table(hands.shape[1])
+        strengths = np.empty(len(hands), dtype=np.uint16)
+        for start in range(0, len(hands), _BATCH_ROWS):
+            chunk = hands[start:start + _BATCH_ROWS]
+            # Column by column, which numpy does faster than a sum along short rows
+            sums = cls._card_keys[chunk[:, 0]]
+            for i in range(1, chunk.shape[1]):
+                sums += cls._card_keys[chunk[:, i]]
+            out = rank_table[sums >> _SUIT_BITS]
+            suits = flush_suit[sums & (1 << _SUIT_BITS) - 1]
+            rows = np.flatnonzero(suits >= 0)
+            if len(rows):
+                flushes = chunk[rows].astype(np.int64)
+                in_suit = (flushes & 3) == suits[rows, None]
+                masks = np.where(in_suit, 1 << (flushes >> 2), 0).sum(axis=1)
+                out[rows] = flush_table[masks]
+            strengths[start:start + len(chunk)] = out
+        return strengths
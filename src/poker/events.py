@@ -0,0 +1,112 @@
+import logging
+import sys
+from collections import Counter
+
+# How each engine event is rendered as text, one template per output line
+TEMPLATES: dict[str, tuple[str, ...]] = {
+    "antes_posted": ("Players posted antes", "Pot: {pot}"),
+    "hands_dealt": ("Hands dealt",),
+    "hand": ("Player {player} hand: {hand}",),
+    "betting_started": ("{street} betting",),
+    "fold": ("Player {player} folded",),
+    "check": ("Player {player} checked",),
+    "call": ("Player {player} called {amount}", "Pot: {pot}"),
+    "raise": ("Player {player} raised to {amount}", "Pot: {pot}"),
+    "betting_ended": ("End of {street_lower} betting. Pot: {pot}",),
+    "board": ("{street}: {cards}",),
+    "won": ("Player {player} won {amount} chips",),
+    "stack": ("Player {player} stack: {stack}",),
+}
+
+
+def render(event: str, fields: dict) -> list[str]:
+    """Render an event as the lines the engine used to print."""
+    if "street" in fields:
+        fields = dict(fields, street_lower=fields["street"].lower())
+    return [template.format(**fields) for template in TEMPLATES[event]]
+
+
+class EventSink:
+    """Receive engine events and print them, the default engine output."""
+
+    def emit(self, event: str, **fields) -> None:
+        """Handle one event."""
+        for line in render(event, fields):
+            print(line)
+
+
+class NullSink(EventSink):
+    """Discard every event, for headless simulation."""
+
+    def emit(self, event: str, **fields) -> None:
+        """Handle one event."""
+        pass
+
+
+class BufferedSink(EventSink):
+    """Keep events in memory and render them only when asked."""
+
+    def __init__(self) -> None:
+        self.events: list[tuple[str, dict]] = []
+
+    def emit(self, event: str, **fields) -> None:
+        """Handle one event."""
+        self.events.append((event, fields))
+
+    def lines(self) -> list[str]:
+        """Render the buffered events as text lines."""
+        return [line for event, fields in self.events for line in render(event, fields)]
+
+    def flush(self, stream=None) -> None:
+        """Write the buffered events to a stream and clear the buffer."""
+        stream = stream or sys.stdout
+        stream.write("".join(line + "\n" for line in self.lines()))
+        self.events.clear()
+
+
+class LoggingSink(EventSink):
+    """Send events to a logger, with the raw fields attached to each record."""
+
+    def __init__(self, logger: logging.Logger = None, level: int = logging.DEBUG) -> None:
+        self.logger: logging.Logger = logger or logging.getLogger("poker")
+        self.level: int = level
+
+    def emit(self, event: str, **fields) -> None:
+        """Handle one event."""
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, " | ".join(render(event, fields)), extra={"event": event, "fields": fields})
+
+
+class CountingSink(EventSink):
+    """Count events by name and by (name, player) without rendering them."""
+
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+        self.player_counts: Counter = Counter()
+
+    def emit(self, event: str, **fields) -> None:
+        """Handle one event."""
+        self.counts[event] += 1
+        if "player" in fields:
+            self.player_counts[event, fields["player"]] += 1
+
+
+class TeeSink(EventSink):
+    """Pass every event on to several sinks."""
+
+    def __init__(self, *sinks: EventSink) -> None:
+        self.sinks: tuple[EventSink, ...] = sinks
+
+    def emit(self, event: str, **fields) -> None:
+        """Handle one event."""
+        for sink in self.sinks:
+            sink.emit(event, **fields)
+
+
+SINKS: dict[str, type] = {
+    "print": EventSink,
+    "null": NullSink,
+    "buffer": BufferedSink,
+    "log": LoggingSink,
+    "count": CountingSink,
+}
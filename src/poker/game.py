@@ -1,7 +1,11 @@
 from __future__ import annotations
 import random
+import numpy as np
 from cardecky import Deck, HandRanker
-from enum import Enum
+from agents import DecisionState, RandomAgent
+from betting import LEGAL_ACTIONS, BettingRound
+from events import EventSink
+from rules import BOARD_CARDS, HOLE_CARDS, ROUND_LIMITS, START_OFFSETS, PlayerAction
 
 
 class Player:
@@ -67,31 +71,164 @@ class Pot:
         self.total += amount
 
     def award_pot(self, winners: list[Player]):
-        """Award the pot to the winner(s)."""
-        if len(winners) > 1:
-            split_amount = self.total // len(winners)
-            for winner in winners:
-                winner.stack += split_amount
-            self.total = 0
-        else:
-            winner: Player = winners[0] 
-            winner.stack += self.total
-            self.total = 0
+        """Award the pot to the winner(s), odd chips going one each to the first winners."""
+        split_amount, odd_chips = divmod(self.total, len(winners))
+        for i, winner in enumerate(winners):
+            winner.stack += split_amount + (i < odd_chips)
+        self.total = 0
+
+    def settle(self, players: list[Player], strengths: list[int], button: int = 0) -> list[int]:
+        """Award the main pot and every side pot, return what each player won.
+
+        ``strengths`` is aligned with players, non-negative with higher
+        better, and ignored for players who folded. Chips in the pot that
+        no player put in join the main pot, see settle_pots.
+        """
+        contributions = [player.chips_in_play for player in players]
+        dead = self.total - sum(contributions)
+        if dead < 0:
+            raise ValueError("the players put in more chips than the pot holds")
+        live = [strength if player.status else -1 for player, strength in zip(players, strengths)]
+        winnings = settle_pots(contributions, live, button, dead)
+        for player, amount in zip(players, winnings):
+            player.stack += amount
+        self.total = 0
+        return winnings
+
+
+def settle_pots(contributions: list[int], strengths: list[int], button: int = 0, dead: int = 0) -> list[int]:
+    """Split the main pot and every side pot of one hand, return what each seat won.
+
+    A unique best hand that put in the most chips wins every pot. Otherwise
+    pots are layered by the seats' contributions in one pass over the seats
+    sorted by it: each layer holds what everyone put in between two
+    contribution levels and goes to the best strength among the seats still
+    in the hand that reached it. Folded seats, with strength -1, leave their
+    chips in the layers they reached, a layer no live seat reached joins the
+    highest contested one, and ``dead`` chips join the main pot. Odd chips
+    go one each to the layer's winners starting left of the button.
+    """
+    num_players = len(contributions)
+    winner, top, tied = -1, -1, False
+    for seat, strength in enumerate(strengths):
+        if strength > top:
+            winner, top, tied = seat, strength, False
+        elif strength == top:
+            tied = True
+    winnings = [0] * num_players
+    if winner >= 0 and not tied and contributions[winner] >= max(contributions):
+        winnings[winner] = sum(contributions) + dead
+        return winnings
+
+    # Seats in odd-chip order, the stable sort keeps it among equal contributions
+    seats = [(button + 1 + i) % num_players for i in range(num_players)]
+    order = sorted(seats, key=contributions.__getitem__)
+    # best[k] is the best live strength among the seats from position k of the order on
+    best = [-1] * (num_players + 1)
+    for k in range(num_players - 1, -1, -1):
+        best[k] = max(best[k + 1], strengths[order[k]])
+    # Live seats by strength, each in odd-chip order
+    by_strength = {}
+    for seat in seats:
+        if strengths[seat] >= 0:
+            by_strength.setdefault(strengths[seat], []).append(seat)
+
+    # [position in the order, amount] per contested layer, the main pot first
+    layers = []
+    level = 0
+    for k, seat in enumerate(order):
+        contribution = contributions[seat]
+        if contribution > level:
+            amount = (contribution - level) * (num_players - k)
+            if best[k] >= 0:
+                layers.append([k, amount])
+            elif layers:
+                layers[-1][1] += amount
+            else:
+                layers.append([0, amount])
+            level = contribution
+    if layers:
+        layers[0][1] += dead
+    elif dead:
+        layers.append([0, dead])
+
+    for k, amount in layers:
+        level = contributions[order[k]]
+        winners = [seat for seat in by_strength[best[k]] if contributions[seat] >= level]
+        share, odd_chips = divmod(amount, len(winners))
+        for i, seat in enumerate(winners):
+            winnings[seat] += share + (i < odd_chips)
+    return winnings
+
+
+def settle_batch(contributions: np.ndarray, strengths: np.ndarray, button: np.ndarray) -> np.ndarray:
+    """Settle the pots of many tables at once like settle_pots and return the (N, P) chips won.
+
+    ``contributions`` holds every seat's chips_in_play, which make up the
+    whole pot, and ``strengths`` is -1 for seats that folded.
+    """
+    contributions = np.asarray(contributions, dtype=np.int64)
+    strengths = np.asarray(strengths, dtype=np.int64)
+    num_tables, num_players = contributions.shape
+    rows = np.arange(num_tables)[:, None]
+    positions = np.arange(num_players)
+    # Columns in odd-chip order, starting left of each table's button
+    seats = (np.asarray(button)[:, None] + 1 + positions) % num_players
+    contributions = contributions[rows, seats]
+    strengths = strengths[rows, seats]
+
+    order = np.argsort(contributions, axis=1, kind="stable")
+    levels = contributions[rows, order]
+    amounts = np.diff(levels, axis=1, prepend=0) * (num_players - positions)
+    best = np.maximum.accumulate(strengths[rows, order][:, ::-1], axis=1)[:, ::-1]
+    # Equal contributions share a layer, which is open to all of them
+    start = np.maximum.accumulate(np.where(amounts > 0, positions, 0), axis=1)
+    best = best[rows, start]
+    # Layers no active player reached join the highest contested one
+    contested = best >= 0
+    last = start[np.arange(num_tables), contested.sum(axis=1) - 1]
+    uncontested = np.where(contested, 0, amounts).sum(axis=1)
+    amounts = np.where(contested, amounts, 0)
+    amounts[np.arange(num_tables), last] += uncontested
+
+    winnings = np.zeros((num_tables, num_players), dtype=np.int64)
+    for k in range(num_players):
+        winners = (contributions >= levels[:, k, None]) & (strengths == best[:, k, None]) & (strengths >= 0)
+        count = np.maximum(winners.sum(axis=1), 1)
+        share, odd_chips = np.divmod(amounts[:, k], count)
+        first = np.cumsum(winners, axis=1) <= odd_chips[:, None]
+        winnings += winners * (share[:, None] + first)
+    settled = np.empty_like(winnings)
+    settled[rows, seats] = winnings
+    return settled
 
 
 class Dealer:
-    def __init__(self, pot: Pot, deck: Deck, button: int = 0, current_bet: int = 0):
+    def __init__(self, pot: Pot, deck: Deck, button: int = 0, current_bet: int = 0, hand_ranker=HandRanker,
+                 hole_cards: int = HOLE_CARDS, board_cards=BOARD_CARDS):
         self.pot: Pot = pot
         self.deck: Deck = deck
         self.button: int = button
         self.current_bet: int = current_bet
         self.board: list = []  # To store the flop and turn cards
+        # Anything with a hand_strength(cards) method, e.g. evaluator.LookupHandRanker
+        self.hand_ranker = hand_ranker
+        # Deal schedule: hole cards per player and board cards dealt before each betting round,
+        # e.g. rules.HOLDEM_HOLE_CARDS and rules.HOLDEM_BOARD_CARDS with evaluator.HoldemHandRanker
+        self.hole_cards: int = hole_cards
+        self.board_cards: tuple[int, ...] = tuple(board_cards)
 
     def deal_hand(self, players: list[Player]) -> None:
         """Deal the hand to the players."""
         for player in players:
             if player is not None:
-                player.hand = self.deck.deal_cards(1)
+                player.hand = self.deck.deal_cards(self.hole_cards)
+
+    def deal_street(self, round: int) -> list:
+        """Deal the board cards of a betting round."""
+        cards = self.deck.deal_cards(self.board_cards[round])
+        self.board.extend(cards)
+        return cards
 
     def move_button(self, players: list[Player]) -> None:
         """Move the button to the next player."""
@@ -104,36 +241,39 @@ class Dealer:
 
     def deal_flop(self) -> list:
         """Deal the flop."""
-        flop = self.deck.deal_cards(1)
-        self.board.extend(flop)
-        return flop
+        return self.deal_street(1)
 
     def deal_turn(self) -> list:
         """Deal the turn."""
-        turn = self.deck.deal_cards(1)
-        self.board.extend(turn)
-        return turn
+        return self.deal_street(2)
+
+    def deal_river(self) -> list:
+        """Deal the river."""
+        return self.deal_street(3)
 
     def active_players_count(self, players: list[Player]):
         """Count the number of active players."""
         return sum(1 for player in players if player.status)
 
+    def showdown_strengths(self, players: list[Player]) -> list[int]:
+        """Return the strength of every player's hand with the board, -1 for players who folded."""
+        return [self.hand_ranker.hand_strength(player.hand + self.board) if player.status else -1
+                for player in players]
+
     def determine_winner(self, players: list[Player]) -> list[Player]:
         """Determine the winner(s)."""
-        best_rank = None
+        best_strength = None
         winners = []
         for player in players:
             if player.status is True:
                 combined_hand: list = player.hand + self.board
-                ranked_hand = HandRanker.rank_hand(combined_hand)
-                if best_rank is None or (ranked_hand and ranked_hand[0] < best_rank):
-                    best_rank = ranked_hand[0]
-                    winners = [(player, ranked_hand)]
-                elif ranked_hand and ranked_hand[0] == best_rank:
-                    winners.append((player, ranked_hand))
-
-
-            return [winner for winner, _ in winners]
+                strength: int = self.hand_ranker.hand_strength(combined_hand)
+                if best_strength is None or strength > best_strength:
+                    best_strength = strength
+                    winners = [player]
+                elif strength == best_strength:
+                    winners.append(player)
+        return winners
 
 class Table:
     def __init__(self, seats) -> None:
@@ -149,74 +289,89 @@ class Table:
             raise IndexError("Invalid seat index")
         self.seats[seat] = player
 
-class PlayerAction(Enum):
-    """Enum for player actions."""
-    FOLD = 1
-    CHECK = 2
-    CALL = 3
-    RAISE = 4
-
 class Game:
-    def __init__(self, players, dealer, betting_limit, current_bet=0) -> None:
+    def __init__(self, players, dealer, betting_limit, current_bet=0, sink: EventSink = None, rng=None,
+                 agents: dict = None, round_limits=ROUND_LIMITS, start_offsets=START_OFFSETS) -> None:
         self.players = players
         self.dealer = dealer
         self.betting_limit = betting_limit
         self.current_bet = current_bet
         self.num_players = len(self.players)
+        # Where actions are reported, events.NullSink() for headless runs
+        self.sink: EventSink = sink if sink is not None else EventSink()
+        # Anything with a choice method, defaults to the global random module
+        self.rng = rng if rng is not None else random
+        # Agent per player_ID, players without one act uniformly at random
+        self.agents: dict = agents if agents is not None else {}
+        self.default_agent = RandomAgent(rng=self.rng)
+        # Actions of the current hand, one tuple per betting round
+        self.history: tuple[tuple[PlayerAction, ...], ...] = ()
+        # Bet size and first actor offset from the button per betting round
+        self.round_limits: tuple[int, ...] = tuple(round_limits)
+        self.start_offsets: tuple[int, ...] = tuple(start_offsets)
+        # Reused by every betting round
+        self.betting: BettingRound = BettingRound([], 0, 0, 0)
+
+    def reseed(self, rng) -> None:
+        """Draw cards and random actions from a new generator, e.g. one seeded per hand."""
+        self.rng = rng
+        self.default_agent.rng = rng
+        self.dealer.deck.rng = rng
+
+    def new_hand(self) -> None:
+        """Forget the betting history of the previous hand."""
+        self.history = ()
+
+    def decide(self, player, available_actions, current_bet, raise_amount) -> PlayerAction:
+        """Ask the player's agent for an action."""
+        state = DecisionState(player.player_ID, tuple([card.id for card in player.hand]),
+                              tuple([card.id for card in self.dealer.board]), available_actions, current_bet,
+                              raise_amount, self.dealer.pot.total, player.stack, self.history)
+        return self.agents.get(player.player_ID, self.default_agent).act([state])[0]
 
     def betting_round(self, button, start_offset, round_limit) -> None:
         """Handle the logic for a round of betting."""
-        current_bet = 0
-        raise_occurred = True
-        last_raiser = None
-        players_acted = set()
-        start_position = (button + start_offset) % self.num_players
-
-        while raise_occurred:
-            raise_occurred = False
-            for i in range(self.num_players):
-                current_player = (i + start_position) % self.num_players
-                player = self.players[current_player]
-
-                if player is None or not player.status:
-                    continue
-
-                if player in players_acted:
-                    if player != last_raiser or not raise_occurred:
-                        continue
-
-                if current_bet == 0:
-                    available_actions = [PlayerAction.CHECK, PlayerAction.RAISE] 
-                elif player == last_raiser:
-                    continue
-                else:
-                    available_actions: list[PlayerAction] = [PlayerAction.FOLD, PlayerAction.CALL, PlayerAction.RAISE]
-
-                action: PlayerAction = random.choice(available_actions)
-                players_acted.add(player)
-
-                if action == PlayerAction.FOLD:
-                    player.fold()
-                    print(f"Player {player} folded")
-                elif action == PlayerAction.CHECK:
-                    player.check()
-                    print(f"Player {player} checked")
-                elif action == PlayerAction.CALL:
-                    player.call(amount=current_bet, pot=self.dealer.pot)
-                    print(f"Player {player} called {current_bet}")
-                    print(f"Pot: {self.dealer.pot.total}")
-                elif action == PlayerAction.RAISE:
-                    raise_amount = current_bet + round_limit
-                    player.bet(amount=raise_amount, pot=self.dealer.pot)
-                    print(f"Player {player} raised to {raise_amount}")
-                    print(f"Pot: {self.dealer.pot.total}")
-                    current_bet = raise_amount
-                    self.dealer.current_bet = raise_amount
-                    raise_occurred = True
-                    last_raiser = player
-                    players_acted.clear()
-            if not raise_occurred:
-                break
+        players = self.players
+        pot = self.dealer.pot
+        state = self.betting
+        # The round's stacks list is refilled in place, only a change of table size replaces it
+        stacks = state.stacks if len(state.stacks) == len(players) else [0] * len(players)
+        active = 0
+        for seat, player in enumerate(players):
+            if player is None:
+                stacks[seat] = 0
+                continue
+            stacks[seat] = player.stack
+            if player.status:
+                active |= 1 << seat
+        state.reset(stacks, active, (button + start_offset) % self.num_players, round_limit)
+        self.history += ((),)
+
+        while state.to_act >= 0:
+            player = players[state.to_act]
+            current_bet = state.current_bet
+            raise_amount = current_bet + round_limit
+            action: PlayerAction = self.decide(player, LEGAL_ACTIONS[state.legal], current_bet, raise_amount)
+            state.apply(action.value - 1)
+            self.history = self.history[:-1] + (self.history[-1] + (action,),)
+
+            if action == PlayerAction.FOLD:
+                player.fold()
+                self.sink.emit("fold", player=player.player_ID)
+            elif action == PlayerAction.CHECK:
+                player.check()
+                self.sink.emit("check", player=player.player_ID)
+            elif action == PlayerAction.CALL:
+                player.call(amount=current_bet, pot=pot)
+                self.sink.emit("call", player=player.player_ID, amount=current_bet, pot=pot.total)
+            elif action == PlayerAction.RAISE:
+                player.bet(amount=raise_amount, pot=pot)
+                self.sink.emit("raise", player=player.player_ID, amount=raise_amount, pot=pot.total)
+                self.dealer.current_bet = raise_amount
+
+    def street_betting(self, round: int, button) -> None:
+        """Betting for a betting round, with its limit and first actor."""
+        self.betting_round(button=button, start_offset=self.start_offsets[round], round_limit=self.round_limits[round])
 
     def preflop_betting(self, button, round_limit) -> None:
         """Preflop betting."""
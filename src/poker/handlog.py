@@ -0,0 +1,212 @@
+import argparse
+import numpy as np
+from events import EventSink
+from rules import ANTE, PlayerAction
+
+MAGIC = b"RIHH"
+VERSION = 2
+MAX_PLAYERS = 9  # Seats at a Table
+# Actions kept per hand; Game.betting_round has no raise cap, so a longer hand keeps its first
+# MAX_ACTIONS actions and is flagged truncated, its pot and stack deltas stay exact
+MAX_ACTIONS = 64
+# Header: magic, version, record size, padded to 16 bytes
+HEADER = np.dtype([("magic", "S4"), ("version", "<u2"), ("record_size", "<u2"), ("reserved", "V8")])
+# One hand. Cards are ids with -1 for none; each action byte is seat << 4 | round << 2 | action column
+RECORD = np.dtype([
+    ("seed", "<u8"),
+    ("num_players", "u1"),
+    ("button", "u1"),
+    ("num_actions", "u1"),
+    ("showdown", "?"),
+    ("truncated", "?"),
+    ("pot", "<u2"),
+    ("hole", "i1", (MAX_PLAYERS,)),
+    ("board", "i1", (2,)),
+    ("actions", "u1", (MAX_ACTIONS,)),
+    ("stack_deltas", "<i2", (MAX_PLAYERS,)),
+])
+
+
+# Action column of each action event
+_EVENT_ACTIONS: dict[str, int] = {action.name.lower(): action.value - 1 for action in PlayerAction}
+
+
+def encode_action(seat: int, round: int, action: PlayerAction) -> int:
+    """Pack one action into a byte."""
+    return seat << 4 | round << 2 | (action.value - 1)
+
+
+def decode_actions(record) -> list[tuple[int, int, PlayerAction]]:
+    """Return the (seat, round, action) sequence of a record."""
+    return [(code >> 4, code >> 2 & 3, PlayerAction((code & 3) + 1))
+            for code in record["actions"][:record["num_actions"]].tolist()]
+
+
+class HandHistoryWriter:
+    """Stream fixed-width hand records to a binary file.
+
+    Records are collected in a NumPy buffer and written in blocks, so the
+    file is a 16-byte header followed by a flat array of RECORD.
+    """
+
+    def __init__(self, path, buffer_size: int = 4096) -> None:
+        self.file = open(path, "wb")
+        header = np.zeros(1, dtype=HEADER)
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        header["record_size"] = RECORD.itemsize
+        self.file.write(header.tobytes())
+        self.buffer: np.ndarray = np.zeros(buffer_size, dtype=RECORD)
+        self.size: int = 0
+        self.hands: int = 0
+
+    def next_record(self) -> np.void:
+        """Return the next empty slot of the buffer to fill in."""
+        if self.size == len(self.buffer):
+            self.flush()
+        record = self.buffer[self.size]
+        record["hole"] = -1
+        record["board"] = -1
+        self.size += 1
+        self.hands += 1
+        return record
+
+    def write(self, records: np.ndarray) -> None:
+        """Write an array of RECORD at once, e.g. from a VectorEnv run."""
+        self.flush()
+        self.file.write(np.ascontiguousarray(records, dtype=RECORD).tobytes())
+        self.hands += len(records)
+
+    def flush(self) -> None:
+        """Write the buffered records."""
+        self.file.write(self.buffer[:self.size].tobytes())
+        self.buffer[:self.size] = 0
+        self.size = 0
+        self.file.flush()
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self) -> 'HandHistoryWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class HandHistorySink(EventSink):
+    """Turn the events of play_round into hand records.
+
+    A hand starts at "antes_posted" and is written once every player's
+    "stack" has been reported. Set ``seed`` before each hand to the seed
+    that replays it.
+    """
+
+    def __init__(self, writer: HandHistoryWriter, num_players: int, button: int = 0) -> None:
+        self.writer: HandHistoryWriter = writer
+        self.num_players: int = num_players
+        self.button: int = button
+        self.seed: int = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.hole: dict[int, list[int]] = {}
+        self.board: list[int] = []
+        self.actions: list[int] = []
+        self.contributed: list[int] = [ANTE] * self.num_players
+        self.folded: set[int] = set()
+        self.winnings: dict[int, int] = {}
+        self.pot: int = 0
+        self.stacks_reported: int = 0
+        self.round: int = -1
+        self.truncated: bool = False
+
+    def emit(self, event: str, **fields) -> None:
+        """Handle one event."""
+        if event == "antes_posted":
+            self._reset()
+        elif event == "hand":
+            self.hole[fields["player"]] = [card.id for card in fields["hand"]]
+        elif event == "board":
+            self.board.extend(card.id for card in fields["cards"])
+        elif event == "betting_started":
+            self.round += 1
+        elif event in _EVENT_ACTIONS:
+            player = fields["player"]
+            if len(self.actions) < MAX_ACTIONS:
+                self.actions.append(player << 4 | self.round << 2 | _EVENT_ACTIONS[event])
+            else:
+                self.truncated = True
+            self.contributed[player] += fields.get("amount", 0)
+            if event == "fold":
+                self.folded.add(player)
+        elif event == "won":
+            self.winnings[fields["player"]] = fields["amount"]
+            self.pot += fields["amount"]
+        elif event == "stack":
+            self.stacks_reported += 1
+            if self.stacks_reported == self.num_players:
+                self._write()
+
+    def _write(self) -> None:
+        record = self.writer.next_record()
+        record["seed"] = self.seed
+        record["num_players"] = self.num_players
+        record["button"] = self.button
+        record["num_actions"] = len(self.actions)
+        record["showdown"] = self.num_players - len(self.folded) > 1
+        record["truncated"] = self.truncated
+        record["pot"] = self.pot
+        for player, cards in self.hole.items():
+            record["hole"][player] = cards[0]
+        record["board"][:len(self.board)] = self.board
+        record["actions"][:len(self.actions)] = self.actions
+        for player in range(self.num_players):
+            record["stack_deltas"][player] = self.winnings.get(player, 0) - self.contributed[player]
+
+
+def read_hands(path) -> np.memmap:
+    """Map a hand-history file as a read-only array of RECORD without loading it."""
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) == 0 or header["magic"][0] != MAGIC:
+        raise ValueError(f"{path} is not a hand-history file")
+    if header["version"][0] != VERSION or header["record_size"][0] != RECORD.itemsize:
+        raise ValueError(f"{path} was written with an incompatible record format")
+    return np.memmap(path, dtype=RECORD, mode="r", offset=HEADER.itemsize)
+
+
+def iter_chunks(hands: np.ndarray, chunk_size: int = 1 << 20):
+    """Yield consecutive slices of a record array, so only one chunk is paged in at a time."""
+    for start in range(0, len(hands), chunk_size):
+        yield hands[start:start + chunk_size]
+
+
+def summarize(hands: np.ndarray, chunk_size: int = 1 << 20) -> dict:
+    """Return hand, showdown, pot and stack delta totals, aggregated chunk by chunk."""
+    totals = {"hands": len(hands), "showdowns": 0, "pot": 0, "stack_deltas": np.zeros(MAX_PLAYERS, dtype=np.int64)}
+    for chunk in iter_chunks(hands, chunk_size):
+        totals["showdowns"] += int(chunk["showdown"].sum())
+        totals["pot"] += int(chunk["pot"].sum(dtype=np.int64))
+        totals["stack_deltas"] += chunk["stack_deltas"].sum(axis=0, dtype=np.int64)
+    return totals
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Summarize a binary hand-history file.")
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=1 << 20)
+    args = parser.parse_args(argv)
+    hands = read_hands(args.path)
+    totals = summarize(hands, chunk_size=args.chunk_size)
+    num_players = int(hands["num_players"].max()) if len(hands) else 0
+    print(f"Hands: {totals['hands']:,}")
+    print(f"Showdowns: {totals['showdowns']:,}")
+    print(f"Average pot: {totals['pot'] / max(totals['hands'], 1):.2f}")
+    for player, delta in enumerate(totals["stack_deltas"][:num_players].tolist()):
+        print(f"Player {player} stack delta: {delta:+d}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+from betting import BettingRound
+from evaluator import HoldemHandRanker, LookupHandRanker
+from game import settle_pots
+from rules import ANTE, BOARD_CARDS, HOLE_CARDS, ROUND_LIMITS, START_OFFSETS
+
+
+def strength_from_ids(ids) -> int:
+    """Rank a hole card plus board of card ids, Rhode Island's three cards or Hold'em's five to seven."""
+    return LookupHandRanker.strength_from_ids(*ids) if len(ids) == 3 else HoldemHandRanker.strength_from_ids(ids)
+
+
+class HandState:
+    """A hand in progress as a few integers over a dealt deck, for tree search.
+
+    ``deck`` is a tuple of card ids in deal order, shared by clones: each
+    seat's hole cards in turn, then the board, so dealing a street only
+    moves the count of board cards. Stacks and contributions are lists of
+    ints and the betting is a BettingRound, so apply() changes one seat's
+    chips and a few integers, and undo() puts them back from a stack of
+    small tuples. snapshot() and restore() do the same for jumps between
+    branches, and clone() gives an independent copy.
+
+    Betting follows Game.betting_round, optionally capped at ``max_raises``
+    per round, and the hand ends when one player is left or the last
+    round's betting is over.
+    """
+    __slots__ = ("deck", "num_players", "hole_cards", "button", "round_limits", "start_offsets", "board_dealt",
+                 "max_raises", "stacks", "contributions", "round", "betting", "terminal", "_undo")
+
+    def __init__(self, deck, stacks: list[int], button: int = 0, ante: int = ANTE, round_limits=ROUND_LIMITS,
+                 start_offsets=START_OFFSETS, board_cards=BOARD_CARDS, hole_cards: int = HOLE_CARDS,
+                 max_raises: int = None) -> None:
+        """Post the antes from ``stacks`` and start the first betting round."""
+        if min(stacks) < ante:
+            raise ValueError("every player must be able to post the ante")
+        self._setup(tuple(deck), len(stacks), hole_cards, button, round_limits, start_offsets, board_cards,
+                    max_raises)
+        self.stacks = [stack - ante for stack in stacks]
+        self.contributions = [ante] * self.num_players
+        self.terminal = False
+        self.betting = BettingRound(self.stacks, (1 << self.num_players) - 1, 0, 0, max_raises)
+        self._start_round(0)
+
+    def _setup(self, deck: tuple, num_players: int, hole_cards: int, button: int, round_limits, start_offsets,
+               board_cards, max_raises: int) -> None:
+        if len(deck) < num_players * hole_cards + sum(board_cards):
+            raise ValueError("the deck is too short for the hole cards and the board")
+        self.deck: tuple[int, ...] = deck
+        self.num_players: int = num_players
+        self.hole_cards: int = hole_cards
+        self.button: int = button
+        self.round_limits: tuple[int, ...] = tuple(round_limits)
+        self.start_offsets: tuple[int, ...] = tuple(start_offsets)
+        # Board cards dealt by the start of each round
+        dealt = 0
+        self.board_dealt: list[int] = []
+        for cards in board_cards:
+            dealt += cards
+            self.board_dealt.append(dealt)
+        self.max_raises: int = max_raises
+        self._undo: list[tuple] = []
+
+    @classmethod
+    def from_game(cls, game, max_raises: int = None) -> 'HandState':
+        """Copy the hand a Game is betting on, e.g. from an agent asked to act.
+
+        The cards still in the dealer's deck follow the dealt ones in their
+        current order; a search that must not see them swaps ``deck`` for a
+        fresh deal keeping the cards its player has seen.
+        """
+        players, dealer = game.players, game.dealer
+        if any(player is None for player in players):
+            raise ValueError("every seat must be taken")
+        state = cls.__new__(cls)
+        deck = dealer.deck
+        rest = [card if isinstance(card, int) else card.id for card in deck.deck[deck.cards_used:]]
+        dealt = [card.id for player in players for card in player.hand] + [card.id for card in dealer.board]
+        state._setup(tuple(dealt + rest), len(players), dealer.hole_cards, dealer.button, game.round_limits,
+                     game.start_offsets, dealer.board_cards, max_raises)
+        state.stacks = [player.stack for player in players]
+        state.contributions = [player.chips_in_play for player in players]
+        state.round = len(game.history) - 1
+        state.terminal = False
+        state.betting = game.betting.copy(state.stacks)
+        if max_raises is not None:
+            state.betting.limit_raises(max_raises)
+        if state.betting.to_act < 0:
+            state._end_round()
+        return state
+
+    def _start_round(self, round: int) -> None:
+        self.round = round
+        start = (self.button + self.start_offsets[round]) % self.num_players
+        self.betting.reset(self.stacks, self.betting.active, start, self.round_limits[round], self.max_raises)
+
+    def _end_round(self) -> None:
+        if self.betting.num_active <= 1 or self.round == len(self.round_limits) - 1:
+            self.terminal = True
+        else:
+            self._start_round(self.round + 1)
+
+    @property
+    def to_act(self) -> int:
+        """The seat to act, -1 once the hand is over."""
+        return -1 if self.terminal else self.betting.to_act
+
+    def legal_actions(self) -> int:
+        """Return the mask of the action columns open to the seat to act, 0 once the hand is over."""
+        return 0 if self.terminal else self.betting.legal
+
+    @property
+    def pot(self) -> int:
+        """Chips put in by every seat this hand."""
+        return sum(self.contributions)
+
+    def hand(self, seat: int) -> tuple[int, ...]:
+        """Return the hole card ids of a seat."""
+        return self.deck[seat * self.hole_cards:(seat + 1) * self.hole_cards]
+
+    def board(self) -> tuple[int, ...]:
+        """Return the board card ids dealt so far."""
+        start = self.num_players * self.hole_cards
+        return self.deck[start:start + self.board_dealt[self.round]]
+
+    def is_active(self, seat: int) -> bool:
+        """Return whether a seat is still in the hand."""
+        return bool(self.betting.active >> seat & 1)
+
+    def apply(self, action: int) -> int:
+        """Play an action column for the seat to act, moving to the next round when betting ends.
+
+        Returns the chips put in.
+        """
+        betting = self.betting
+        if self.terminal:
+            raise ValueError("the hand is over")
+        seat = betting.to_act
+        snapshot = betting.snapshot()
+        amount = betting.apply(action)
+        self._undo.append((seat, amount, self.round, snapshot))
+        self.contributions[seat] += amount
+        if betting.to_act < 0:
+            self._end_round()
+        return amount
+
+    def undo(self) -> None:
+        """Take back the last action applied."""
+        seat, amount, self.round, snapshot = self._undo.pop()
+        self.stacks[seat] += amount
+        self.contributions[seat] -= amount
+        self.terminal = False
+        self.betting.restore(snapshot)
+
+    def snapshot(self) -> tuple:
+        """Return everything apply() changes, for restore()."""
+        return (self.round, self.terminal, self.betting.snapshot(), tuple(self.stacks), tuple(self.contributions),
+                len(self._undo))
+
+    def restore(self, snapshot: tuple) -> None:
+        """Return to a snapshot of this state, dropping any undo entries recorded after it."""
+        self.round, self.terminal, betting, stacks, contributions, depth = snapshot
+        self.betting.restore(betting)
+        self.stacks[:] = stacks
+        self.contributions[:] = contributions
+        del self._undo[depth:]
+
+    def clone(self) -> 'HandState':
+        """Return an independent copy sharing the deck, with its own undo stack."""
+        state = HandState.__new__(HandState)
+        for name in ("deck", "num_players", "hole_cards", "button", "round_limits", "start_offsets", "board_dealt",
+                     "max_raises", "round", "terminal"):
+            setattr(state, name, getattr(self, name))
+        state.stacks = list(self.stacks)
+        state.contributions = list(self.contributions)
+        state.betting = self.betting.copy(state.stacks)
+        state._undo = list(self._undo)
+        return state
+
+    def strengths(self, strength=strength_from_ids) -> list[int]:
+        """Return the strength of every seat's hand with the full board, -1 for seats that folded.
+
+        A hand that folded out is not ranked, the last seat standing gets 0.
+        """
+        active = self.betting.active
+        if self.betting.num_active <= 1:
+            return [0 if active >> seat & 1 else -1 for seat in range(self.num_players)]
+        start = self.num_players * self.hole_cards
+        board = self.deck[start:start + self.board_dealt[-1]]
+        return [strength(self.hand(seat) + board) if active >> seat & 1 else -1 for seat in range(self.num_players)]
+
+    def winnings(self, strength=strength_from_ids) -> list[int]:
+        """Return the chips every seat wins from the pots of a finished hand."""
+        if not self.terminal:
+            raise ValueError("the hand is not over")
+        return settle_pots(self.contributions, self.strengths(strength), self.button)
+
+    def payoffs(self, strength=strength_from_ids) -> list[int]:
+        """Return every seat's net chips over the hand, winnings less contributions."""
+        return [won - put_in for won, put_in in zip(self.winnings(strength), self.contributions)]
@@ -0,0 +1,134 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from collections import Counter
+from rules import STREETS
+
+# Methods timed on each engine object, method name -> phase, or a function of the call's arguments
+DECK_PHASES = {"shuffle": "shuffle"}
+DEALER_PHASES = {"deal_hand": "deal", "deal_street": "deal", "showdown_strengths": "showdown"}
+GAME_PHASES = {"street_betting": lambda round, *args, **kwargs: f"{STREETS[round].lower()} betting"}
+POT_PHASES = {"settle": "pot award"}
+PROFILE_LINES = 15
+MEMORY_LINES = 10
+
+
+def _timed(instrumentation: 'Instrumentation', phase, method):
+    calls = instrumentation.calls
+    seconds = instrumentation.seconds
+    perf_counter = time.perf_counter
+
+    def wrapper(self, *args, **kwargs):
+        name = phase(*args, **kwargs) if callable(phase) else phase
+        start = perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            seconds[name] += perf_counter() - start
+            calls[name] += 1
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+class Instrumentation:
+    """Per-phase call counts and timers for the engine, with optional cProfile and tracemalloc capture.
+
+    attach() swaps each engine object's class for a subclass whose phase
+    methods are timed, and detach() swaps it back, so an engine that was
+    never attached runs exactly the code it would without this module.
+    """
+
+    def __init__(self, profile: bool = False, trace_memory: bool = False) -> None:
+        self.calls: Counter = Counter()
+        self.seconds: Counter = Counter()
+        self.counters: Counter = Counter()
+        self.profiler: cProfile.Profile = cProfile.Profile() if profile else None
+        self.trace_memory: bool = trace_memory
+        self.memory: dict = None
+        self.elapsed: float = 0.0
+        self._start_time: float = None
+        self._attached: list[tuple[object, type]] = []
+
+    def attach(self, game) -> 'Instrumentation':
+        """Time the phases of a Game, its Dealer, the Dealer's Deck and its Pot.
+
+        Raises ValueError if any of them is already attached, here or to
+        another Instrumentation, since its phases would be counted twice.
+        """
+        dealer = game.dealer
+        targets = ((dealer.deck, DECK_PHASES), (dealer, DEALER_PHASES), (game, GAME_PHASES), (dealer.pot, POT_PHASES))
+        for obj, _ in targets:
+            if getattr(type(obj), "_instrumentation", None) is not None:
+                raise ValueError(f"{type(obj).__name__} is already instrumented")
+        for obj, phases in targets:
+            cls = type(obj)
+            methods = {name: _timed(self, phase, getattr(cls, name)) for name, phase in phases.items()}
+            methods["_instrumentation"] = self
+            if hasattr(cls, "__slots__"):
+                methods["__slots__"] = ()
+            obj.__class__ = type(cls.__name__, (cls,), methods)
+            self._attached.append((obj, cls))
+        return self
+
+    def detach(self) -> None:
+        """Restore the original classes of every attached object."""
+        for obj, cls in reversed(self._attached):
+            obj.__class__ = cls
+        self._attached = []
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Add to a named counter."""
+        self.counters[name] += n
+
+    def start(self) -> None:
+        """Start the run clock and any profiler or memory tracing."""
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profiler is not None:
+            self.profiler.enable()
+        self._start_time = time.perf_counter()
+
+    def stop(self) -> None:
+        """Stop the run clock and any profiler or memory tracing started by start()."""
+        if self._start_time is None:
+            raise ValueError("instrumentation was not started")
+        self.elapsed += time.perf_counter() - self._start_time
+        self._start_time = None
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.memory = {"current": current, "peak": peak,
+                           "top": snapshot.statistics("lineno")[:MEMORY_LINES]}
+
+    def __enter__(self) -> 'Instrumentation':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def summary(self) -> str:
+        """Return a report of the phase totals, counters and any profile or memory capture."""
+        lines = [f"{'Phase':<18} {'calls':>10} {'seconds':>10} {'us/call':>9} {'share':>7}"]
+        for phase, seconds in sorted(self.seconds.items(), key=lambda item: -item[1]):
+            share = seconds / self.elapsed if self.elapsed else 0.0
+            lines.append(f"{phase:<18} {self.calls[phase]:>10,} {seconds:>10.4f} "
+                         f"{1e6 * seconds / self.calls[phase]:>9.2f} {share:>7.1%}")
+        lines.append(f"{'run':<18} {'':>10} {self.elapsed:>10.4f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name}: {value:,}")
+        if self.profiler is not None:
+            stream = io.StringIO()
+            pstats.Stats(self.profiler, stream=stream).sort_stats("cumulative").print_stats(PROFILE_LINES)
+            lines.append(stream.getvalue().rstrip())
+        if self.memory is not None:
+            lines.append(f"Memory: {self.memory['current'] / 1024:,.1f} KiB at the end, "
+                         f"{self.memory['peak'] / 1024:,.1f} KiB peak")
+            lines.extend(f"  {stat}" for stat in self.memory["top"])
+        return "\n".join(lines)
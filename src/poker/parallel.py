@@ -0,0 +1,120 @@
+import argparse
+import multiprocessing
+import os
+import time
+from collections import Counter
+from cardecky import PartialDeck
+from evaluator import LookupHandRanker
+from events import CountingSink
+from game import Dealer, Game, Player, Pot
+from run import PRE_FLOP_LIMIT, START_STACK, play_round, rebuy
+from seeding import PokerRNG, stream
+
+# Hands are split into fixed-size batches, each with its own table and seed,
+# so the results only depend on the master seed and not on the worker count
+BATCH_SIZE = 1000
+ACTIONS = ("fold", "check", "call", "raise")
+
+
+class SimulationStats:
+    """Totals from a number of simulated hands, merged by summing."""
+
+    def __init__(self, num_players: int = 2) -> None:
+        self.hands: int = 0
+        self.stack_deltas: list[int] = [0] * num_players
+        self.wins: list[int] = [0] * num_players
+        self.actions: Counter = Counter()  # (action, player_ID) -> count
+
+    def merge(self, other: 'SimulationStats') -> 'SimulationStats':
+        """Add another set of totals into this one."""
+        self.hands += other.hands
+        self.stack_deltas = [a + b for a, b in zip(self.stack_deltas, other.stack_deltas)]
+        self.wins = [a + b for a, b in zip(self.wins, other.wins)]
+        self.actions.update(other.actions)
+        return self
+
+    def win_rates(self) -> list[float]:
+        """Return the fraction of hands each player won or split."""
+        return [wins / self.hands if self.hands else 0.0 for wins in self.wins]
+
+    def action_frequencies(self, player_ID: int) -> dict[str, float]:
+        """Return how often a player took each action."""
+        total = sum(self.actions[action, player_ID] for action in ACTIONS)
+        return {action: self.actions[action, player_ID] / total if total else 0.0 for action in ACTIONS}
+
+    def __str__(self) -> str:
+        """Summary report of the totals."""
+        lines = [f"Hands: {self.hands}"]
+        for player_ID, (delta, rate) in enumerate(zip(self.stack_deltas, self.win_rates())):
+            frequencies = ", ".join(f"{action} {freq:.3f}" for action, freq in self.action_frequencies(player_ID).items())
+            lines.append(f"Player {player_ID}: stack delta {delta:+d}, win rate {rate:.4f}, {frequencies}")
+        return "\n".join(lines)
+
+
+def batch_rng(seed: int, batch_index: int) -> PokerRNG:
+    """Return the random generator for one batch of hands."""
+    return PokerRNG(stream(seed, batch_index))
+
+
+def play_batch(seed: int, batch_index: int, num_hands: int, num_players: int = 2, lookup: bool = False) -> SimulationStats:
+    """Play a batch of hands on a fresh table and return its totals."""
+    rng = batch_rng(seed=seed, batch_index=batch_index)
+    pot = Pot()
+    dealer = Dealer(pot=pot, deck=PartialDeck(rng=rng))
+    if lookup:
+        dealer.hand_ranker = LookupHandRanker
+    players = [Player(player_ID=i, stack=START_STACK, hand=[], status=True, chips_in_play=0) for i in range(num_players)]
+    dealer.move_button(players=players)
+    sink = CountingSink()
+    game = Game(players=players, dealer=dealer, betting_limit=PRE_FLOP_LIMIT, sink=sink, rng=rng)
+
+    buy_ins = [1] * num_players
+    for _ in range(num_hands):
+        for player in rebuy(players):
+            buy_ins[player.player_ID] += 1
+        play_round(players, dealer, pot, game, dealer.button)
+
+    stats = SimulationStats(num_players=num_players)
+    stats.hands = num_hands
+    stats.stack_deltas = [player.stack - START_STACK * buy_ins[player.player_ID] for player in players]
+    stats.wins = [sink.player_counts["won", player.player_ID] for player in players]
+    stats.actions = Counter({key: count for key, count in sink.player_counts.items() if key[0] in ACTIONS})
+    return stats
+
+
+def run_parallel(num_hands: int, workers: int = None, seed: int = 0, batch_size: int = BATCH_SIZE,
+                 num_players: int = 2, lookup: bool = False) -> SimulationStats:
+    """Play hands across worker processes and merge their totals."""
+    jobs = [(seed, batch_index, min(batch_size, num_hands - start), num_players, lookup)
+            for batch_index, start in enumerate(range(0, num_hands, batch_size))]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = [play_batch(*job) for job in jobs]
+    else:
+        with multiprocessing.Pool(processes=workers) as pool:
+            results = pool.starmap(play_batch, jobs)
+    stats = SimulationStats(num_players=num_players)
+    for result in results:
+        stats.merge(result)
+    return stats
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Simulate hands in parallel across worker processes.")
+    parser.add_argument("--hands", type=int, default=100_000, help="number of hands to play")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to the CPU count")
+    parser.add_argument("--seed", type=int, default=0, help="master seed")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="hands per batch")
+    parser.add_argument("--lookup", action="store_true", help="rank showdowns with the lookup-table evaluator")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    stats = run_parallel(num_hands=args.hands, workers=args.workers, seed=args.seed,
+                         batch_size=args.batch_size, lookup=args.lookup)
+    execution_time = time.perf_counter() - start_time
+    print(stats)
+    print(f"Execution time for {args.hands} rounds: {execution_time:.9f} seconds")
+    print(f"Hands per second: {args.hands / execution_time:,.0f}")
+
+if __name__ == "__main__":
+    main()
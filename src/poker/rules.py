@@ -0,0 +1,53 @@
+from enum import Enum
+
+# constants for betting - these are the max bets for each betting round
+ANTE = 1
+PRE_FLOP_LIMIT = 2
+FLOP_LIMIT = 4
+TURN_LIMIT = 4
+START_STACK = 200
+
+# Per betting round (pre-flop, flop, turn): bet size, first actor offset from the button
+# and how many board cards are dealt before the round starts
+ROUND_LIMITS: tuple[int, ...] = (PRE_FLOP_LIMIT, FLOP_LIMIT, TURN_LIMIT)
+START_OFFSETS: tuple[int, ...] = (3, 1, 1)
+BOARD_CARDS: tuple[int, ...] = (0, 1, 1)
+HOLE_CARDS = 1
+# Street names by betting round, Rhode Island Hold'em stops after the turn
+STREETS: tuple[str, ...] = ("Pre-flop", "Flop", "Turn", "River")
+
+# Limit Texas Hold'em: two hole cards, a three-card flop, the turn and the river,
+# with small bets pre-flop and on the flop and big bets on the turn and river.
+# Every hand opens with the ANTE as in Rhode Island Hold'em, there are no blinds
+HOLDEM_HOLE_CARDS = 2
+HOLDEM_ROUND_LIMITS: tuple[int, ...] = (2, 2, 4, 4)
+HOLDEM_START_OFFSETS: tuple[int, ...] = (3, 1, 1, 1)
+HOLDEM_BOARD_CARDS: tuple[int, ...] = (0, 3, 1, 1)
+# Game.betting_round has no raise cap, the solvers and BettingRound(max_raises=...) cap raises per round
+MAX_RAISES = 3
+# Columns of the MCCFR regret tables; call doubles as check when there is no bet to match
+REGRET_FOLD = 0
+REGRET_CALL = 1
+REGRET_RAISE = 2
+# Codes appended to an MCCFR public history, two bits each
+_CALL_CODE = 1
+_RAISE_CODE = 2
+_DEAL_CODE = 3
+
+
+class PlayerAction(Enum):
+    """Enum for player actions."""
+    FOLD = 1
+    CHECK = 2
+    CALL = 3
+    RAISE = 4
+
+
+def append_action(public: int, action: int) -> int:
+    """Return the MCCFR public history code after a check, call or raise regret column."""
+    return (public << 2) | (_RAISE_CODE if action == REGRET_RAISE else _CALL_CODE)
+
+
+def append_card(public: int, card: int) -> int:
+    """Return the MCCFR public history code after a board card is dealt."""
+    return (((public << 2) | _DEAL_CODE) << 6) | card
@@ -1,22 +1,44 @@
 from tqdm import tqdm
+import argparse
 import time
-from cardecky import Deck
+from agents import TabularAgent
+from cardecky import PartialDeck
+from columnar import CHUNK_SIZE, ColumnarWriter
+from evaluator import HoldemHandRanker, LookupHandRanker
+from events import SINKS, EventSink, NullSink, TeeSink
 from game import Pot, Dealer, Player, Table, Game
+from handlog import HandHistorySink, HandHistoryWriter
+from instrument import Instrumentation
+from seeding import PokerRNG, hand_seed, stream
+from solvers.subgame import SubgameAgent, SubgameSolver
+from rules import (ANTE, PRE_FLOP_LIMIT, START_STACK, STREETS, HOLDEM_BOARD_CARDS, HOLDEM_HOLE_CARDS,
+                   HOLDEM_ROUND_LIMITS, HOLDEM_START_OFFSETS)
 
-# constants for betting - these are the max bets for each betting round
-ANTE = 1
-PRE_FLOP_LIMIT = 2
-FLOP_LIMIT = 4
-TURN_LIMIT = 4
-START_STACK = 200
 NUM_ROUNDS: int = 2
 
-def play_round(players, dealer, pot, game, button) -> None:
+def award(players, pot, strengths, button, sink: EventSink) -> None:
+    """Settle the main and side pots and report everyone's winnings and stack."""
+    winnings = pot.settle(players, strengths, button)
+    winners = [(player, amount) for player, amount in zip(players, winnings) if amount > 0]
+    for winner, amount in winners:
+        sink.emit("won", player=winner.player_ID, amount=amount)
+    # report the winner and their stack
+    for winner, _ in winners:
+        sink.emit("stack", player=winner.player_ID, stack=winner.stack)
+    # report the losers stack
+    for player, amount in zip(players, winnings):
+        if amount <= 0:
+            sink.emit("stack", player=player.player_ID, stack=player.stack)
+
+def play_round(players, dealer, pot, game, button, sink: EventSink = None) -> None:
+    sink = sink if sink is not None else game.sink
     # reset each player's hand and status
     for player in players:
         player.hand = []
         player.status = True
         player.chips_in_play = 0
+    dealer.board = []
+    game.new_hand()
 
     # shuffle the deck
     dealer.deck.shuffle()
@@ -24,122 +46,150 @@ def play_round(players, dealer, pot, game, button) -> None:
     # post the antes
     for player in players:
         player.post_ante(ante=ANTE, pot=pot)
-    print(f"Players posted antes")
-    print(f"Pot: {pot.total}")
+    sink.emit("antes_posted", pot=pot.total)
 
     # Deal the hands to players
     dealer.deal_hand(players=players)
-    print(f"Hands dealt")
-    # print the players' hands
+    sink.emit("hands_dealt")
+    # report the players' hands
     for player in players:
-        print(f"Player {player.player_ID} hand: {player.hand}")
-
-    # Betting for pre-flop
-    print(f"Pre-flop betting")
-    game.preflop_betting(button=button, round_limit=PRE_FLOP_LIMIT)
-    print(f"End of pre-flop betting. Pot: {pot.total}")
+        sink.emit("hand", player=player.player_ID, hand=player.hand)
 
-    # If there is only one player left, award the pot and move on to the next round
-    if dealer.active_players_count(players=players) <= 1:
-        winners = [player for player in players if player.status]
-        for winner in winners:
-            print(f"Player {winner.player_ID} won {pot.total} chips")
-        pot.award_pot(winners)
-        # print the winner and their stack
-        for winner in winners:
-            print(f"Player {winner.player_ID} stack: {winner.stack}")
-        # print the losers stack
-        for player in players:
-            if player not in winners:
-                print(f"Player {player.player_ID} stack: {player.stack}")
-        pot.reset_pot()
-        return
+    # Deal the board and bet street by street, awarding the pot as soon as one player is left
+    for round, street in enumerate(STREETS[:len(dealer.board_cards)]):
+        if round:
+            cards = dealer.deal_street(round)
+            sink.emit("board", street=street, cards=cards)
+        sink.emit("betting_started", street=street)
+        game.street_betting(round, button)
+        sink.emit("betting_ended", street=street, pot=pot.total)
+        if dealer.active_players_count(players=players) <= 1:
+            award(players, pot, [0 if player.status else -1 for player in players], button, sink)
+            return
 
-    # Deal the flop and begin betting round for the flop
-    flop = dealer.deal_flop()
-    print(f"Flop: {flop}")
-    print(f"Flop betting")
-    game.flop_betting(button=button, round_limit=FLOP_LIMIT)
-    print(f"End of flop betting. Pot: {pot.total}")
+    # if there is more than one player left, the best hands win
+    award(players, pot, dealer.showdown_strengths(players=players), button, sink)
 
-    # If there is only one player left, award the pot and move on to the next round
-    if dealer.active_players_count(players=players) <= 1:
-        winners = [player for player in players if player.status]
-        for winner in winners:
-            print(f"Player {winner.player_ID} won {pot.total} chips")
-        pot.award_pot(winners)
-        # print the winner and their stack
-        for winner in winners:
-            print(f"Player {winner.player_ID} stack: {winner.stack}")
-        # print the losers stack
-        for player in players:
-            if player not in winners:
-                print(f"Player {player.player_ID} stack: {player.stack}")
-        pot.reset_pot()
-        return
+def rebuy(players) -> list[Player]:
+    """Reset the stack of every player who cannot post the ante, return who rebought."""
+    rebought = []
+    for player in players:
+        if not player.can_bet(amount=ANTE):
+            player.stack = START_STACK
+            rebought.append(player)
+    return rebought
 
-    # Deal the turn and begin betting round for the turn
-    turn = dealer.deal_turn()
-    print(f"Turn: {turn}")
-    print(f"Turn betting")
-    game.turn_betting(button=button, round_limit=TURN_LIMIT)
-    print(f"End of turn betting. Pot: {pot.total}")
-    if dealer.active_players_count(players=players) <= 1:
-        winners = [player for player in players if player.status]
-        # print how much the winner won
-        for winner in winners:
-            print(f"Player {winner.player_ID} won {pot.total} chips")
-        pot.award_pot([player for player in players if player.status])
-        # print the winner and their stack
-        for winner in winners:
-            print(f"Player {winner.player_ID} stack: {winner.stack}")
-        # print the losers stack
-        for player in players:
-            if player not in winners:
-                print(f"Player {player.player_ID} stack: {player.stack}")
-        pot.reset_pot()
-    # if there is more than one player left, determine the winner
-    else:
-        winners = dealer.determine_winner(players=players)
-        if winners:
-            for winner in winners:
-                print(f"Player {winner.player_ID} won {pot.total} chips")
-            pot.award_pot(winners)
-            # print the winner and their stack
-            for winner in winners:
-                print(f"Player {winner.player_ID} stack: {winner.stack}")
-            # print the losers stack
-            for player in players:
-                if player not in winners:
-                    print(f"Player {player.player_ID} stack: {player.stack}")
-        pot.reset_pot()
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Simulate Rhode Island Hold'em hands between random players.")
+    parser.add_argument("--rounds", type=int, default=NUM_ROUNDS, help="number of hands to play")
+    parser.add_argument("--players", type=int, default=2, help="number of players, up to the 9 seats")
+    parser.add_argument("--holdem", action="store_true",
+                        help="play Limit Texas Hold'em: two hole cards, flop, turn and river, with antes and no blinds")
+    parser.add_argument("--sink", choices=sorted(SINKS), default="print",
+                        help="where game events go, 'null' runs headless")
+    parser.add_argument("--lookup", action="store_true", help="rank showdowns with the lookup-table evaluator")
+    parser.add_argument("--no-progress", action="store_true", help="hide the progress bar")
+    parser.add_argument("--strategy", default=None,
+                        help="RhodeIslandMCCFR checkpoint whose average strategy player 0 plays")
+    parser.add_argument("--subgame", type=float, default=None, metavar="MS",
+                        help="player 0 re-solves every decision, answering within this many milliseconds")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes for --subgame solving, defaults to the CPU count")
+    parser.add_argument("--seed", type=int, default=None, help="seed every hand so it can be replayed")
+    parser.add_argument("--log", default=None, help="write a binary hand history to this file")
+    parser.add_argument("--export", default=None, help="write columnar hand chunks to this directory")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="hands per exported chunk")
+    parser.add_argument("--instrument", action="store_true", help="time each phase of the hand and print a summary")
+    parser.add_argument("--profile", action="store_true", help="add a cProfile report to the summary")
+    parser.add_argument("--trace-memory", action="store_true", help="add a tracemalloc report to the summary")
+    args = parser.parse_args(argv)
+    if not 2 <= args.players <= 9:
+        parser.error("--players must be between 2 and 9")
+    if args.holdem and (args.log or args.export or args.strategy):
+        parser.error("hand histories and strategies only cover Rhode Island Hold'em")
+    if args.subgame is not None and args.strategy:
+        parser.error("player 0 plays either --strategy or --subgame")
+    return args
 
-def main() -> None:
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    sink: EventSink = SINKS[args.sink]()
     ##### Initial setup #####
-    deck = Deck()
+    deck = PartialDeck()
     pot = Pot()
     dealer = Dealer(pot=pot, deck=deck)
+    if args.lookup:
+        dealer.hand_ranker = LookupHandRanker
+    if args.holdem:
+        dealer.hand_ranker = HoldemHandRanker
+        dealer.hole_cards = HOLDEM_HOLE_CARDS
+        dealer.board_cards = HOLDEM_BOARD_CARDS
     table = Table(seats=9)
-    player0 = Player(player_ID=0, stack=START_STACK, hand=[], status=True, chips_in_play=0)
-    player1 = Player(player_ID=1, stack=START_STACK, hand=[], status=True, chips_in_play=0)
-    players: list[Player] = [player0, player1]
-    table.seat_player(player=player0, seat=0)
-    table.seat_player(player=player1, seat=1)
+    players: list[Player] = [Player(player_ID=i, stack=START_STACK, hand=[], status=True, chips_in_play=0)
+                             for i in range(args.players)]
+    for seat, player in enumerate(players):
+        table.seat_player(player=player, seat=seat)
     dealer.move_button(players=players)
     button = dealer.button
-    game = Game(players=players, dealer=dealer, betting_limit=PRE_FLOP_LIMIT)
+    agents = {0: TabularAgent.load(args.strategy)} if args.strategy else None
+    solver = None
+    if args.subgame is not None:
+        if args.holdem:
+            HoldemHandRanker.flush_tables()
+            HoldemHandRanker.rank_table()
+        solver = SubgameSolver(latency=args.subgame / 1000, workers=args.workers, seed=args.seed)
+        agents = {0: SubgameAgent(solver, seed=args.seed)}
+    writers = []
+    if args.log:
+        writers.append(HandHistoryWriter(args.log))
+    if args.export:
+        writers.append(ColumnarWriter(args.export, num_players=len(players), chunk_size=args.chunk_size))
+    logs = [HandHistorySink(writer, num_players=len(players), button=button) for writer in writers]
+    sinks = ([] if isinstance(sink, NullSink) and logs else [sink]) + logs
+    rounds = {"round_limits": HOLDEM_ROUND_LIMITS, "start_offsets": HOLDEM_START_OFFSETS} if args.holdem else {}
+    game = Game(players=players, dealer=dealer, betting_limit=PRE_FLOP_LIMIT,
+                sink=sinks[0] if len(sinks) == 1 else TeeSink(*sinks), agents=agents, **rounds)
+    if solver is not None:
+        agents[0].game = game
+    # Logged hands are always seeded, so every record can be replayed from its seed
+    seed = args.seed if args.seed is not None or not logs else stream(None).entropy
+    instrumentation = None
+    if args.instrument or args.profile or args.trace_memory:
+        instrumentation = Instrumentation(profile=args.profile, trace_memory=args.trace_memory)
+        if args.instrument:
+            instrumentation.attach(game)
+        instrumentation.start()
     #####  End initial setup #####
-    
-    # Create a list of arguments to pass to the play_round function
-    args: list[tuple[list[Player], Dealer, Pot, Game, int]] = [(players, dealer, pot, game, button) for i in range(NUM_ROUNDS)]
-        
-    # Use tqdm to track progress and display a progress bar  # Change here
-    for arg in tqdm(args, total=NUM_ROUNDS, desc="Rounds"):
-        play_round(*arg)
-    
+
+    start_time = time.perf_counter()
+    try:
+        # Use tqdm to track progress and display a progress bar
+        for hand in tqdm(range(args.rounds), total=args.rounds, desc="Rounds", disable=args.no_progress):
+            rebuy(players)
+            if seed is not None:
+                seed_value = hand_seed(seed, hand)
+                game.reseed(PokerRNG(seed_value))
+                for log in logs:
+                    log.seed = seed_value
+            play_round(players, dealer, pot, game, button)
+        execution_time = time.perf_counter() - start_time
+    finally:
+        # Flush the hands played so far and stop the solver's workers even if a hand fails
+        for writer in writers:
+            writer.close()
+        if solver is not None:
+            solver.close()
+    if instrumentation is not None:
+        instrumentation.stop()
+        instrumentation.detach()
+        instrumentation.count("hands", args.rounds)
+
+    if args.sink == "buffer":
+        sink.flush()
+    print(f"Execution time for {args.rounds} rounds: {execution_time:.9f} seconds")
+    print(f"Hands per second: {args.rounds / execution_time:,.0f}")
+    if instrumentation is not None:
+        print(instrumentation.summary())
+
 if __name__ == "__main__":
-    # check the time it takes to run
-    start_time = time.time()
     main()
-    execution_time = time.time() - start_time
-    print(f"Execution time for {NUM_ROUNDS} rounds: {execution_time:.9f} seconds")
@@ -0,0 +1,84 @@
+import numpy as np
+
+NUM_CARDS = 52
+# Uniform draws fetched from the generator at a time for choice()
+_BLOCK = 64
+
+
+def stream(seed, *key) -> np.random.SeedSequence:
+    """Return the seed sequence of one independent stream, e.g. stream(seed, worker) or stream(seed, table, hand).
+
+    Streams are addressed by their key instead of being spawned in order,
+    so any of them can be recreated without the others.
+    """
+    return np.random.SeedSequence(seed, spawn_key=key)
+
+
+def hand_seed(seed, hand: int, table: int = 0) -> int:
+    """Return the 64-bit seed of one hand of a seeded run, which PokerRNG(seed) replays."""
+    return int(stream(seed, table, hand).generate_state(1, np.uint64)[0])
+
+
+def shuffle_batch(generator: np.random.Generator, num_decks: int, num_cards: int = NUM_CARDS) -> np.ndarray:
+    """Return the first num_cards card ids of num_decks shuffled decks.
+
+    Short deals run only the first num_cards steps of a Fisher-Yates
+    shuffle on every deck at once, longer ones sort random keys.
+    """
+    if num_cards > NUM_CARDS // 4:
+        # 53-bit keys make ties, which argsort would break by position, practically impossible
+        keys = generator.random((num_decks, NUM_CARDS))
+        return np.argsort(keys, axis=1)[:, :num_cards].astype(np.int8)
+    decks = np.tile(np.arange(NUM_CARDS, dtype=np.int8), (num_decks, 1))
+    rows = np.arange(num_decks)
+    draws = generator.random((num_decks, num_cards))
+    for i in range(num_cards):
+        # Swap a uniformly chosen card from positions i..51 into position i
+        j = i + (draws[:, i] * (NUM_CARDS - i)).astype(np.intp)
+        picked = decks[rows, j]
+        decks[rows, j] = decks[:, i]
+        decks[:, i] = picked
+    return decks[:, :num_cards].copy()
+
+
+class PokerRNG:
+    """A NumPy Generator with the shuffle and choice methods Deck and RandomAgent use.
+
+    It stands in for the random module or a random.Random, so decks and
+    agents can be handed independent, reproducible streams.
+    """
+    __slots__ = ('generator', '_uniforms')
+
+    def __init__(self, seed=None) -> None:
+        if isinstance(seed, np.random.Generator):
+            self.generator: np.random.Generator = seed
+        else:
+            self.generator = np.random.Generator(np.random.PCG64(seed))
+        self._uniforms: list[float] = []
+
+    @classmethod
+    def for_hand(cls, seed, hand: int, table: int = 0) -> 'PokerRNG':
+        """Return the generator of one hand of a seeded run."""
+        return cls(hand_seed(seed, hand, table))
+
+    def spawn(self, n: int) -> list['PokerRNG']:
+        """Return n independent child streams, e.g. one per table or worker."""
+        return [PokerRNG(generator) for generator in self.generator.spawn(n)]
+
+    def random(self) -> float:
+        """Return a float in [0, 1)."""
+        if not self._uniforms:
+            self._uniforms = self.generator.random(_BLOCK).tolist()
+        return self._uniforms.pop()
+
+    def choice(self, seq):
+        """Return a uniformly chosen element of a non-empty sequence."""
+        return seq[int(self.random() * len(seq))]
+
+    def shuffle(self, x) -> None:
+        """Shuffle a list in place."""
+        self.generator.shuffle(x)
+
+    def deals(self, num_decks: int, num_cards: int = NUM_CARDS) -> np.ndarray:
+        """Return the first num_cards card ids of num_decks shuffled decks."""
+        return shuffle_batch(self.generator, num_decks, num_cards)
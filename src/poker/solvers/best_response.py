@@ -0,0 +1,222 @@
+import argparse
+import time
+from functools import reduce
+import numpy as np
+from evaluator import LookupHandRanker
+from game import PlayerAction
+from solvers.kuhn import infoset_id
+from solvers.mccfr import CALL, FOLD, RAISE, append_action, append_card, infoset_key
+from solvers.tree import CHANCE, FOLDED, SHOWDOWN, GameTree, kuhn_tree, rhode_island_tree
+
+
+class CardModel:
+    """The cards of a heads-up game with one hole card each and one board card per chance node.
+
+    ``strength`` holds the showdown strength of every hole card for every
+    board, shape ``(deck_size,) * (num_board + 1)`` with the hole card last.
+    """
+
+    def __init__(self, deck_size: int, strength: np.ndarray) -> None:
+        self.deck_size: int = deck_size
+        self.strength: np.ndarray = strength
+        # For every board, the hole cards sorted by strength, and where each
+        # card's group of equal strength starts and ends in that order. All
+        # three are flat indexes so showdowns only need np.take.
+        order = np.argsort(strength, axis=-1, kind="stable")
+        ordered = np.take_along_axis(strength, order, axis=-1)
+        lo = np.apply_along_axis(lambda row: np.searchsorted(row, row, side="left"), -1, ordered)
+        hi = np.apply_along_axis(lambda row: np.searchsorted(row, row, side="right"), -1, ordered)
+        weaker = np.empty_like(order)
+        not_stronger = np.empty_like(order)
+        np.put_along_axis(weaker, order, lo, axis=-1)
+        np.put_along_axis(not_stronger, order, hi, axis=-1)
+        boards = np.arange(order.size // deck_size).reshape(order.shape[:-1] + (1,))
+        self.order: np.ndarray = (order + boards * deck_size).ravel()
+        self.weaker: np.ndarray = (weaker + boards * (deck_size + 1)).ravel()
+        self.not_stronger: np.ndarray = (not_stronger + boards * (deck_size + 1)).ravel()
+
+    @property
+    def num_board(self) -> int:
+        return self.strength.ndim - 1
+
+    def deals(self) -> int:
+        """Return the number of ordered deals of both hole cards and the board."""
+        count = 1
+        for i in range(self.num_board + 2):
+            count *= self.deck_size - i
+        return count
+
+    def showdown(self, opponent_reach: np.ndarray) -> np.ndarray:
+        """Return, per board and hole card, the opponent reach beaten minus the reach that wins."""
+        shape = opponent_reach.shape
+        ordered = np.take(opponent_reach, self.order).reshape(-1, self.deck_size)
+        cumulative = np.zeros((len(ordered), self.deck_size + 1), dtype=ordered.dtype)
+        np.cumsum(ordered, axis=-1, out=cumulative[:, 1:])
+        total = cumulative[:, -1:]
+        weaker = np.take(cumulative, self.weaker).reshape(len(ordered), self.deck_size)
+        not_stronger = np.take(cumulative, self.not_stronger).reshape(len(ordered), self.deck_size)
+        return (weaker - (total - not_stronger)).reshape(shape)
+
+
+def kuhn_cards() -> CardModel:
+    """Return the Kuhn poker cards, where the higher card wins."""
+    return CardModel(deck_size=3, strength=np.arange(3))
+
+
+def rhode_island_cards() -> CardModel:
+    """Return the Rhode Island cards, ranked with the lookup-table evaluator."""
+    table = np.frombuffer(LookupHandRanker.table(), dtype=np.uint16).reshape(52, 52, 52)
+    # table is indexed (hole, flop, turn), the model wants (flop, turn, hole)
+    return CardModel(deck_size=52, strength=np.ascontiguousarray(table.transpose(1, 2, 0)).astype(np.int32))
+
+
+class UniformPolicy:
+    """Pick every legal action with equal probability."""
+
+    def action_probs(self, tree: GameTree, node: int, num_board: int) -> np.ndarray:
+        """Return the action probabilities of the acting seat, broadcastable to (*board, hole, actions)."""
+        k = int(tree.num_children[node])
+        return np.full((1,) * (num_board + 1) + (k,), 1.0 / k, dtype=np.float32)
+
+
+class TabularPolicy:
+    """Action probabilities stored per decision node."""
+
+    def __init__(self, probs: dict) -> None:
+        self.probs: dict = {node: np.asarray(p, dtype=np.float32) for node, p in probs.items()}
+
+    def action_probs(self, tree: GameTree, node: int, num_board: int) -> np.ndarray:
+        """Return the action probabilities of the acting seat, broadcastable to (*board, hole, actions)."""
+        return self.probs[node]
+
+
+def kuhn_policy(tree: GameTree, strategy: np.ndarray) -> TabularPolicy:
+    """Wrap a KuhnCFR strategy table, shape (12, 2), as a policy on the Kuhn tree."""
+    probs = {}
+    for node in tree.decision_nodes():
+        history = ""
+        child = node
+        while tree.parent[child] >= 0:
+            action = tree.action[child]
+            history = ("b" if action in (PlayerAction.RAISE.value, PlayerAction.CALL.value) else "p") + history
+            child = tree.parent[child]
+        probs[int(node)] = strategy[[infoset_id(card, history) for card in range(3)]]
+    return TabularPolicy(probs)
+
+
+def mccfr_policy(tree: GameTree, store) -> TabularPolicy:
+    """Wrap the average strategy of a RhodeIslandMCCFR regret store as a policy on the tree.
+
+    Information sets the store never saw play uniformly.
+    """
+    size = len(store)
+    keys = np.fromiter(store.index.keys(), dtype=np.int64, count=size)
+    rows = np.fromiter(store.index.values(), dtype=np.int64, count=size)
+    order = np.argsort(keys)
+    sorted_keys, sorted_rows = keys[order], rows[order]
+    columns = {PlayerAction.FOLD.value: FOLD, PlayerAction.CHECK.value: CALL,
+               PlayerAction.CALL.value: CALL, PlayerAction.RAISE.value: RAISE}
+
+    publics = {0: np.int64(1)}
+    probs = {}
+    for node in range(tree.num_nodes):
+        public = publics[node]
+        for child in tree.children(node):
+            if tree.player[node] == CHANCE:
+                cards = np.arange(52, dtype=np.int64)
+                publics[child] = append_card(np.expand_dims(public, -1), cards)
+            else:
+                publics[child] = append_action(public, columns[int(tree.action[child])])
+        if tree.player[node] < 0:
+            continue
+        node_keys = infoset_key(np.expand_dims(public, -1), np.arange(52, dtype=np.int64))
+        found_at = np.minimum(np.searchsorted(sorted_keys, node_keys), max(size - 1, 0))
+        found = sorted_keys[found_at] == node_keys if size else np.zeros(node_keys.shape, dtype=bool)
+        action_columns = [columns[int(tree.action[child])] for child in tree.children(node)]
+        weights = store.strategy_sum[sorted_rows[found_at]][..., action_columns].astype(np.float64) if size \
+            else np.zeros(node_keys.shape + (len(action_columns),))
+        weights[~found] = 0.0
+        totals = weights.sum(axis=-1, keepdims=True)
+        probs[node] = np.where(totals > 0, weights / np.where(totals > 0, totals, 1.0), 1.0 / len(action_columns))
+    return TabularPolicy(probs)
+
+
+class BestResponse:
+    """Best responses on a heads-up GameTree, vectorized over every card.
+
+    One pass over the tree carries the opponent's reach probabilities for
+    every hole card and board as a NumPy array, so no deal is ever
+    enumerated in Python. Showdowns are settled per board by sorting hole
+    cards on strength and taking cumulative sums of the opponent's reach.
+    """
+
+    def __init__(self, tree: GameTree, cards: CardModel) -> None:
+        if tree.num_players != 2:
+            raise ValueError("best responses need a heads-up tree")
+        if any(dealt > 1 for dealt in tree.board_cards) or sum(tree.board_cards) != cards.num_board:
+            raise ValueError("the card model must match the tree's board cards")
+        self.tree: GameTree = tree
+        self.cards: CardModel = cards
+        self._deal_masks: dict[int, np.ndarray] = {}
+
+    def _deal_mask(self, num_board: int) -> np.ndarray:
+        """Return which (*board, new card, hole card) combinations have no card twice."""
+        if num_board not in self._deal_masks:
+            deck = self.cards.deck_size
+            new_card = np.arange(deck).reshape((1,) * num_board + (deck, 1))
+            valid = np.broadcast_to(new_card != np.arange(deck), (deck,) * (num_board + 2)).copy()
+            for axis in range(num_board):
+                board_card = np.arange(deck).reshape((1,) * axis + (deck,) + (1,) * (num_board - axis + 1))
+                valid &= new_card != board_card
+            self._deal_masks[num_board] = valid
+        return self._deal_masks[num_board]
+
+    def _values(self, node: int, br_player: int, policy, opponent_reach: np.ndarray) -> np.ndarray:
+        """Return the best responder's summed values per board and hole card."""
+        tree = self.tree
+        player = int(tree.player[node])
+        contributions = tree.contributions[node]
+        if player == FOLDED:
+            won = tree.active[node] >> br_player & 1
+            payoff = np.float32(contributions[1 - br_player] if won else -contributions[br_player])
+            # The opponent cannot hold the best responder's card
+            return payoff * (opponent_reach.sum(axis=-1, keepdims=True) - opponent_reach)
+        if player == SHOWDOWN:
+            return np.float32(contributions[br_player]) * self.cards.showdown(opponent_reach)
+        children = tree.children(node)
+        if player == CHANCE:
+            # Deal every board card at once, dropping deals where a card would appear twice
+            mask = self._deal_mask(opponent_reach.ndim - 1)
+            child_values = self._values(children[0], br_player, policy, np.expand_dims(opponent_reach, -2) * mask)
+            return (child_values * mask).sum(axis=-2)
+        if player == br_player:
+            return reduce(np.maximum, (self._values(child, br_player, policy, opponent_reach) for child in children))
+        sigma = policy.action_probs(tree, node, opponent_reach.ndim - 1)
+        return sum(self._values(child, br_player, policy, opponent_reach * sigma[..., i])
+                   for i, child in enumerate(children))
+
+    def value(self, policy, br_player: int) -> float:
+        """Return the expected value of a best response to the other seat's policy."""
+        values = self._values(0, br_player, policy, np.ones(self.cards.deck_size, dtype=np.float32))
+        return float(values.sum(dtype=np.float64) / self.cards.deals())
+
+    def exploitability(self, policy) -> float:
+        """Return how much a best responder wins against a policy, averaged over both seats."""
+        return (self.value(policy, 0) + self.value(policy, 1)) / 2
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Measure the exploitability of a uniform random policy.")
+    parser.add_argument("--game", choices=("kuhn", "rhode-island"), default="rhode-island")
+    args = parser.parse_args(argv)
+    if args.game == "kuhn":
+        best_response = BestResponse(kuhn_tree(), kuhn_cards())
+    else:
+        best_response = BestResponse(rhode_island_tree(), rhode_island_cards())
+    start_time = time.perf_counter()
+    exploitability = best_response.exploitability(UniformPolicy())
+    print(f"Exploitability of uniform play: {exploitability:.6f} chips per hand "
+          f"({time.perf_counter() - start_time:.3f} seconds)")
+
+if __name__ == "__main__":
+    main()
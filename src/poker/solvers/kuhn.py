@@ -0,0 +1,220 @@
+import argparse
+import time
+import numpy as np
+
+NUM_CARDS = 3  # Jack, Queen, King
+NUM_ACTIONS = 2
+PASS = 0
+BET = 1
+ACTION_CHARS = "pb"
+# Histories where a player has to act; player 0 acts on even lengths
+HISTORIES: tuple[str, ...] = ("", "p", "b", "pb")
+HISTORY_INDEX: dict[str, int] = {history: i for i, history in enumerate(HISTORIES)}
+NUM_INFOSETS = NUM_CARDS * len(HISTORIES)
+GAME_VALUE = -1 / 18  # Expected value for player 0 at equilibrium
+
+# Payoff to player 0 when the higher card wins, i.e. the chips the loser put in
+_SHOWDOWN = np.sign(np.subtract.outer(np.arange(NUM_CARDS), np.arange(NUM_CARDS)))
+_FULL_CHANCE = (1 - np.eye(NUM_CARDS)) / (NUM_CARDS * (NUM_CARDS - 1))
+
+
+def infoset_id(card: int, history: str) -> int:
+    """Return the row of an information set in the regret and strategy tables."""
+    return card * len(HISTORIES) + HISTORY_INDEX[history]
+
+
+def terminal_payoff(history: str):
+    """Return the (3, 3) payoff matrix to player 0 of a terminal history, or None."""
+    if history == "pp":
+        return _SHOWDOWN * 1.0
+    if history in ("bb", "pbb"):
+        return _SHOWDOWN * 2.0
+    if history == "bp":
+        return np.ones((NUM_CARDS, NUM_CARDS))
+    if history == "pbp":
+        return -np.ones((NUM_CARDS, NUM_CARDS))
+    return None
+
+
+def regret_matching(regrets: np.ndarray) -> np.ndarray:
+    """Return the strategy proportional to positive regret, uniform if there is none."""
+    positive = np.maximum(regrets, 0.0)
+    totals = positive.sum(axis=1, keepdims=True)
+    return np.where(totals > 0, positive / np.where(totals > 0, totals, 1.0), 1.0 / regrets.shape[1])
+
+
+def normalize(strategy_sum: np.ndarray) -> np.ndarray:
+    """Return the strategy proportional to the accumulated weights, uniform if there are none."""
+    totals = strategy_sum.sum(axis=1, keepdims=True)
+    return np.where(totals > 0, strategy_sum / np.where(totals > 0, totals, 1.0), 1.0 / strategy_sum.shape[1])
+
+
+class KuhnCFR:
+    """Counterfactual regret minimization for Kuhn poker.
+
+    Regrets and strategy sums live in (NUM_INFOSETS, NUM_ACTIONS) arrays
+    indexed by infoset_id. Every iteration walks the 9-node betting tree once
+    with reach vectors over all three cards, so one walk updates every
+    information set on that history at the same time. With ``sampling`` a
+    single deal is drawn per iteration (chance-sampling CFR), otherwise the
+    chance matrix weighs all six deals. ``plus`` switches to CFR+.
+    """
+
+    def __init__(self, plus: bool = False, sampling: bool = False, seed: int = None) -> None:
+        self.plus: bool = plus
+        self.sampling: bool = sampling
+        self.rng = np.random.default_rng(seed)
+        self.regrets: np.ndarray = np.zeros((NUM_INFOSETS, NUM_ACTIONS))
+        self.strategy_sum: np.ndarray = np.zeros((NUM_INFOSETS, NUM_ACTIONS))
+        self.iteration: int = 0
+
+    def current_strategy(self) -> np.ndarray:
+        """Return the current strategy for every information set."""
+        return regret_matching(self.regrets)
+
+    def average_strategy(self) -> np.ndarray:
+        """Return the average strategy, which converges to an equilibrium."""
+        return normalize(self.strategy_sum)
+
+    def _chance(self) -> np.ndarray:
+        """Return the chance weights of each (card 0, card 1) deal for one iteration."""
+        if not self.sampling:
+            return _FULL_CHANCE
+        card0, card1 = self.rng.choice(NUM_CARDS, size=2, replace=False)
+        chance = np.zeros((NUM_CARDS, NUM_CARDS))
+        chance[card0, card1] = 1.0
+        return chance
+
+    def _cfr(self, history, reach, chance, strategy, weight, updating) -> tuple[np.ndarray, np.ndarray]:
+        """Return each player's counterfactual values per card and update the tables."""
+        payoff = terminal_payoff(history)
+        if payoff is not None:
+            weighted = chance * payoff
+            return weighted @ reach[1], -(weighted.T @ reach[0])
+
+        player = len(history) % 2
+        rows = np.arange(NUM_CARDS) * len(HISTORIES) + HISTORY_INDEX[history]
+        sigma = strategy[rows]
+        action_values = np.zeros((NUM_CARDS, NUM_ACTIONS))
+        values = [np.zeros(NUM_CARDS), np.zeros(NUM_CARDS)]
+        for action in range(NUM_ACTIONS):
+            child_reach = list(reach)
+            child_reach[player] = reach[player] * sigma[:, action]
+            child_values = self._cfr(history + ACTION_CHARS[action], child_reach, chance, strategy, weight, updating)
+            action_values[:, action] = child_values[player]
+            values[player] += sigma[:, action] * child_values[player]
+            values[1 - player] += child_values[1 - player]
+
+        if player in updating:
+            self.regrets[rows] += action_values - values[player][:, None]
+            if self.plus:
+                self.regrets[rows] = np.maximum(self.regrets[rows], 0.0)
+            dealt = chance.sum(axis=1 - player) > 0
+            self.strategy_sum[rows] += weight * (dealt * reach[player])[:, None] * sigma
+        return values[0], values[1]
+
+    def iterate(self) -> None:
+        """Run one CFR iteration.
+
+        Vanilla CFR updates both players in one walk, CFR+ alternates and
+        updates one player per walk against the other's latest strategy.
+        """
+        self.iteration += 1
+        weight = self.iteration if self.plus else 1
+        ones = np.ones(NUM_CARDS)
+        chance = self._chance()
+        for updating in (((0,), (1,)) if self.plus else ((0, 1),)):
+            self._cfr("", [ones, ones], chance, self.current_strategy(), weight, updating)
+
+    def train(self, iterations: int, report_every: int = 0, callback=None) -> list[dict]:
+        """Run iterations, measuring exploitability every report_every iterations.
+
+        Returns one report per measurement with the iteration, exploitability
+        of the average strategy and iterations per second since the start.
+        ``callback`` is called with each report as it is made.
+        """
+        reports = []
+        start_time = time.perf_counter()
+        for i in range(1, iterations + 1):
+            self.iterate()
+            if report_every and (i % report_every == 0 or i == iterations):
+                elapsed = time.perf_counter() - start_time
+                report = {
+                    "iteration": self.iteration,
+                    "exploitability": self.exploitability(),
+                    "iterations_per_second": i / elapsed if elapsed else float("inf"),
+                }
+                reports.append(report)
+                if callback is not None:
+                    callback(report)
+        return reports
+
+    def exploitability(self, strategy: np.ndarray = None) -> float:
+        """Return how much a best responder wins against a strategy, averaged over both seats."""
+        strategy = self.average_strategy() if strategy is None else strategy
+        return (best_response_value(strategy, 0) + best_response_value(strategy, 1)) / 2
+
+    def game_value(self, strategy: np.ndarray = None) -> float:
+        """Return the expected value for player 0 when both players follow a strategy."""
+        strategy = self.average_strategy() if strategy is None else strategy
+        ones = np.ones(NUM_CARDS)
+        return float(_expected_values("", [ones, ones], strategy)[0].sum())
+
+
+def _expected_values(history, reach, strategy) -> tuple[np.ndarray, np.ndarray]:
+    """Return each player's expected values per card, weighted by both players' reach."""
+    payoff = terminal_payoff(history)
+    if payoff is not None:
+        weighted = _FULL_CHANCE * payoff
+        return reach[0] * (weighted @ reach[1]), -reach[1] * (weighted.T @ reach[0])
+    player = len(history) % 2
+    sigma = strategy[np.arange(NUM_CARDS) * len(HISTORIES) + HISTORY_INDEX[history]]
+    values = [np.zeros(NUM_CARDS), np.zeros(NUM_CARDS)]
+    for action in range(NUM_ACTIONS):
+        child_reach = list(reach)
+        child_reach[player] = reach[player] * sigma[:, action]
+        child_values = _expected_values(history + ACTION_CHARS[action], child_reach, strategy)
+        values[0] += child_values[0]
+        values[1] += child_values[1]
+    return values[0], values[1]
+
+
+def _best_response(history, br_player, opponent_reach, strategy) -> np.ndarray:
+    """Return the best responder's values per card against the opponent's reach."""
+    payoff = terminal_payoff(history)
+    if payoff is not None:
+        weighted = _FULL_CHANCE * (payoff if br_player == 0 else -payoff.T)
+        return weighted @ opponent_reach
+    player = len(history) % 2
+    children = []
+    sigma = strategy[np.arange(NUM_CARDS) * len(HISTORIES) + HISTORY_INDEX[history]]
+    for action in range(NUM_ACTIONS):
+        reach = opponent_reach if player == br_player else opponent_reach * sigma[:, action]
+        children.append(_best_response(history + ACTION_CHARS[action], br_player, reach, strategy))
+    if player == br_player:
+        return np.maximum(children[0], children[1])
+    return children[0] + children[1]
+
+
+def best_response_value(strategy: np.ndarray, br_player: int) -> float:
+    """Return the expected value of a best response to the other player's strategy."""
+    return float(_best_response("", br_player, np.ones(NUM_CARDS), strategy).sum())
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Solve Kuhn poker with CFR.")
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--report-every", type=int, default=1000)
+    parser.add_argument("--plus", action="store_true", help="use CFR+")
+    parser.add_argument("--sampling", action="store_true", help="sample one deal per iteration")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    solver = KuhnCFR(plus=args.plus, sampling=args.sampling, seed=args.seed)
+    solver.train(args.iterations, report_every=args.report_every, callback=lambda report: print(
+        f"Iteration {report['iteration']}: exploitability {report['exploitability']:.6f}, "
+        f"{report['iterations_per_second']:,.0f} iterations/sec"))
+    print(f"Game value: {solver.game_value():.6f} (equilibrium {GAME_VALUE:.6f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+import argparse
+import random
+import sys
+import time
+import numpy as np
+from evaluator import LookupHandRanker
+from rules import ANTE, MAX_RAISES, ROUND_LIMITS, append_action, append_card
+from rules import REGRET_CALL as CALL, REGRET_FOLD as FOLD, REGRET_RAISE as RAISE
+
+NUM_CARDS = 52
+NUM_PLAYERS = 2
+NUM_ROUNDS = len(ROUND_LIMITS)
+# Regret table columns FOLD, CALL and RAISE, as in rules
+NUM_ACTIONS = 3
+
+
+def legal_actions(facing_bet: bool, raises: int) -> tuple[int, ...]:
+    """Return the actions available in a limit betting round."""
+    if not facing_bet:
+        return (CALL, RAISE) if raises < MAX_RAISES else (CALL,)
+    return (FOLD, CALL, RAISE) if raises < MAX_RAISES else (FOLD, CALL)
+
+
+def infoset_key(public: int, hole: int) -> int:
+    """Return the key of the information set of a player holding a card."""
+    return (public << 6) | hole
+
+
+class RegretStore:
+    """Regrets and strategy sums for a growing number of information sets.
+
+    Keys map to rows of two preallocated float32 arrays that double in size
+    when full, so an information set costs 2 * NUM_ACTIONS floats plus its
+    dict entry.
+    """
+
+    def __init__(self, capacity: int = 1 << 16) -> None:
+        self.index: dict[int, int] = {}
+        self.regrets: np.ndarray = np.zeros((capacity, NUM_ACTIONS), dtype=np.float32)
+        self.strategy_sum: np.ndarray = np.zeros((capacity, NUM_ACTIONS), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def row(self, key: int) -> int:
+        """Return the row of an information set, adding it if it is new."""
+        row = self.index.get(key)
+        if row is None:
+            row = len(self.index)
+            if row == len(self.regrets):
+                self.regrets = np.concatenate([self.regrets, np.zeros_like(self.regrets)])
+                self.strategy_sum = np.concatenate([self.strategy_sum, np.zeros_like(self.strategy_sum)])
+            self.index[key] = row
+        return row
+
+    def strategy(self, row: int, actions: tuple[int, ...]) -> list[float]:
+        """Return the regret-matching strategy over the legal actions of a row."""
+        regrets = self.regrets[row].tolist()
+        positive = [max(regrets[action], 0.0) for action in actions]
+        total = sum(positive)
+        if total > 0:
+            return [p / total for p in positive]
+        return [1.0 / len(actions)] * len(actions)
+
+    def average_strategy(self, key: int, actions: tuple[int, ...]) -> list[float]:
+        """Return the average strategy of an information set, uniform if it was never visited."""
+        row = self.index.get(key)
+        if row is not None:
+            weights = [float(self.strategy_sum[row, action]) for action in actions]
+            total = sum(weights)
+            if total > 0:
+                return [w / total for w in weights]
+        return [1.0 / len(actions)] * len(actions)
+
+    def memory_bytes(self) -> int:
+        """Return an estimate of the memory used by the store."""
+        entry = sys.getsizeof(1 << 50) + sys.getsizeof(1 << 20)
+        return self.regrets.nbytes + self.strategy_sum.nbytes + sys.getsizeof(self.index) + len(self.index) * entry
+
+    def save(self, path, **extra) -> None:
+        """Write the store to a .npz checkpoint at exactly ``path``, which np.savez would give a .npz suffix."""
+        size = len(self.index)
+        keys = np.fromiter(self.index.keys(), dtype=np.int64, count=size)
+        rows = np.fromiter(self.index.values(), dtype=np.int64, count=size)
+        with open(path, "wb") as f:
+            np.savez(f, keys=keys, rows=rows, regrets=self.regrets[:size],
+                     strategy_sum=self.strategy_sum[:size], **extra)
+
+    @classmethod
+    def load(cls, path) -> tuple['RegretStore', dict]:
+        """Read a store from a .npz checkpoint, with any extra arrays saved with it."""
+        with np.load(path) as data:
+            store = cls(capacity=max(len(data["keys"]), 1))
+            size = len(data["keys"])
+            store.regrets[:size] = data["regrets"]
+            store.strategy_sum[:size] = data["strategy_sum"]
+            store.index = dict(zip(data["keys"].tolist(), data["rows"].tolist()))
+            extra = {name: data[name] for name in data.files
+                     if name not in ("keys", "rows", "regrets", "strategy_sum")}
+        return store, extra
+
+
+class RhodeIslandMCCFR:
+    """Monte Carlo CFR for heads-up Rhode Island Hold'em.
+
+    Follows the engine in game.py and run.py: both players ante, get one hole
+    card, then bet pre-flop, on the flop and on the turn with the limits in
+    rules.py. Player 0 is the first to act in every round. Unlike
+    Game.betting_round, calls match the outstanding bet and raises are
+    capped at MAX_RAISES per round so the tree is finite.
+
+    Each iteration samples one deal. External sampling walks every action
+    of the updated player and samples the opponent, outcome sampling follows
+    a single trajectory with exploration ``epsilon``.
+    """
+
+    def __init__(self, method: str = "external", epsilon: float = 0.6, seed: int = None,
+                 store: RegretStore = None) -> None:
+        if method not in ("external", "outcome"):
+            raise ValueError("method must be 'external' or 'outcome'")
+        self.method: str = method
+        self.epsilon: float = epsilon
+        self.rng = random.Random(seed)
+        self.store: RegretStore = store if store is not None else RegretStore()
+        self.iteration: int = 0
+        self._best_response = None
+        LookupHandRanker.table()
+
+    def _showdown(self, cards: list[int]) -> int:
+        """Return +1 if player 0 wins the showdown, -1 if player 1 does, 0 for a split."""
+        hole0, hole1, flop, turn = cards
+        strength0 = LookupHandRanker.strength_from_ids(hole0, flop, turn)
+        strength1 = LookupHandRanker.strength_from_ids(hole1, flop, turn)
+        return (strength0 > strength1) - (strength0 < strength1)
+
+    def _sample(self, probs: list[float]) -> int:
+        """Return an index drawn from a probability list."""
+        x = self.rng.random()
+        for i, p in enumerate(probs):
+            x -= p
+            if x < 0:
+                return i
+        return len(probs) - 1
+
+    def _after(self, cards, public, round, contributions, player, raises, acted, action):
+        """Apply an action and return the next node, or the payoff to player 0 if the hand ends.
+
+        A node is (public, round, contributions, player, raises, acted).
+        """
+        opponent = 1 - player
+        facing = contributions[opponent] - contributions[player]
+        if action == FOLD:
+            return -contributions[0] if player == 0 else contributions[1]
+        contributions = list(contributions)
+        if action == RAISE:
+            contributions[player] += facing + ROUND_LIMITS[round]
+            return (append_action(public, action), round, contributions, opponent, raises + 1, acted + 1)
+        contributions[player] += facing
+        public = append_action(public, action)
+        if facing == 0 and acted == 0:
+            return (public, round, contributions, opponent, raises, acted + 1)
+        # A call, or a check behind, closes the round
+        if round == NUM_ROUNDS - 1:
+            return self._showdown(cards) * contributions[0]
+        return (append_card(public, cards[2 + round]), round + 1, contributions, 0, 0, 0)
+
+    def _external(self, cards, node, traverser) -> float:
+        """Return the sampled value of a node for the traverser and update its regrets."""
+        if not isinstance(node, tuple):
+            return node if traverser == 0 else -node
+        public, round, contributions, player, raises, acted = node
+        actions = legal_actions(contributions[0] != contributions[1], raises)
+        row = self.store.row(infoset_key(public, cards[player]))
+        sigma = self.store.strategy(row, actions)
+
+        if player != traverser:
+            for action, p in zip(actions, sigma):
+                self.store.strategy_sum[row, action] += p
+            action = actions[self._sample(sigma)]
+            return self._external(cards, self._after(cards, *node, action), traverser)
+
+        values = [self._external(cards, self._after(cards, *node, action), traverser) for action in actions]
+        value = sum(p * v for p, v in zip(sigma, values))
+        for action, v in zip(actions, values):
+            self.store.regrets[row, action] += v - value
+        return value
+
+    def _outcome(self, cards, node, traverser, own_reach, opponent_reach, sample_prob) -> tuple[float, float]:
+        """Return the importance-weighted utility and tail probability of a sampled trajectory."""
+        if not isinstance(node, tuple):
+            return (node if traverser == 0 else -node) / sample_prob, 1.0
+        public, round, contributions, player, raises, acted = node
+        actions = legal_actions(contributions[0] != contributions[1], raises)
+        row = self.store.row(infoset_key(public, cards[player]))
+        sigma = self.store.strategy(row, actions)
+
+        if player == traverser:
+            probs = [self.epsilon / len(actions) + (1 - self.epsilon) * p for p in sigma]
+        else:
+            probs = sigma
+        i = self._sample(probs)
+        child = self._after(cards, *node, actions[i])
+        if player != traverser:
+            utility, tail = self._outcome(cards, child, traverser, own_reach, opponent_reach * sigma[i],
+                                          sample_prob * probs[i])
+            return utility, tail * sigma[i]
+
+        utility, tail = self._outcome(cards, child, traverser, own_reach * sigma[i], opponent_reach,
+                                      sample_prob * probs[i])
+        weight = utility * opponent_reach
+        for j, action in enumerate(actions):
+            if j == i:
+                self.store.regrets[row, action] += weight * (tail - tail * sigma[i])
+            else:
+                self.store.regrets[row, action] -= weight * tail * sigma[i]
+            self.store.strategy_sum[row, action] += own_reach / sample_prob * sigma[j]
+        return utility, tail * sigma[i]
+
+    def iterate(self) -> None:
+        """Run one iteration, updating each player once on a freshly sampled deal."""
+        self.iteration += 1
+        for traverser in range(NUM_PLAYERS):
+            cards = self.rng.sample(range(NUM_CARDS), 4)
+            root = (1, 0, [ANTE, ANTE], 0, 0, 0)
+            if self.method == "external":
+                self._external(cards, root, traverser)
+            else:
+                self._outcome(cards, root, traverser, 1.0, 1.0, 1.0)
+
+    def train(self, iterations: int, report_every: int = 0, callback=None,
+              checkpoint_path=None, checkpoint_every: int = 0, measure_exploitability: bool = False) -> list[dict]:
+        """Run iterations, reporting speed and memory every report_every iterations.
+
+        With ``measure_exploitability`` every report also holds the
+        exploitability of the average strategy, which takes a couple of seconds.
+        """
+        reports = []
+        start_time = time.perf_counter()
+        for i in range(1, iterations + 1):
+            self.iterate()
+            if checkpoint_path is not None and checkpoint_every and i % checkpoint_every == 0:
+                self.save(checkpoint_path)
+            if report_every and (i % report_every == 0 or i == iterations):
+                elapsed = time.perf_counter() - start_time
+                infosets = len(self.store)
+                report = {
+                    "iteration": self.iteration,
+                    "infosets": infosets,
+                    "iterations_per_second": i / elapsed if elapsed else float("inf"),
+                    "bytes_per_infoset": self.store.memory_bytes() / infosets if infosets else 0.0,
+                }
+                if measure_exploitability:
+                    report["exploitability"] = self.exploitability()
+                reports.append(report)
+                if callback is not None:
+                    callback(report)
+        return reports
+
+    def average_strategy(self, public: int, hole: int, facing_bet: bool, raises: int) -> list[float]:
+        """Return the average strategy over the legal actions of an information set."""
+        return self.store.average_strategy(infoset_key(public, hole), legal_actions(facing_bet, raises))
+
+    def exploitability(self) -> float:
+        """Return the exploitability of the average strategy in chips per hand."""
+        from solvers.best_response import BestResponse, mccfr_policy, rhode_island_cards
+        from solvers.tree import rhode_island_tree
+        if self._best_response is None:
+            self._best_response = BestResponse(rhode_island_tree(), rhode_island_cards())
+        return self._best_response.exploitability(mccfr_policy(self._best_response.tree, self.store))
+
+    def save(self, path) -> None:
+        """Write a checkpoint that load can resume from."""
+        self.store.save(path, iteration=np.array(self.iteration), method=np.array(self.method),
+                        epsilon=np.array(self.epsilon))
+
+    @classmethod
+    def load(cls, path, seed: int = None) -> 'RhodeIslandMCCFR':
+        """Resume training from a checkpoint."""
+        store, extra = RegretStore.load(path)
+        solver = cls(method=str(extra["method"]), epsilon=float(extra["epsilon"]), seed=seed, store=store)
+        solver.iteration = int(extra["iteration"])
+        return solver
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Train Rhode Island Hold'em strategies with Monte Carlo CFR.")
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--report-every", type=int, default=1000)
+    parser.add_argument("--method", choices=("external", "outcome"), default="external")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--checkpoint", default=None, help="path of the .npz checkpoint to write")
+    parser.add_argument("--checkpoint-every", type=int, default=0)
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint")
+    parser.add_argument("--exploitability", action="store_true", help="measure exploitability in every report")
+    args = parser.parse_args(argv)
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs the --checkpoint to continue from")
+
+    if args.resume:
+        solver = RhodeIslandMCCFR.load(args.checkpoint, seed=args.seed)
+    else:
+        solver = RhodeIslandMCCFR(method=args.method, seed=args.seed)
+    solver.train(args.iterations, report_every=args.report_every, checkpoint_path=args.checkpoint,
+                 checkpoint_every=args.checkpoint_every, measure_exploitability=args.exploitability,
+                 callback=lambda report: print(
+                     f"Iteration {report['iteration']}: {report['infosets']:,} infosets, "
+                     f"{report['iterations_per_second']:,.0f} iterations/sec, "
+                     f"{report['bytes_per_infoset']:.0f} bytes/infoset"
+                     + (f", exploitability {report['exploitability']:.4f}" if "exploitability" in report else "")))
+    if args.checkpoint:
+        solver.save(args.checkpoint)
+
+if __name__ == "__main__":
+    main()
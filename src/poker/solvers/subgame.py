@@ -0,0 +1,339 @@
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from agents import Agent
+from betting import LEGAL_ACTIONS
+from evaluator import LookupHandRanker
+from game import PlayerAction, settle_pots
+from handstate import HandState, strength_from_ids
+from rules import MAX_RAISES
+
+NUM_CARDS = 52
+NUM_ACTIONS = len(PlayerAction)
+# Seconds to answer a decision in
+LATENCY = 0.1
+# Share of the latency kept back for handing out the work, merging and the last iteration's overrun
+LATENCY_MARGIN = 0.25
+# Chance that an iteration updating the player to act deals them their real hand rather than one from their range
+FOCUS = 0.5
+# The legal action columns of every legal action mask
+_COLUMNS: tuple[tuple[int, ...], ...] = tuple(tuple(action.value - 1 for action in actions)
+                                              for actions in LEGAL_ACTIONS)
+# Codes appended to the public history, three bits each, then six bits per card dealt
+_DEAL_CODE = 7
+# Bits of the hole card part of an information set key, room for two cards
+_HOLE_BITS = 12
+
+
+def _hole_key(hand) -> int:
+    """Return the hole card part of an information set key, six bits per card in id order."""
+    key = 0
+    for card in sorted(hand):
+        key = (key << 6) | card
+    return key
+
+
+class SubgameCFR:
+    """Monte Carlo CFR over the rest of a hand, from the decision of the seat to act at its root.
+
+    Every iteration samples a deal consistent with the public cards: hole
+    cards from each seat's range, uniform by default, and the rest of the
+    board. External sampling then walks every action of the updated seat
+    and samples the others, with regret matching+ at each information set
+    (hole cards plus the public actions and cards since the root).
+
+    Betting rounds beyond the first ``depth`` end in a leaf valued as if
+    everyone checked down to showdown. The seat to act at the root is dealt
+    its real hand in a ``focus`` share of its updates, and only its root
+    strategy is averaged, weighted by iteration, since that is the decision
+    being made.
+    """
+
+    def __init__(self, state: HandState, ranges: dict = None, depth: int = None, focus: float = FOCUS,
+                 seed: int = None, strength=strength_from_ids) -> None:
+        if state.to_act < 0:
+            raise ValueError("the hand is over")
+        if ranges and state.hole_cards != 1:
+            raise ValueError("ranges cover games with one hole card")
+        self.state: HandState = state.clone()
+        self.hero: int = state.to_act
+        self.focus: float = focus
+        self.rng = random.Random(seed)
+        self.strength = strength
+        self.stop_round: int = state.round + depth if depth is not None else len(state.round_limits)
+        self.regrets: dict[int, list[float]] = {}
+        self.root_sum: list[float] = [0.0] * NUM_ACTIONS
+        self.iteration: int = 0
+        self.board: tuple[int, ...] = state.board()
+        self.hero_hand: tuple[int, ...] = state.hand(self.hero)
+        self.hero_key: int = _hole_key(self.hero_hand)
+        self.num_board: int = state.board_dealt[-1]
+        # Weights of each seat's range over the cards not on the board
+        self._ranges: dict[int, list[float]] = {}
+        for seat, weights in (ranges or {}).items():
+            weights = [0.0 if card in self.board else float(weights[card]) for card in range(NUM_CARDS)]
+            if sum(weights) <= 0:
+                raise ValueError(f"the range of seat {seat} is empty")
+            self._ranges[seat] = weights
+        self._holes: list[int] = [0] * state.num_players
+        self._strengths: list[int] = [0] * state.num_players
+
+    def _deal(self, focus: bool) -> None:
+        """Sample the hidden cards into the state's deck.
+
+        A seat's range is drawn from with the cards already dealt taken out,
+        and a range with nothing left falls back to the unseen cards.
+        """
+        state = self.state
+        used = [False] * NUM_CARDS
+        for card in self.board:
+            used[card] = True
+        unseen = NUM_CARDS - len(self.board)
+        hands = [None] * state.num_players
+        if focus:
+            hands[self.hero] = self.hero_hand
+            for card in self.hero_hand:
+                used[card] = True
+            unseen -= len(self.hero_hand)
+        cards = range(NUM_CARDS)
+        for seat in range(state.num_players):
+            if hands[seat] is not None:
+                continue
+            hand = []
+            weights = self._ranges.get(seat)
+            for _ in range(state.hole_cards):
+                if unseen <= 0:
+                    raise ValueError("no unseen cards left to deal")
+                card = -1
+                if weights is not None:
+                    available = [0.0 if used[card] else weight for card, weight in zip(cards, weights)]
+                    if any(available):
+                        card = self.rng.choices(cards, weights=available)[0]
+                while card < 0 or used[card]:
+                    card = self.rng.randrange(NUM_CARDS)
+                used[card] = True
+                unseen -= 1
+                hand.append(card)
+            hands[seat] = tuple(hand)
+        rest = [card for card in cards if not used[card]]
+        self.rng.shuffle(rest)
+        board = self.board + tuple(rest[:self.num_board - len(self.board)])
+        state.deck = tuple(card for hand in hands for card in hand) + board
+        for seat, hand in enumerate(hands):
+            self._holes[seat] = _hole_key(hand)
+            self._strengths[seat] = self.strength(hand + board)
+
+    def _value(self, traverser: int) -> float:
+        """Return the traverser's chips from the pots of the hand as it stands, checked down to showdown."""
+        state = self.state
+        active = state.betting.active
+        contributions = state.contributions
+        if state.betting.num_active <= 1:
+            # The last seat standing wins every pot
+            winner = (active & -active).bit_length() - 1
+            return (sum(contributions) if traverser == winner else 0) - contributions[traverser]
+        winner, best, tied = -1, -1, False
+        for seat, strength in enumerate(self._strengths):
+            if active >> seat & 1:
+                if strength > best:
+                    winner, best, tied = seat, strength, False
+                elif strength == best:
+                    tied = True
+        if not tied and contributions[winner] >= max(contributions):
+            return (sum(contributions) if traverser == winner else 0) - contributions[traverser]
+        strengths = [strength if active >> seat & 1 else -1 for seat, strength in enumerate(self._strengths)]
+        return settle_pots(contributions, strengths, state.button)[traverser] - contributions[traverser]
+
+    def _child(self, public: int, action: int, traverser: int) -> float:
+        state = self.state
+        round = state.round
+        state.apply(action)
+        public = (public << 3) | (action + 1)
+        if state.terminal or state.round >= self.stop_round:
+            value = self._value(traverser)
+        else:
+            if state.round != round:
+                for card in state.deck[state.num_players * state.hole_cards + state.board_dealt[round]:
+                                       state.num_players * state.hole_cards + state.board_dealt[state.round]]:
+                    public = (((public << 3) | _DEAL_CODE) << 6) | card
+            value = self._traverse(public, traverser)
+        state.undo()
+        return value
+
+    def _traverse(self, public: int, traverser: int) -> float:
+        """Return the sampled value of the state for the traverser and update its regrets."""
+        betting = self.state.betting
+        seat = betting.to_act
+        actions = _COLUMNS[betting.legal]
+        key = (public << _HOLE_BITS) | self._holes[seat]
+        regrets = self.regrets.get(key)
+        if regrets is None:
+            regrets = self.regrets[key] = [0.0] * NUM_ACTIONS
+        total = sum(regrets[action] for action in actions)
+        if total > 0:
+            sigma = [regrets[action] / total for action in actions]
+        else:
+            sigma = [1.0 / len(actions)] * len(actions)
+
+        if seat != traverser:
+            x = self.rng.random()
+            for action, p in zip(actions, sigma):
+                x -= p
+                if x < 0:
+                    break
+            return self._child(public, action, traverser)
+
+        values = [self._child(public, action, traverser) for action in actions]
+        value = sum(p * v for p, v in zip(sigma, values))
+        for action, v in zip(actions, values):
+            regrets[action] = max(regrets[action] + v - value, 0.0)
+        if public == 1 and seat == self.hero and self._holes[seat] == self.hero_key:
+            for action, p in zip(actions, sigma):
+                self.root_sum[action] += self.iteration * p
+        return value
+
+    def iterate(self) -> None:
+        """Run one iteration, updating every seat still in the hand once on its own sampled deal."""
+        self.iteration += 1
+        state = self.state
+        for traverser in range(state.num_players):
+            if state.is_active(traverser):
+                self._deal(traverser == self.hero and self.rng.random() < self.focus)
+                self._traverse(1, traverser)
+
+    def run(self, seconds: float = None, iterations: int = None) -> int:
+        """Iterate until the time or iteration budget runs out, return the iterations run."""
+        deadline = time.perf_counter() + seconds if seconds is not None else None
+        start = self.iteration
+        while iterations is None or self.iteration - start < iterations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self.iterate()
+        return self.iteration - start
+
+    def strategy(self) -> list[float]:
+        """Return the average root strategy of the seat to act over action columns."""
+        return _normalize(self.root_sum, self.state.legal_actions())
+
+
+def _normalize(sums: list[float], legal: int) -> list[float]:
+    """Return sums as probabilities over action columns, uniform over the legal ones if they are all zero."""
+    total = sum(sums)
+    if total > 0:
+        return [value / total for value in sums]
+    actions = _COLUMNS[legal]
+    return [1.0 / len(actions) if action in actions else 0.0 for action in range(NUM_ACTIONS)]
+
+
+def _solve(state: HandState, ranges, depth, focus, seed, strength, seconds) -> tuple[list[float], int]:
+    """Run SubgameCFR for some seconds in a worker process, return its root strategy sums and iterations."""
+    cfr = SubgameCFR(state, ranges, depth, focus, seed, strength)
+    iterations = cfr.run(seconds=seconds)
+    return cfr.root_sum, iterations
+
+
+class SubgameSolver:
+    """Re-solve the rest of the hand at decision time within a latency bound.
+
+    Each solve runs SubgameCFR in ``workers`` processes, each with its own
+    seed, for the latency less a safety margin, and merges their root
+    strategy sums. The answer improves the longer it is allowed to run. The
+    worker pool is started with the solver and kept until close().
+    """
+
+    def __init__(self, latency: float = LATENCY, workers: int = None, depth: int = None,
+                 max_raises: int = MAX_RAISES, focus: float = FOCUS, seed: int = None,
+                 strength=strength_from_ids) -> None:
+        self.latency: float = latency
+        self.workers: int = workers or os.cpu_count() or 1
+        self.depth: int = depth
+        # Game.betting_round is uncapped, the search caps raises per round to keep the tree small
+        self.max_raises: int = max_raises
+        self.focus: float = focus
+        self.rng = random.Random(seed)
+        self.strength = strength
+        # Built before the pool starts, so forked workers share it
+        LookupHandRanker.table()
+        self._pool = multiprocessing.Pool(self.workers) if self.workers > 1 else None
+
+    def solve(self, state: HandState, ranges: dict = None, latency: float = None) -> dict:
+        """Return the strategy over action columns of the seat to act, with the iterations and seconds spent.
+
+        ``ranges`` maps seats to weights over card ids for the hole card they
+        may hold, uniform over the unseen cards for seats without one.
+        """
+        start_time = time.perf_counter()
+        latency = self.latency if latency is None else latency
+        seconds = latency * (1 - LATENCY_MARGIN)
+        jobs = [(state, ranges, self.depth, self.focus, self.rng.getrandbits(63), self.strength, seconds)
+                for _ in range(self.workers)]
+        if self._pool is None:
+            results = [_solve(*job) for job in jobs]
+        else:
+            results = self._pool.starmap(_solve, jobs)
+        sums = [sum(values) for values in zip(*(root_sum for root_sum, _ in results))]
+        return {"strategy": _normalize(sums, state.legal_actions()),
+                "iterations": sum(iterations for _, iterations in results),
+                "seconds": time.perf_counter() - start_time}
+
+    def close(self) -> None:
+        """Stop the worker pool."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> 'SubgameSolver':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SubgameAgent(Agent):
+    """Act by re-solving the hand of a live Game at every decision.
+
+    ``game`` may be set after construction, since the Game takes its agents
+    when it is built. ``ranges`` is passed to every solve. The solver is
+    owned by the caller, who closes it to stop its worker processes.
+    """
+
+    def __init__(self, solver: SubgameSolver, game=None, ranges: dict = None, seed: int = None) -> None:
+        self.solver: SubgameSolver = solver
+        self.game = game
+        self.ranges: dict = ranges
+        self.rng = random.Random(seed)
+
+    def act(self, states) -> list[PlayerAction]:
+        # Game asks for the decision it is in the middle of, which from_game copies
+        actions = []
+        for _ in states:
+            state = HandState.from_game(self.game, max_raises=self.solver.max_raises)
+            strategy = self.solver.solve(state, self.ranges)["strategy"]
+            column = self.rng.choices(range(NUM_ACTIONS), weights=strategy)[0]
+            actions.append(PlayerAction(column + 1))
+        return actions
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Re-solve a random Rhode Island Hold'em decision in real time.")
+    parser.add_argument("--latency", type=float, default=LATENCY * 1000, help="milliseconds to answer in")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to the CPU count")
+    parser.add_argument("--depth", type=int, default=None, help="betting rounds searched before leaf estimates")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    state = HandState(rng.sample(range(NUM_CARDS), NUM_CARDS), [200, 200], button=1, max_raises=MAX_RAISES)
+    with SubgameSolver(latency=args.latency / 1000, workers=args.workers, depth=args.depth,
+                       seed=args.seed) as solver:
+        result = solver.solve(state)
+    strategy = ", ".join(f"{action.name.lower()} {result['strategy'][action.value - 1]:.3f}"
+                         for action in PlayerAction)
+    print(f"Seat {state.to_act} holding {state.hand(state.to_act)[0]}: {strategy}")
+    print(f"{result['iterations']:,} iterations in {result['seconds'] * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
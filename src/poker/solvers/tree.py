@@ -0,0 +1,208 @@
+import argparse
+from math import comb
+import numpy as np
+from game import PlayerAction
+from rules import ANTE, BOARD_CARDS, MAX_RAISES, ROUND_LIMITS, START_OFFSETS
+
+# Values of GameTree.player for nodes where no seat acts
+CHANCE = -1
+FOLDED = -2
+SHOWDOWN = -3
+
+_FOLD = PlayerAction.FOLD.value
+_CHECK = PlayerAction.CHECK.value
+_CALL = PlayerAction.CALL.value
+_RAISE = PlayerAction.RAISE.value
+
+
+class GameTree:
+    """The public betting tree of a limit game, stored in flat arrays.
+
+    Node 0 is the root and nodes are laid out breadth first, so the children
+    of node ``n`` are ``child_offset[n]`` up to ``child_offset[n] +
+    num_children[n]``. Per node the arrays hold:
+
+    - ``parent``: parent node, -1 for the root
+    - ``action``: PlayerAction value that led here, 0 for the root and after chance
+    - ``player``: seat to act, or CHANCE, FOLDED or SHOWDOWN
+    - ``round``: betting round the node belongs to
+    - ``pot``: chips in the pot
+    - ``contributions``: chips each seat has put in, shape (num_nodes, num_players)
+    - ``active``: bitmask of the seats that have not folded
+
+    Chance nodes deal the next round's board cards and have a single child;
+    which cards come is left to whatever walks the tree.
+    """
+
+    def __init__(self, num_players: int, round_limits, board_cards, parent, action, player, round, pot,
+                 contributions, active, child_offset, num_children) -> None:
+        self.num_players: int = num_players
+        self.round_limits: tuple[int, ...] = tuple(round_limits)
+        self.board_cards: tuple[int, ...] = tuple(board_cards)
+        self.parent: np.ndarray = parent
+        self.action: np.ndarray = action
+        self.player: np.ndarray = player
+        self.round: np.ndarray = round
+        self.pot: np.ndarray = pot
+        self.contributions: np.ndarray = contributions
+        self.active: np.ndarray = active
+        self.child_offset: np.ndarray = child_offset
+        self.num_children: np.ndarray = num_children
+
+    @classmethod
+    def build(cls, num_players: int = 2, ante: int = ANTE, round_limits=ROUND_LIMITS, start_offsets=START_OFFSETS,
+              max_raises: int = MAX_RAISES, board_cards=BOARD_CARDS, button: int = None) -> 'GameTree':
+        """Build the tree for the limit betting rules.
+
+        The button defaults to the last seat, so that heads-up the first seat
+        acts first in every round like in the solvers.
+        """
+        button = num_players - 1 if button is None else button
+        everyone = (1 << num_players) - 1
+        columns = {name: [] for name in ("parent", "action", "player", "round", "contributions", "active")}
+        # Betting state of each decision node: (players still to act, raises this round)
+        states = []
+
+        def add(parent, action, player, round, contributions, active, state=None) -> None:
+            for name, value in zip(columns, (parent, action, player, round, tuple(contributions), active)):
+                columns[name].append(value)
+            states.append(state)
+
+        def first_to_act(round, active) -> int:
+            seat = (button + start_offsets[round]) % num_players
+            while not active >> seat & 1:
+                seat = (seat + 1) % num_players
+            return seat
+
+        add(-1, 0, first_to_act(0, everyone), 0, [ante] * num_players, everyone, (num_players, 0))
+        child_offset = []
+        num_children = []
+        node = 0
+        while node < len(states):
+            player = columns["player"][node]
+            round = columns["round"][node]
+            contributions = list(columns["contributions"][node])
+            active = columns["active"][node]
+            child_offset.append(len(states))
+            if player == CHANCE:
+                add(node, 0, first_to_act(round, active), round, contributions, active,
+                    (bin(active).count("1"), 0))
+            elif player >= 0:
+                pending, raises = states[node]
+                facing = max(contributions) - contributions[player]
+                actions = [_FOLD, _CALL] if facing else [_CHECK]
+                if raises < max_raises:
+                    actions.append(_RAISE)
+                for action in actions:
+                    child_contributions = list(contributions)
+                    child_active = active
+                    child_pending = pending - 1
+                    child_raises = raises
+                    if action == _FOLD:
+                        child_active &= ~(1 << player)
+                    elif action == _RAISE:
+                        child_contributions[player] += facing + round_limits[round]
+                        child_raises += 1
+                        child_pending = bin(active).count("1") - 1
+                    else:
+                        child_contributions[player] += facing
+                    if bin(child_active).count("1") == 1:
+                        add(node, action, FOLDED, round, child_contributions, child_active)
+                    elif child_pending == 0 and round == len(round_limits) - 1:
+                        add(node, action, SHOWDOWN, round, child_contributions, child_active)
+                    elif child_pending == 0:
+                        add(node, action, CHANCE, round + 1, child_contributions, child_active)
+                    else:
+                        seat = (player + 1) % num_players
+                        while not child_active >> seat & 1:
+                            seat = (seat + 1) % num_players
+                        add(node, action, seat, round, child_contributions, child_active,
+                            (child_pending, child_raises))
+            num_children.append(len(states) - child_offset[-1])
+            node += 1
+
+        contributions = np.array(columns["contributions"], dtype=np.int32)
+        return cls(
+            num_players=num_players,
+            round_limits=round_limits,
+            board_cards=board_cards,
+            parent=np.array(columns["parent"], dtype=np.int32),
+            action=np.array(columns["action"], dtype=np.int8),
+            player=np.array(columns["player"], dtype=np.int8),
+            round=np.array(columns["round"], dtype=np.int8),
+            pot=contributions.sum(axis=1, dtype=np.int32),
+            contributions=contributions,
+            active=np.array(columns["active"], dtype=np.uint16),
+            child_offset=np.array(child_offset, dtype=np.int32),
+            num_children=np.array(num_children, dtype=np.int8),
+        )
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.parent)
+
+    def children(self, node: int) -> range:
+        """Return the indexes of a node's children."""
+        start = int(self.child_offset[node])
+        return range(start, start + int(self.num_children[node]))
+
+    def is_terminal(self, node: int) -> bool:
+        """Return True if the hand is over at a node."""
+        return self.player[node] in (FOLDED, SHOWDOWN)
+
+    def decision_nodes(self) -> np.ndarray:
+        """Return the indexes of the nodes where a seat acts."""
+        return np.flatnonzero(self.player >= 0)
+
+    def infoset_count(self, deck_size: int = 52, hole_cards: int = 1) -> int:
+        """Return the number of information sets over all private and board cards.
+
+        A seat's information set is a decision node together with its own
+        hole cards and the board dealt so far.
+        """
+        card_states = []
+        states = comb(deck_size, hole_cards)
+        remaining = deck_size - hole_cards
+        for dealt in self.board_cards:
+            states *= comb(remaining, dealt)
+            remaining -= dealt
+            card_states.append(states)
+        rounds = self.round[self.decision_nodes()]
+        return int(sum(card_states[r] * count for r, count in enumerate(np.bincount(rounds, minlength=len(card_states)))))
+
+    def memory_bytes(self) -> int:
+        """Return the bytes held by the node arrays."""
+        return sum(array.nbytes for array in (self.parent, self.action, self.player, self.round, self.pot,
+                                              self.contributions, self.active, self.child_offset, self.num_children))
+
+    def summary(self, deck_size: int = 52, hole_cards: int = 1) -> str:
+        """Node, infoset and memory report of the tree."""
+        terminals = int(np.isin(self.player, (FOLDED, SHOWDOWN)).sum())
+        return (f"Nodes: {self.num_nodes:,} ({len(self.decision_nodes()):,} decision, {terminals:,} terminal)\n"
+                f"Infosets: {self.infoset_count(deck_size=deck_size, hole_cards=hole_cards):,}\n"
+                f"Memory: {self.memory_bytes():,} bytes")
+
+
+def kuhn_tree() -> GameTree:
+    """Return the Kuhn poker tree: ante 1, one bet of 1, no board."""
+    return GameTree.build(num_players=2, ante=1, round_limits=(1,), start_offsets=(1,), max_raises=1, board_cards=(0,))
+
+
+def rhode_island_tree(max_raises: int = MAX_RAISES) -> GameTree:
+    """Return the heads-up Rhode Island Hold'em tree with the limits in rules.py."""
+    return GameTree.build(num_players=2, max_raises=max_raises)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Build a limit betting tree and report its size.")
+    parser.add_argument("--game", choices=("kuhn", "rhode-island"), default="rhode-island")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--max-raises", type=int, default=MAX_RAISES)
+    args = parser.parse_args(argv)
+    if args.game == "kuhn":
+        print(kuhn_tree().summary(deck_size=3))
+    else:
+        print(GameTree.build(num_players=args.players, max_raises=args.max_raises).summary())
+
+if __name__ == "__main__":
+    main()
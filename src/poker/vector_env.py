@@ -0,0 +1,267 @@
+import argparse
+import time
+import numpy as np
+from agents import ACTION_COLUMNS, NUM_PLAYER_ACTIONS, StateBatch, sample_actions
+from evaluator import NUM_CARDS, LookupHandRanker
+from game import settle_batch
+from rules import ANTE, BOARD_CARDS, ROUND_LIMITS, START_OFFSETS, START_STACK, PlayerAction
+from seeding import shuffle_batch
+
+FOLD = ACTION_COLUMNS[PlayerAction.FOLD]
+CHECK = ACTION_COLUMNS[PlayerAction.CHECK]
+CALL = ACTION_COLUMNS[PlayerAction.CALL]
+RAISE = ACTION_COLUMNS[PlayerAction.RAISE]
+
+
+class VectorEnv:
+    """Play hands on many tables at once, one NumPy array per field of the table state.
+
+    Each table follows the rules of run.play_round with Game.betting_round,
+    Pot.settle and Dealer.showdown_strengths: antes, one hole card, a
+    betting round per street with only affordable actions offered, calls
+    and raises that put in the full current bet, and side pots whose odd
+    chips go left of the button. Actions are action columns (PlayerAction.value
+    - 1), one per table, and ``step`` applies them to every table where a
+    hand is in progress.
+    """
+
+    def __init__(self, num_tables: int, num_players: int = 2, seed: int = None, ante: int = ANTE,
+                 round_limits=ROUND_LIMITS, start_offsets=START_OFFSETS, board_cards=BOARD_CARDS,
+                 start_stack: int = START_STACK, button: int = 1) -> None:
+        if 1 + sum(board_cards) != 3:
+            raise ValueError("showdowns rank one hole card with a 2-card board")
+        self.num_tables: int = num_tables
+        self.num_players: int = num_players
+        self.ante: int = ante
+        self.round_limits: np.ndarray = np.array(round_limits, dtype=np.int32)
+        self.start_offsets: np.ndarray = np.array(start_offsets, dtype=np.int32)
+        # Board slots filled before each round starts
+        self.board_dealt: np.ndarray = np.cumsum(board_cards).astype(np.int32)
+        self.start_stack: int = start_stack
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+        self.strength_table: np.ndarray = np.frombuffer(LookupHandRanker.table(), dtype=np.uint16)
+
+        n, p = num_tables, num_players
+        self.stacks: np.ndarray = np.full((n, p), start_stack, dtype=np.int32)
+        self.chips_in_play: np.ndarray = np.zeros((n, p), dtype=np.int32)
+        self.status: np.ndarray = np.zeros((n, p), dtype=bool)
+        self.button: np.ndarray = np.full(n, button % p, dtype=np.int32)
+        self.hands: np.ndarray = np.full((n, p), -1, dtype=np.int8)
+        self.board: np.ndarray = np.full((n, int(self.board_dealt[-1])), -1, dtype=np.int8)
+        self.current_bet: np.ndarray = np.zeros(n, dtype=np.int32)
+        self.pot: np.ndarray = np.zeros(n, dtype=np.int32)
+        self.round: np.ndarray = np.zeros(n, dtype=np.int8)
+        self.to_act: np.ndarray = np.full(n, -1, dtype=np.int32)
+        self.acted: np.ndarray = np.zeros((n, p), dtype=bool)
+        self.last_raiser: np.ndarray = np.full(n, -1, dtype=np.int32)
+        self.raises: np.ndarray = np.zeros(n, dtype=np.int32)
+        # RhodeIslandMCCFR public history code, for agents.TabularAgent
+        self.public: np.ndarray = np.ones(n, dtype=np.int64)
+        self.done: np.ndarray = np.ones(n, dtype=bool)
+        # Cards each hand will use: hole cards in seat order, then the board
+        self.deals: np.ndarray = np.zeros((n, p + self.board.shape[1]), dtype=np.int8)
+        # Stacks at the start of the current hand, and how the last finished hand changed them
+        self.start_stacks: np.ndarray = self.stacks.copy()
+        self.payoffs: np.ndarray = np.zeros((n, p), dtype=np.int32)
+        self.rebuys: np.ndarray = np.zeros((n, p), dtype=np.int32)
+        self.showdown: np.ndarray = np.zeros(n, dtype=bool)
+        self._rows: np.ndarray = np.arange(n)
+
+    def shuffle(self, tables: np.ndarray) -> np.ndarray:
+        """Return the cards of a fresh deal for some tables, by sorting random keys."""
+        return shuffle_batch(self.rng, len(tables), self.deals.shape[1])
+
+    def reset(self, tables=None, deals: np.ndarray = None) -> None:
+        """Start a new hand on some tables, all by default.
+
+        Players who cannot post the ante rebuy to the starting stack first,
+        like run.rebuy. ``deals`` optionally fixes the cards, one row per
+        table: hole cards in seat order, then the board.
+        """
+        tables = self._rows if tables is None else np.asarray(tables)
+        if tables.dtype == bool:
+            tables = np.flatnonzero(tables)
+        if len(tables) == 0:
+            return
+        broke = self.stacks[tables] < self.ante
+        self.stacks[tables] = np.where(broke, self.start_stack, self.stacks[tables])
+        self.rebuys[tables] += broke
+        self.deals[tables] = self.shuffle(tables) if deals is None else deals
+        self.hands[tables] = self.deals[tables, :self.num_players]
+        self.board[tables] = -1
+        self.start_stacks[tables] = self.stacks[tables]
+        self.stacks[tables] -= self.ante
+        self.chips_in_play[tables] = self.ante
+        self.pot[tables] = self.ante * self.num_players
+        self.status[tables] = True
+        self.showdown[tables] = False
+        self.done[tables] = False
+        self.public[tables] = 1
+        self._start_round(tables, 0)
+
+    def _start_round(self, tables: np.ndarray, round: int) -> None:
+        """Deal the round's board cards and find who acts first."""
+        dealt_before = int(self.board_dealt[round - 1]) if round else 0
+        for slot in range(dealt_before, int(self.board_dealt[round])):
+            cards = self.deals[tables, self.num_players + slot]
+            self.board[tables, slot] = cards
+            self.public[tables] = (((self.public[tables] << 2) | 3) << 6) | cards
+        self.round[tables] = round
+        self.current_bet[tables] = 0
+        self.acted[tables] = False
+        self.last_raiser[tables] = -1
+        self.raises[tables] = 0
+        start = (self.button[tables] + int(self.start_offsets[round])) % self.num_players
+        self.to_act[tables] = self._next_to_act(tables, start - 1)
+
+    def _next_to_act(self, tables: np.ndarray, after: np.ndarray) -> np.ndarray:
+        """Return the first seat after ``after`` that still has to act this round, or -1.
+
+        That is a seat that has not folded, has not acted since the last
+        raise and is not the last raiser, the same seats betting_round visits.
+        """
+        seats = (after[:, None] + np.arange(1, self.num_players + 1)) % self.num_players
+        rows = tables[:, None]
+        needs = self.status[rows, seats] & ~self.acted[rows, seats] & (seats != self.last_raiser[tables, None])
+        return np.where(needs.any(axis=1), seats[np.arange(len(tables)), needs.argmax(axis=1)], -1)
+
+    def legal_actions(self) -> np.ndarray:
+        """Return the (N, 4) mask of the actions open to the seat to act, over PlayerAction columns."""
+        live = ~self.done
+        seat = np.maximum(self.to_act, 0)
+        stack = self.stacks[self._rows, seat]
+        raise_amount = self.current_bet + self.round_limits[self.round]
+        unopened = self.current_bet == 0
+        legal = np.zeros((self.num_tables, NUM_PLAYER_ACTIONS), dtype=bool)
+        legal[:, FOLD] = live & ~unopened
+        legal[:, CHECK] = live & unopened
+        legal[:, CALL] = live & ~unopened & (stack >= self.current_bet)
+        legal[:, RAISE] = live & (stack >= raise_amount)
+        return legal
+
+    def states(self, tables=None) -> StateBatch:
+        """Return the decision states of the seats to act on some tables, all live ones by default."""
+        tables = np.flatnonzero(~self.done) if tables is None else np.asarray(tables)
+        seat = self.to_act[tables]
+        return StateBatch(
+            player=seat,
+            hand=self.hands[tables, seat][:, None],
+            board=self.board[tables],
+            round=self.round[tables],
+            to_call=self.current_bet[tables],
+            raise_amount=self.current_bet[tables] + self.round_limits[self.round[tables]],
+            pot=self.pot[tables],
+            stack=self.stacks[tables, seat],
+            legal=self.legal_actions()[tables],
+            public=self.public[tables],
+        )
+
+    def step(self, actions: np.ndarray) -> np.ndarray:
+        """Apply one action per table and return the mask of tables whose hand just ended.
+
+        Actions on tables with no hand in progress are ignored.
+        """
+        actions = np.asarray(actions)
+        live = np.flatnonzero(~self.done)
+        legal = self.legal_actions()
+        if not legal[live, actions[live]].all():
+            raise ValueError("illegal action for the seat to act")
+        seat = self.to_act[live]
+        action = actions[live]
+        raise_amount = self.current_bet[live] + self.round_limits[self.round[live]]
+        amount = np.select([action == CALL, action == RAISE], [self.current_bet[live], raise_amount], 0)
+        self.stacks[live, seat] -= amount
+        self.chips_in_play[live, seat] += amount
+        self.pot[live] += amount
+        self.status[live, seat] &= action != FOLD
+        self.public[live] = np.where(action == FOLD, self.public[live],
+                                     (self.public[live] << 2) | np.where(action == RAISE, 2, 1))
+
+        raised = live[action == RAISE]
+        self.current_bet[raised] = raise_amount[action == RAISE]
+        self.last_raiser[raised] = self.to_act[raised]
+        self.raises[raised] += 1
+        self.acted[raised] = False
+        not_raised = live[action != RAISE]
+        self.acted[not_raised, self.to_act[not_raised]] = True
+
+        self.to_act[live] = self._next_to_act(live, self.to_act[live])
+        ended = np.zeros(self.num_tables, dtype=bool)
+        round_over = live[self.to_act[live] < 0]
+        if len(round_over):
+            folded_out = self.status[round_over].sum(axis=1) <= 1
+            last_round = self.round[round_over] == len(self.round_limits) - 1
+            finished = round_over[folded_out | last_round]
+            self._settle(finished)
+            ended[finished] = True
+            continuing = round_over[~(folded_out | last_round)]
+            for round in np.unique(self.round[continuing]):
+                self._start_round(continuing[self.round[continuing] == round], int(round) + 1)
+        return ended
+
+    def _settle(self, tables: np.ndarray) -> None:
+        """Award the pots of finished hands like Pot.settle."""
+        if len(tables) == 0:
+            return
+        status = self.status[tables]
+        contested = status.sum(axis=1) > 1
+        flop, turn = self.board[tables, 0].astype(np.int32), self.board[tables, 1].astype(np.int32)
+        index = (self.hands[tables].astype(np.int32) * NUM_CARDS + flop[:, None]) * NUM_CARDS + turn[:, None]
+        # A hand that folded out is not ranked, the last player standing wins at strength 0
+        strength = np.where(contested[:, None], self.strength_table[np.where(contested[:, None], index, 0)], 0)
+        strength = np.where(status, strength.astype(np.int32), -1)
+        self.stacks[tables] += settle_batch(self.chips_in_play[tables], strength, self.button[tables]).astype(np.int32)
+        self.pot[tables] = 0
+        self.showdown[tables] = contested
+        self.payoffs[tables] = self.stacks[tables] - self.start_stacks[tables]
+        self.done[tables] = True
+        self.to_act[tables] = -1
+
+    def play(self, num_hands: int, agents: dict = None) -> dict:
+        """Play hands on every table until num_hands have finished, restarting tables as they end.
+
+        ``agents`` maps seats to agents with an act_batch(StateBatch)
+        method, seats without one play uniformly at random. Returns totals
+        of the hands played.
+        """
+        agents = agents or {}
+        started = min(num_hands, self.num_tables)
+        self.reset(np.arange(started))
+        self.done[started:] = True
+        finished = 0
+        payoffs = np.zeros(self.num_players, dtype=np.int64)
+        showdowns = 0
+        while finished < num_hands:
+            legal = self.legal_actions()
+            actions = sample_actions(np.zeros(legal.shape), legal, self.rng)
+            for seat, agent in agents.items():
+                tables = np.flatnonzero(~self.done & (self.to_act == seat))
+                if len(tables):
+                    actions[tables] = agent.act_batch(self.states(tables))
+            ended = self.step(actions)
+            tables = np.flatnonzero(ended)
+            finished += len(tables)
+            payoffs += self.payoffs[tables].sum(axis=0)
+            showdowns += int(self.showdown[tables].sum())
+            restart = tables[:max(0, num_hands - started)]
+            started += len(restart)
+            self.reset(restart)
+        return {"hands": finished, "payoffs": payoffs.tolist(), "showdowns": showdowns}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Play random hands on many tables in lockstep.")
+    parser.add_argument("--hands", type=int, default=1_000_000, help="number of hands to play")
+    parser.add_argument("--tables", type=int, default=10_000, help="tables stepped together")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    totals = VectorEnv(num_tables=args.tables, seed=args.seed).play(args.hands)
+    execution_time = time.perf_counter() - start_time
+    print(f"Hands: {totals['hands']}, showdowns: {totals['showdowns']}, stack deltas: {totals['payoffs']}")
+    print(f"Execution time for {args.hands} rounds: {execution_time:.9f} seconds")
+    print(f"Hands per second: {args.hands / execution_time:,.0f}")
+
+if __name__ == "__main__":
+    main()
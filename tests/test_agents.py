@@ -0,0 +1,101 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import random
+import unittest
+import numpy as np
+from agents import (DecisionState, RandomAgent, StateBatch, TabularAgent, VectorizedPolicyAgent, public_history,
+                    sample_actions)
+from cardecky import Deck
+from events import NullSink
+from game import Dealer, Game, Player, PlayerAction, Pot
+from solvers.mccfr import CALL, RAISE, RegretStore, append_action, append_card, infoset_key
+
+def make_state(hand=(5,), board=(), legal=(PlayerAction.CHECK, PlayerAction.RAISE), history=((),)) -> DecisionState:
+    return DecisionState(player_ID=0, hand=hand, board=board, legal_actions=list(legal), to_call=0,
+                         raise_amount=2, pot=2, stack=199, history=history)
+
+class TestPublicHistory(unittest.TestCase):
+    def test_matches_mccfr_codes(self) -> None:
+        """Test that betting histories map to the solver's public history codes"""
+        history = ((PlayerAction.RAISE, PlayerAction.CALL), (PlayerAction.CHECK,))
+        expected = append_action(append_card(append_action(append_action(1, RAISE), CALL), 17), CALL)
+        self.assertEqual(public_history(history, (17,)), expected)
+        self.assertEqual(public_history(((),), ()), 1)
+
+class TestStateBatch(unittest.TestCase):
+    def test_from_states(self) -> None:
+        batch = StateBatch.from_states([make_state(), make_state(hand=(9,), board=(3,), history=((), ()),
+                                                                 legal=(PlayerAction.FOLD, PlayerAction.CALL))])
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.board.tolist(), [[-1], [3]])
+        self.assertEqual(batch.round.tolist(), [0, 1])
+        self.assertEqual(batch.legal.tolist(), [[False, True, False, True], [True, False, True, False]])
+
+class TestSampleActions(unittest.TestCase):
+    def test_only_legal_actions(self) -> None:
+        """Test that illegal actions are never drawn, even when they carry weight"""
+        legal = np.tile([True, False, True, False], (1000, 1))
+        probs = np.tile([0.2, 10.0, 0.8, 10.0], (1000, 1))
+        columns = sample_actions(probs, legal, np.random.default_rng(0))
+        self.assertTrue(set(columns.tolist()) <= {0, 2})
+        self.assertAlmostEqual((columns == 2).mean(), 0.8, delta=0.05)
+
+    def test_uniform_without_weight(self) -> None:
+        legal = np.array([[False, True, False, True]])
+        columns = sample_actions(np.zeros((1, 4)), legal, np.random.default_rng(0), greedy=True)
+        self.assertIn(columns[0], (1, 3))
+
+class TestAgents(unittest.TestCase):
+    def test_random_agent(self) -> None:
+        states = [make_state() for _ in range(50)]
+        actions = RandomAgent(rng=random.Random(1)).act(states)
+        self.assertEqual(len(actions), 50)
+        self.assertTrue(set(actions) <= {PlayerAction.CHECK, PlayerAction.RAISE})
+
+    def test_tabular_agent_follows_store(self) -> None:
+        """Test that the tabular agent plays the stored average strategy"""
+        store = RegretStore()
+        store.strategy_sum[store.row(infoset_key(1, 5)), RAISE] = 1.0
+        agent = TabularAgent.from_store(store, seed=0)
+        self.assertEqual(agent.act([make_state()] * 20), [PlayerAction.RAISE] * 20)
+        # Information sets that were never trained play uniformly
+        unseen = agent.act([make_state(hand=(6,))] * 200)
+        self.assertGreater(unseen.count(PlayerAction.CHECK), 50)
+        self.assertGreater(unseen.count(PlayerAction.RAISE), 50)
+
+    def test_vectorized_agent(self) -> None:
+        """Test that the policy sees the whole batch in one call"""
+        calls = []
+        def policy(batch):
+            calls.append(len(batch))
+            return np.where(batch.hand >= 40, 2.0, 0.0) * [0, 0, 0, 1] + [0, 1, 0, 0]
+        states = [make_state(hand=(card,)) for card in range(52)]
+        actions = VectorizedPolicyAgent(policy, greedy=True).act(states)
+        self.assertEqual(calls, [52])
+        self.assertEqual(actions, [PlayerAction.CHECK] * 40 + [PlayerAction.RAISE] * 12)
+
+class TestGameAgents(unittest.TestCase):
+    def test_game_asks_agents(self) -> None:
+        """Test that betting rounds ask each player's agent and record the history"""
+        seen = []
+        class AlwaysCall(RandomAgent):
+            def act(self, states):
+                seen.extend(states)
+                return [PlayerAction.CALL if PlayerAction.CALL in state.legal_actions else PlayerAction.CHECK
+                        for state in states]
+        pot = Pot()
+        dealer = Dealer(pot=pot, deck=Deck())
+        players = [Player(player_ID=i, stack=200, hand=[], status=True, chips_in_play=0) for i in range(2)]
+        game = Game(players=players, dealer=dealer, betting_limit=2, sink=NullSink(), agents={1: AlwaysCall()})
+        dealer.deck.shuffle()
+        dealer.deal_hand(players)
+        game.new_hand()
+        game.betting_round(button=0, start_offset=1, round_limit=2)
+        self.assertEqual(seen[0].player_ID, 1)
+        self.assertEqual(seen[0].hand, (players[1].hand[0].id,))
+        self.assertEqual(len(game.history), 1)
+        self.assertEqual(game.history[0][0], PlayerAction.CHECK)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import tempfile
+import unittest
+import numpy as np
+from analytics import describe, pot_distributions, showdown_frequency, win_rate_by_rank
+from columnar import ColumnarWriter
+from handlog import RECORD
+
+def make_records() -> np.ndarray:
+    """Three hands: an ace beating a two at showdown, a fold and a split pot"""
+    records = np.zeros(3, dtype=RECORD)
+    records["hole"] = -1
+    records["board"] = -1
+    records["num_players"] = 2
+    records["hole"][:, :2] = [[48, 0], [49, 1], [5, 6]]
+    records["board"][[0, 2]] = [[10, 20], [30, 40]]
+    records["showdown"] = [True, False, True]
+    records["stack_deltas"][:, :2] = [[1, -1], [-1, 1], [0, 0]]
+    records["pot"] = [2, 2, 2]
+    return records
+
+class TestAnalytics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        with ColumnarWriter(self.directory.name, num_players=2, chunk_size=2) as writer:
+            writer.write(make_records())
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_showdown_frequency(self) -> None:
+        self.assertAlmostEqual(showdown_frequency(self.directory.name), 2 / 3)
+
+    def test_win_rate_by_rank(self) -> None:
+        stats = win_rate_by_rank(self.directory.name)
+        self.assertEqual(stats[14]["hands"], 2)
+        self.assertEqual(stats[14]["win_rate"], 0.5)
+        self.assertEqual(stats[2]["hands"], 2)
+        self.assertEqual(stats[2]["win_rate"], 0.5)
+        self.assertEqual(stats[3]["average_delta"], 0.0)
+
+    def test_pot_distributions(self) -> None:
+        """Test that only hands reaching a round count towards its distribution"""
+        counts = pot_distributions(self.directory.name)
+        self.assertEqual([int(c.sum()) for c in counts], [3, 2, 2])
+        self.assertEqual(describe(counts[0])["median"], 2)
+        self.assertEqual(describe(np.zeros(0, dtype=np.int64))["hands"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
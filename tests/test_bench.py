@@ -0,0 +1,48 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import contextlib
+import io
+import tempfile
+import unittest
+from bench import BENCHMARKS, compare, compare_interleaved, load, main, run_suite, save
+
+class TestBench(unittest.TestCase):
+    def test_every_benchmark_runs(self) -> None:
+        results = run_suite(sizes=[20], repeat=1)
+        self.assertEqual(set(results["results"]), {f"{name}/20" for name in BENCHMARKS})
+        for result in results["results"].values():
+            self.assertGreater(result["hands_per_second"], 0)
+
+    def test_compare_flags_regressions(self) -> None:
+        baseline = {"results": {"a/10": {"hands_per_second": 100.0}, "b/10": {"hands_per_second": 100.0}}}
+        current = {"results": {"a/10": {"hands_per_second": 95.0}, "b/10": {"hands_per_second": 50.0},
+                               "c/10": {"hands_per_second": 1.0}}}
+        rows = compare(current, baseline, tolerance=0.1)
+        self.assertEqual([(row["benchmark"], row["regression"]) for row in rows], [("a/10", False), ("b/10", True)])
+        self.assertAlmostEqual(rows[1]["ratio"], 0.5)
+
+    def test_interleaved_against_a_reference_tree(self) -> None:
+        """Test timing against a reference tree, here this one, and skipping benchmarks it cannot run"""
+        here = os.path.dirname(os.path.abspath(sys.modules["bench"].__file__))
+        rows, skipped = compare_interleaved(here, ["rank_hand_lookup"], sizes=[10], repeat=1, rounds=2)
+        self.assertEqual([row["benchmark"] for row in rows], ["rank_hand_lookup/10"])
+        self.assertGreater(rows[0]["ratio"], 0)
+        self.assertEqual(skipped, [])
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(compare_interleaved(directory, ["rank_hand_lookup"], sizes=[10], repeat=1, rounds=2),
+                             ([], ["rank_hand_lookup"]))
+            # Nothing compared fails the gate
+            with self.assertRaises(SystemExit) as raised, contextlib.redirect_stdout(io.StringIO()):
+                main(["rank_hand_lookup", "--sizes", "10", "--repeat", "1", "--rounds", "1", "--reference", directory])
+            self.assertNotEqual(raised.exception.code, 0)
+
+    def test_save_and_load(self) -> None:
+        results = run_suite(["rank_hand_lookup"], sizes=[10], repeat=1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "nested", "baseline.json")
+            save(results, path)
+            self.assertEqual(load(path), results)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import unittest
+import numpy as np
+from game import PlayerAction
+from solvers.best_response import (BestResponse, CardModel, TabularPolicy, UniformPolicy, kuhn_cards,
+                                   kuhn_policy, mccfr_policy)
+from solvers.kuhn import KuhnCFR
+from solvers.mccfr import CALL, RegretStore, infoset_key
+from solvers.tree import CHANCE, FOLDED, GameTree, kuhn_tree, rhode_island_tree
+
+def brute_force_value(tree, strength, policy, br_player):
+    """Best response value found by walking every deal in Python, for checking BestResponse."""
+    deck = strength.shape[-1]
+
+    def values(node, board, reach):
+        # reach maps the opponent's hole card to its reach probability
+        player = int(tree.player[node])
+        contributions = tree.contributions[node]
+        result = {}
+        for hole in range(deck):
+            if hole in board:
+                continue
+            if player == FOLDED:
+                won = tree.active[node] >> br_player & 1
+                payoff = contributions[1 - br_player] if won else -contributions[br_player]
+                result[hole] = sum(payoff * r for card, r in reach.items() if card != hole)
+            elif player == CHANCE:
+                result[hole] = 0.0
+        if player == CHANCE:
+            for card in range(deck):
+                if card in board:
+                    continue
+                child = values(tree.children(node)[0], board + (card,),
+                               {hole: r for hole, r in reach.items() if hole != card})
+                for hole in result:
+                    if hole != card:
+                        result[hole] += child[hole]
+            return result
+        if player >= 0:
+            children = tree.children(node)
+            if player == br_player:
+                child_values = [values(child, board, reach) for child in children]
+                return {hole: max(v[hole] for v in child_values) for hole in child_values[0]}
+            sigma = policy.action_probs(tree, node, len(board))
+            index = board + (slice(None),)
+            child_values = [values(child, board, {hole: r * float(np.broadcast_to(
+                sigma[..., i], (deck,) * (len(board) + 1))[index][hole]) for hole, r in reach.items()})
+                for i, child in enumerate(children)]
+            return {hole: sum(v[hole] for v in child_values) for hole in child_values[0]}
+        if player != FOLDED:
+            for hole in range(deck):
+                if hole not in board:
+                    mine = strength[board + (hole,)]
+                    result[hole] = contributions[br_player] * sum(
+                        np.sign(mine - strength[board + (card,)]) * r for card, r in reach.items() if card != hole)
+        return result
+
+    total = sum(values(0, (), {card: 1.0 for card in range(deck)}).values())
+    deals = 1
+    for i in range(strength.ndim + 1):
+        deals *= deck - i
+    return total / deals
+
+class TestBestResponse(unittest.TestCase):
+    def test_matches_kuhn_solver(self) -> None:
+        """Test that the tree best response agrees with the Kuhn solver's own"""
+        solver = KuhnCFR(plus=True)
+        solver.train(200)
+        best_response = BestResponse(kuhn_tree(), kuhn_cards())
+        policy = kuhn_policy(best_response.tree, solver.average_strategy())
+        self.assertAlmostEqual(best_response.exploitability(policy), solver.exploitability(), places=6)
+
+    def test_uniform_kuhn(self) -> None:
+        """Test the exploitability of uniform play in Kuhn poker"""
+        best_response = BestResponse(kuhn_tree(), kuhn_cards())
+        uniform = np.full((12, 2), 0.5)
+        self.assertAlmostEqual(best_response.exploitability(UniformPolicy()), KuhnCFR().exploitability(uniform))
+
+    def test_matches_brute_force_with_board(self) -> None:
+        """Test a two-round game with a board card against a Python walk over every deal"""
+        rng = np.random.default_rng(0)
+        strength = rng.integers(0, 4, size=(5, 5))
+        tree = GameTree.build(num_players=2, ante=1, round_limits=(1, 2), start_offsets=(1, 1),
+                              max_raises=2, board_cards=(0, 1))
+        best_response = BestResponse(tree, CardModel(deck_size=5, strength=strength))
+        probs = {}
+        for node in tree.decision_nodes():
+            num_board = int(tree.round[node])
+            weights = rng.random((5,) * (num_board + 1) + (int(tree.num_children[node]),))
+            probs[int(node)] = weights / weights.sum(axis=-1, keepdims=True)
+        policy = TabularPolicy(probs)
+        for br_player in range(2):
+            self.assertAlmostEqual(best_response.value(policy, br_player),
+                                   brute_force_value(tree, strength, policy, br_player), places=4)
+
+    def test_rejects_multiway_tree(self) -> None:
+        with self.assertRaises(ValueError):
+            BestResponse(GameTree.build(num_players=3), kuhn_cards())
+
+class TestMCCFRPolicy(unittest.TestCase):
+    def test_reads_store(self) -> None:
+        """Test that stored strategy sums are used and unseen infosets play uniformly"""
+        tree = rhode_island_tree()
+        store = RegretStore()
+        row = store.row(infoset_key(1, 5))
+        store.strategy_sum[row, CALL] = 3.0
+        policy = mccfr_policy(tree, store)
+        root = policy.action_probs(tree, 0, 0)
+        self.assertEqual([int(tree.action[child]) for child in tree.children(0)],
+                         [PlayerAction.CHECK.value, PlayerAction.RAISE.value])
+        np.testing.assert_allclose(root[5], [1.0, 0.0])
+        np.testing.assert_allclose(root[6], [0.5, 0.5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import random
+import unittest
+from betting import (CALL, CALL_BIT, CHECK, CHECK_BIT, FOLD, FOLD_BIT, LEGAL_ACTIONS, RAISE, RAISE_BIT,
+                     BettingRound)
+from rules import PlayerAction
+
+def reference_round(stacks, active, start, round_limit, choose):
+    """The seats visited and actions taken by the pass-based loop Game.betting_round used to run"""
+    num_players = len(stacks)
+    stacks = list(stacks)
+    active = set(active)
+    current_bet = 0
+    raise_occurred = True
+    last_raiser = None
+    acted = set()
+    trace = []
+    while raise_occurred:
+        raise_occurred = False
+        for i in range(num_players):
+            seat = (i + start) % num_players
+            if seat not in active or seat in acted:
+                continue
+            raise_amount = current_bet + round_limit
+            if current_bet == 0:
+                legal = CHECK_BIT | (RAISE_BIT if stacks[seat] >= raise_amount else 0)
+            elif seat == last_raiser:
+                continue
+            else:
+                legal = (FOLD_BIT | (CALL_BIT if stacks[seat] >= current_bet else 0)
+                         | (RAISE_BIT if stacks[seat] >= raise_amount else 0))
+            action = choose(legal)
+            trace.append((seat, legal, action))
+            acted.add(seat)
+            if action == FOLD:
+                active.discard(seat)
+            elif action == CALL:
+                stacks[seat] -= current_bet
+            elif action == RAISE:
+                stacks[seat] -= raise_amount
+                current_bet = raise_amount
+                raise_occurred = True
+                last_raiser = seat
+                acted = {seat}
+    return trace, stacks
+
+def play(state, choose):
+    trace = []
+    while not state.is_over():
+        seat, legal = state.to_act, state.legal_actions()
+        action = choose(legal)
+        trace.append((seat, legal, action))
+        state.apply(action)
+    return trace
+
+def random_choice(rng):
+    return lambda legal: rng.choice([action for action in range(4) if legal >> action & 1])
+
+class TestBettingRound(unittest.TestCase):
+    def test_checked_around(self) -> None:
+        """Test that everyone in the hand checks once from the first seat, skipping folded seats"""
+        state = BettingRound([10, 10, 10, 10], 0b1011, 2, round_limit=2)
+        self.assertEqual(play(state, lambda legal: CHECK),
+                         [(3, CHECK_BIT | RAISE_BIT, CHECK), (0, CHECK_BIT | RAISE_BIT, CHECK),
+                          (1, CHECK_BIT | RAISE_BIT, CHECK)])
+        self.assertEqual(state.legal_actions(), 0)
+
+    def test_raise_reopens_action(self) -> None:
+        """Test that a raise gives everyone but the raiser another turn and calls pay the full bet"""
+        state = BettingRound([10, 10, 10], 0b111, 0, round_limit=2)
+        actions = iter([CHECK, RAISE, CALL, FOLD])
+        self.assertEqual([seat for seat, _, _ in play(state, lambda legal: next(actions))], [0, 1, 2, 0])
+        self.assertEqual((state.current_bet, state.last_raiser, state.pot), (2, 1, 4))
+        self.assertEqual(state.stacks, [10, 8, 8])
+        self.assertEqual((state.active, state.num_active), (0b110, 2))
+
+    def test_legal_actions_follow_stacks_and_cap(self) -> None:
+        """Test that only affordable bets are offered and the raise cap closes raising"""
+        state = BettingRound([1, 3, 10], 0b111, 0, round_limit=2, max_raises=2)
+        self.assertEqual(state.legal_actions(), CHECK_BIT)
+        state.apply(CHECK)
+        self.assertEqual(state.legal_actions(), CHECK_BIT | RAISE_BIT)
+        state.apply(RAISE)
+        self.assertEqual(state.legal_actions(), FOLD_BIT | CALL_BIT | RAISE_BIT)
+        state.apply(RAISE)
+        self.assertEqual(state.legal_actions(), FOLD_BIT)
+        state.apply(FOLD)
+        self.assertEqual(state.legal_actions(), FOLD_BIT)
+        with self.assertRaises(ValueError):
+            state.apply(CALL)
+        self.assertEqual(LEGAL_ACTIONS[FOLD_BIT | CALL_BIT], (PlayerAction.FOLD, PlayerAction.CALL))
+
+    def test_matches_reference_loop(self) -> None:
+        """Test the state machine against the pass-based loop on random rounds"""
+        rng = random.Random(0)
+        for _ in range(500):
+            num_players = rng.randint(2, 9)
+            stacks = [rng.randint(0, 12) for _ in range(num_players)]
+            seats = [seat for seat in range(num_players) if rng.random() < 0.8] or [0]
+            start = rng.randrange(num_players)
+            seed = rng.random()
+            expected, expected_stacks = reference_round(stacks, seats, start, 2, random_choice(random.Random(seed)))
+            state = BettingRound(list(stacks), sum(1 << seat for seat in seats), start, 2)
+            self.assertEqual(play(state, random_choice(random.Random(seed))), expected)
+            self.assertEqual(state.stacks, expected_stacks)
+
+    def test_reset_reuses_state(self) -> None:
+        state = BettingRound([5, 5], 0b11, 0, round_limit=4)
+        state.apply(RAISE)
+        state.reset([5, 5], 0b11, 1, round_limit=2)
+        self.assertEqual((state.to_act, state.current_bet, state.raises, state.pot), (1, 0, 0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import tempfile
+import unittest
+import numpy as np
+from buckets import BucketTable, build, cluster, emd, equity_histograms
+from canonical import Canonicalizer
+from equity import EquityCalculator
+
+class TestEquityHistograms(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.canonicalizer = Canonicalizer()
+        cls.equities = EquityCalculator().equity_matrices()["turn"]
+
+    def test_histograms_are_normalized(self) -> None:
+        for round, states in enumerate((13, 325, 9997)):
+            histograms = equity_histograms(round, self.equities, num_bins=10, canonicalizer=self.canonicalizer)
+            self.assertEqual(histograms.shape, (states, 10))
+            np.testing.assert_allclose(histograms.sum(axis=1), 1.0)
+
+    def test_flop_histogram_counts_turns(self) -> None:
+        """Test that a flop state's histogram holds the turn equities of every remaining turn card"""
+        hole, flop = self.canonicalizer.unindex(100, 2)
+        histogram = equity_histograms(1, self.equities, num_bins=10, canonicalizer=self.canonicalizer)[100]
+        turns = [turn for turn in range(52) if turn not in (hole, flop)]
+        expected = np.bincount(np.minimum((self.equities[hole, flop, turns] * 10).astype(int), 9), minlength=10)
+        np.testing.assert_allclose(histogram, expected / len(turns))
+
+class TestCluster(unittest.TestCase):
+    def test_emd(self) -> None:
+        cdfs = np.cumsum(np.eye(3), axis=1)
+        np.testing.assert_allclose(emd(cdfs, cdfs), [[0, 1, 2], [1, 0, 1], [2, 1, 0]])
+
+    def test_separated_groups(self) -> None:
+        """Test that well-separated histograms land in buckets ordered by equity"""
+        histograms = np.zeros((6, 4))
+        histograms[[0, 1], 3] = 1.0
+        histograms[[2, 3], 0] = 1.0
+        histograms[[4, 5], 1] = 1.0
+        buckets = cluster(histograms, 3)
+        self.assertEqual(buckets.tolist(), [2, 2, 0, 0, 1, 1])
+
+    def test_fewer_weighted_histograms_than_buckets(self) -> None:
+        """Test that seeding stops once every weighted histogram has a centroid"""
+        histograms = np.eye(4)
+        buckets = cluster(histograms, 4, weights=[1.0, 0.0, 2.0, 0.0])
+        self.assertEqual(len(set(buckets[[0, 2]].tolist())), 2)
+        self.assertLess(buckets.max(), 2)
+
+    def test_independent_of_workers_and_chunks(self) -> None:
+        histograms = np.random.default_rng(0).dirichlet(np.ones(8), size=300)
+        serial = cluster(histograms, 10, seed=3, chunk_size=64)
+        parallel = cluster(histograms, 10, seed=3, workers=2, chunk_size=17)
+        self.assertEqual(serial.tolist(), parallel.tolist())
+
+class TestBucketTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.table = build((13, 8, 8), num_bins=8)
+
+    def test_isomorphic_deals_share_bucket(self) -> None:
+        self.assertEqual(self.table.bucket(12, [30, 45]), self.table.bucket(14, [28, 47]))
+        self.assertEqual(self.table.bucket(0, [4]), self.table.bucket(3, [7]))
+
+    def test_buckets_ordered_by_strength(self) -> None:
+        self.assertEqual(self.table.num_buckets[0], 13)
+        self.assertEqual([self.table.bucket(hole) for hole in range(0, 52, 4)], list(range(13)))
+
+    def test_batch_and_round_trip(self) -> None:
+        cards = np.array([[12, 30, 45], [51, 0, 1], [7, 9, 22]])
+        expected = [self.table.bucket(row[0], row[1:]) for row in cards.tolist()]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "buckets.npz")
+            self.table.save(path)
+            loaded = BucketTable.load(path)
+        self.assertEqual(loaded.bucket_batch(cards).tolist(), expected)
+        self.assertEqual(loaded.num_buckets, self.table.num_buckets)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import itertools
+import unittest
+import numpy as np
+from canonical import Canonicalizer, suit_permutation
+from evaluator import LookupHandRanker
+
+SUIT_PERMUTATIONS = list(itertools.permutations(range(4)))
+
+def relabel(cards, permutation) -> tuple:
+    return tuple(card >> 2 << 2 | permutation[card & 3] for card in cards)
+
+class TestCanonicalizer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.canonicalizer = Canonicalizer()
+
+    def test_num_states(self) -> None:
+        self.assertEqual([self.canonicalizer.num_states(n) for n in (1, 2, 3)], [13, 325, 9997])
+
+    def test_isomorphic_deals_share_index(self) -> None:
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            cards = tuple(rng.choice(52, 3, replace=False).tolist())
+            indexes = {self.canonicalizer.index(relabel(cards, p)) for p in SUIT_PERMUTATIONS}
+            self.assertEqual(len(indexes), 1)
+
+    def test_rank_unrank_round_trip(self) -> None:
+        for num_cards in (1, 2, 3):
+            for index in range(0, self.canonicalizer.num_states(num_cards), 97):
+                cards = self.canonicalizer.unindex(index, num_cards)
+                self.assertEqual(self.canonicalizer.index(cards), index)
+                self.assertEqual(self.canonicalizer.canonicalize(cards), cards)
+
+    def test_canonical_strength_matches(self) -> None:
+        """Test that a deal and its canonical representative have the same strength"""
+        table = np.frombuffer(LookupHandRanker.table(), dtype=np.uint16)
+        rng = np.random.default_rng(1)
+        for _ in range(200):
+            a, b, c = rng.choice(52, 3, replace=False).tolist()
+            x, y, z = self.canonicalizer.canonicalize((a, b, c))
+            self.assertEqual(table[(a * 52 + b) * 52 + c], table[(x * 52 + y) * 52 + z])
+
+    def test_batch_matches_single(self) -> None:
+        cards = np.array([[0, 5, 9], [51, 47, 3], [7, 7, 1]])
+        indexes = self.canonicalizer.index_batch(cards)
+        self.assertEqual(indexes[:2].tolist(), [self.canonicalizer.index(row) for row in cards[:2].tolist()])
+        self.assertEqual(indexes[2], -1)
+
+    def test_rejects_repeated_cards(self) -> None:
+        with self.assertRaises(ValueError):
+            self.canonicalizer.index((4, 4))
+        with self.assertRaises(ValueError):
+            self.canonicalizer.index((0, 1, 2, 3))
+
+    def test_suit_permutation(self) -> None:
+        permutation = suit_permutation((14, 28, 47))
+        self.assertEqual(sorted(permutation.tolist()), list(range(52)))
+        self.assertEqual(permutation[[14, 28, 47]].tolist(), list(self.canonicalizer.canonicalize((14, 28, 47))))
+
+if __name__ == '__main__':
+    unittest.main()
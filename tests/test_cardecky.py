@@ -1,10 +1,11 @@
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import random
 import unittest
 from unittest.mock import patch
 from itertools import product
-from cardecky import Card, Deck, Rank, Suit, HandRanker
+from cardecky import CARDS, Card, CompactDeck, Deck, PartialDeck, Rank, Suit, HandRanker
 
 class TestCard(unittest.TestCase):
     def test_card_representation(self) -> None:
@@ -42,6 +43,24 @@ class TestCard(unittest.TestCase):
                 # Check if the actual representation matches the expected representation
                 self.assertEqual(repr(card), expected_repr)
 
+    def test_card_ids(self) -> None:
+        """Test that every card has a unique id that maps back to it"""
+        ids = [Card(rank=rank, suit=suit).id for rank in Rank for suit in Suit]
+        self.assertEqual(ids, list(range(52)))
+        for card_id in ids:
+            self.assertEqual(Card.from_id(card_id).id, card_id)
+
+    def test_card_equality(self) -> None:
+        """Test that cards compare and hash by value"""
+        self.assertEqual(Card(Rank.ACE, Suit.SPADES), CARDS[51])
+        self.assertEqual(hash(Card(Rank.ACE, Suit.SPADES)), hash(CARDS[51]))
+        self.assertNotEqual(Card(Rank.ACE, Suit.SPADES), CARDS[50])
+
+    def test_card_slots(self) -> None:
+        """Test that cards do not carry an instance dict"""
+        with self.assertRaises(AttributeError):
+            Card(Rank.TWO, Suit.CLUBS).extra = 1
+
 """Test the Deck class."""
 class TestDeck(unittest.TestCase):
     """Test the initial size of the deck."""
@@ -70,6 +89,82 @@ class TestDeck(unittest.TestCase):
         card = deck.deal_card()
         self.assertIsNone(card)
 
+    """Test that a deck round-trips through its byte encoding."""
+    def test_deck_bytes_round_trip(self) -> None:
+        deck = Deck()
+        deck.shuffle()
+        self.assertEqual(Deck.from_bytes(deck.to_bytes()).deck, deck.deck)
+
+"""Test the CompactDeck class."""
+class TestCompactDeck(unittest.TestCase):
+    def test_initial_deck_size(self) -> None:
+        deck = CompactDeck()
+        self.assertEqual(deck.cardsLeft(), 52)
+        self.assertEqual(deck.to_cards(), list(CARDS))
+
+    """Test that shuffling keeps every card exactly once."""
+    def test_shuffle_is_permutation(self) -> None:
+        deck = CompactDeck()
+        deck.cards_used = 5
+        deck.shuffle()
+        self.assertEqual(deck.cardsLeft(), 52)
+        self.assertEqual(sorted(deck.to_bytes()), list(range(52)))
+
+    """Test that dealt cards are the shared Card objects."""
+    def test_deal_cards(self) -> None:
+        deck = CompactDeck()
+        deck.shuffle()
+        cards = deck.deal_cards(3)
+        self.assertEqual([card.id for card in cards], list(deck.to_bytes()[:3]))
+        self.assertIs(cards[0], CARDS[cards[0].id])
+        self.assertEqual(deck.cardsLeft(), 49)
+
+    """Test dealing raw card ids."""
+    def test_deal_ids(self) -> None:
+        deck = CompactDeck()
+        self.assertEqual(deck.deal_ids(2), bytes([0, 1]))
+        self.assertEqual(deck.cardsLeft(), 50)
+        deck.cards_used = 52
+        self.assertEqual(deck.deal_ids(1), b"")
+
+    """Test converting to and from Card objects."""
+    def test_card_round_trip(self) -> None:
+        deck = Deck()
+        deck.shuffle()
+        compact = CompactDeck.from_cards(deck.deck)
+        self.assertEqual(compact.to_cards(), deck.deck)
+        self.assertEqual(CompactDeck.from_bytes(compact.to_bytes()).to_cards(), deck.deck)
+
+"""Test the PartialDeck class."""
+class TestPartialDeck(unittest.TestCase):
+    """Test that dealing the whole deck gives every card once."""
+    def test_deal_everything(self) -> None:
+        deck = PartialDeck(rng=random.Random(0))
+        deck.shuffle()
+        cards = deck.deal_cards(52)
+        self.assertEqual(sorted(card.id for card in cards), list(range(52)))
+        self.assertIsNone(deck.deal_card())
+
+    """Test that shuffling takes the dealt cards back."""
+    def test_shuffle_resets(self) -> None:
+        deck = PartialDeck(rng=random.Random(1))
+        deck.deal_cards(4)
+        deck.shuffle()
+        self.assertEqual(deck.cardsLeft(), 52)
+        self.assertEqual(len(set(card.id for card in deck.deal_cards(4))), 4)
+
+    """Test that every card is equally likely in each dealt position."""
+    def test_uniform_deals(self) -> None:
+        deck = PartialDeck(rng=random.Random(2))
+        counts = [[0] * 52 for _ in range(4)]
+        for _ in range(26_000):
+            deck.shuffle()
+            for position, card in enumerate(deck.deal_cards(4)):
+                counts[position][card.id] += 1
+        for position in range(4):
+            # Chi-square with 51 degrees of freedom, far beyond its 99.9th percentile of about 90
+            self.assertLess(sum((count - 500) ** 2 / 500 for count in counts[position]), 110)
+
 """Test the HandRanker class."""
 class TestHandRanker(unittest.TestCase):
     """Test the rank_value method."""
@@ -0,0 +1,62 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import random
+import tempfile
+import unittest
+import numpy as np
+from cardecky import Deck
+from columnar import ColumnarWriter, chunk_paths, export, scan
+from events import BufferedSink, TeeSink
+from game import Dealer, Game, Player, Pot
+from handlog import HandHistorySink, HandHistoryWriter
+from run import play_round, rebuy
+
+def play(writers, num_hands: int, num_players: int = 2) -> list[list[int]]:
+    """Play seeded hands into writers, returning the pot after each betting round of every hand"""
+    pot = Pot()
+    dealer = Dealer(pot=pot, deck=Deck(), button=1)
+    players = [Player(player_ID=i, stack=200, hand=[], status=True, chips_in_play=0) for i in range(num_players)]
+    buffer = BufferedSink()
+    logs = [HandHistorySink(writer, num_players=num_players, button=1) for writer in writers]
+    game = Game(players=players, dealer=dealer, betting_limit=2, sink=TeeSink(buffer, *logs))
+    pots = []
+    for hand in range(num_hands):
+        rebuy(players)
+        game.reseed(random.Random(hand))
+        play_round(players, dealer, pot, game, button=1)
+        pots.append([fields["pot"] for event, fields in buffer.events if event == "betting_ended"])
+        buffer.events.clear()
+    for writer in writers:
+        writer.close()
+    return pots
+
+class TestColumnar(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.dataset = os.path.join(self.directory.name, "hands")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_chunks_and_round_pots(self) -> None:
+        """Test that hands are split into chunks and round pots match the engine's"""
+        pots = play([ColumnarWriter(self.dataset, num_players=3, chunk_size=40)], 100, num_players=3)
+        self.assertEqual(len(chunk_paths(self.dataset)), 3)
+        round_pots = np.concatenate([chunk["round_pots"] for chunk in scan(self.dataset, ("round_pots",))])
+        for row, expected in zip(round_pots.tolist(), pots):
+            self.assertEqual(row, expected + [-1] * (3 - len(expected)))
+
+    def test_export_matches_direct_write(self) -> None:
+        """Test that converting a binary log gives the same columns as writing directly"""
+        log_path = os.path.join(self.directory.name, "hands.rihh")
+        exported = os.path.join(self.directory.name, "exported")
+        play([HandHistoryWriter(log_path), ColumnarWriter(self.dataset, num_players=2, chunk_size=64)], 150)
+        self.assertEqual(export(log_path, exported, chunk_size=64), 150)
+        columns = ("seed", "hole", "board", "stack_deltas", "round_pots", "showdown")
+        for direct, converted in zip(scan(self.dataset, columns), scan(exported, columns)):
+            for name in columns:
+                np.testing.assert_array_equal(direct[name], converted[name])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import unittest
+import numpy as np
+from cardecky import CARDS, HandRanker
+from equity import EquityCalculator
+
+def brute_force_equity(hero: int, board: tuple, weights=None) -> float:
+    """Equity by walking every remaining deal with HandRanker"""
+    weights = np.ones(52) if weights is None else weights
+    won = total = 0.0
+    def boards(board):
+        if len(board) == 2:
+            yield board
+            return
+        for card in range(52):
+            if card != hero and card not in board:
+                yield from boards(board + (card,))
+    for full in boards(tuple(board)):
+        mine = HandRanker.hand_strength([CARDS[hero]] + [CARDS[c] for c in full])
+        for opponent in range(52):
+            if opponent == hero or opponent in full:
+                continue
+            theirs = HandRanker.hand_strength([CARDS[opponent]] + [CARDS[c] for c in full])
+            won += weights[opponent] * (1.0 if mine > theirs else 0.5 if mine == theirs else 0.0)
+            total += weights[opponent]
+    return won / total
+
+class TestEquity(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.calculator = EquityCalculator(cache_size=8)
+
+    def test_matches_brute_force(self) -> None:
+        """Test exact equities on the turn and flop against a walk over every deal"""
+        self.assertAlmostEqual(self.calculator.equity(CARDS[51], [CARDS[0], CARDS[4]]), brute_force_equity(51, (0, 4)))
+        self.assertAlmostEqual(self.calculator.equity(20, [33]), brute_force_equity(20, (33,)))
+
+    def test_range_weights(self) -> None:
+        """Test equity against a range weighted towards high cards"""
+        weights = np.linspace(0.0, 2.0, 52)
+        self.assertAlmostEqual(self.calculator.equity(30, [7], weights), brute_force_equity(30, (7,), weights))
+        # A range of one card is that card's outcome
+        single = np.zeros(52)
+        single[50] = 1.0
+        self.assertEqual(self.calculator.equity(2, [10, 20], single), 0.0)
+
+    def test_preflop_symmetry(self) -> None:
+        """Test that preflop equities against a random card average one half"""
+        equities = self.calculator.equity_vector()
+        self.assertAlmostEqual(equities.mean(), 0.5)
+        self.assertGreater(equities[51], equities[0])
+
+    def test_cache_is_bounded(self) -> None:
+        calculator = EquityCalculator(cache_size=2)
+        for hero in (0, 4, 8):
+            calculator.equity(hero, [40, 44])
+        calculator.equity(8, [40, 44])
+        info = calculator.outcomes.cache_info()
+        self.assertEqual((info.hits, info.currsize, info.maxsize), (1, 2, 2))
+
+    def test_isomorphic_deals_share_cache_entry(self) -> None:
+        """Test that deals differing by a suit relabeling hit one cache entry and keep their own equities"""
+        calculator = EquityCalculator()
+        weights = np.random.default_rng(1).random(52)
+        first = calculator.equity(12, [30, 45], weights)
+        # Swap suits 0 and 2 and suits 1 and 3
+        second = calculator.equity(14, [28, 47], weights[np.arange(52) ^ 2])
+        info = calculator.outcomes.cache_info()
+        self.assertEqual((info.hits, info.currsize), (1, 1))
+        self.assertAlmostEqual(first, second)
+
+    def test_matrices_match_single_queries(self) -> None:
+        """Test that the all-board matrices agree with per-board queries"""
+        weights = np.random.default_rng(0).random(52)
+        matrices = self.calculator.equity_matrices(weights)
+        self.assertAlmostEqual(matrices["turn"][12, 30, 45], self.calculator.equity(12, [30, 45], weights))
+        self.assertAlmostEqual(matrices["flop"][12, 30], self.calculator.equity(12, [30], weights))
+        self.assertAlmostEqual(matrices["preflop"][12], self.calculator.equity(12, [], weights))
+        self.assertTrue(np.isnan(matrices["turn"][5, 5, 9]))
+
+    def test_rejects_clashing_cards(self) -> None:
+        with self.assertRaises(ValueError):
+            self.calculator.equity(5, [5, 9])
+
+if __name__ == '__main__':
+    unittest.main()
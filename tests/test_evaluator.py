@@ -0,0 +1,189 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import random
+import unittest
+from itertools import combinations
+from cardecky import CARDS, Card, Deck, HandRanker, Rank, Suit
+import numpy as np
+from evaluator import HoldemHandRanker, LookupHandRanker, hands_to_array, rank_hands_batch
+from game import Dealer, Player, Pot
+
+class TestLookupHandRanker(unittest.TestCase):
+    def test_matches_hand_ranker(self) -> None:
+        """Test that table strengths match HandRanker on a sample of hands"""
+        rng = random.Random(7)
+        hands = list(combinations(range(52), 3))
+        for hand in rng.sample(hands, 500):
+            cards = [CARDS[i] for i in hand]
+            rng.shuffle(cards)
+            self.assertEqual(LookupHandRanker.hand_strength(cards), HandRanker.hand_strength(cards))
+
+    def test_category_matches_rank_hand(self) -> None:
+        """Test that the category of a strength is the rank_hand category"""
+        for hand in list(combinations(range(52), 3))[::97]:
+            cards = [CARDS[i] for i in hand]
+            strength = LookupHandRanker.hand_strength(cards)
+            self.assertEqual(LookupHandRanker.category(strength), HandRanker.rank_hand(cards)[0])
+
+    def test_ordering(self) -> None:
+        """Test the ordering of the hand categories and kickers"""
+        straight_flush = [Card(Rank.TWO, Suit.CLUBS), Card(Rank.THREE, Suit.CLUBS), Card(Rank.FOUR, Suit.CLUBS)]
+        trips = [Card(Rank.ACE, Suit.CLUBS), Card(Rank.ACE, Suit.HEARTS), Card(Rank.ACE, Suit.SPADES)]
+        straight = [Card(Rank.QUEEN, Suit.CLUBS), Card(Rank.KING, Suit.HEARTS), Card(Rank.ACE, Suit.SPADES)]
+        flush = [Card(Rank.TWO, Suit.HEARTS), Card(Rank.NINE, Suit.HEARTS), Card(Rank.ACE, Suit.HEARTS)]
+        pair_king_kicker = [Card(Rank.ACE, Suit.CLUBS), Card(Rank.ACE, Suit.HEARTS), Card(Rank.KING, Suit.SPADES)]
+        pair_queen_kicker = [Card(Rank.ACE, Suit.DIAMONDS), Card(Rank.ACE, Suit.SPADES), Card(Rank.QUEEN, Suit.SPADES)]
+        high_card = [Card(Rank.TWO, Suit.CLUBS), Card(Rank.NINE, Suit.HEARTS), Card(Rank.ACE, Suit.SPADES)]
+        hands = [straight_flush, trips, straight, flush, pair_king_kicker, pair_queen_kicker, high_card]
+        strengths = [LookupHandRanker.hand_strength(hand) for hand in hands]
+        self.assertEqual(strengths, sorted(strengths, reverse=True))
+        self.assertEqual(len(set(strengths)), len(strengths))
+
+    def test_strength_from_ids(self) -> None:
+        """Test ranking a hand directly from card ids"""
+        cards = [CARDS[0], CARDS[17], CARDS[51]]
+        self.assertEqual(LookupHandRanker.strength_from_ids(0, 17, 51), HandRanker.hand_strength(cards))
+
+    def test_rejects_wrong_hand_size(self) -> None:
+        """Test that only 3-card hands can be ranked"""
+        with self.assertRaises(ValueError):
+            LookupHandRanker.hand_strength([Card(Rank.TWO, Suit.CLUBS)])
+
+class TestRankHandsBatch(unittest.TestCase):
+    def test_matches_lookup_for_all_hands(self) -> None:
+        """Test that batch strengths match the lookup table for every hand"""
+        hands = np.array(list(combinations(range(52), 3)), dtype=np.int8)
+        # Reverse the card order so the batch evaluator has to sort ranks itself
+        strengths = rank_hands_batch(hands[:, ::-1])
+        expected = [LookupHandRanker.strength_from_ids(*hand) for hand in hands.tolist()]
+        self.assertEqual(strengths.tolist(), expected)
+
+    def test_hands_to_array(self) -> None:
+        """Test converting Card hands into card ids"""
+        hands = [[CARDS[0], CARDS[5], CARDS[51]], [CARDS[1], CARDS[2], CARDS[3]]]
+        ids = hands_to_array(hands)
+        self.assertEqual(ids.tolist(), [[0, 5, 51], [1, 2, 3]])
+        self.assertEqual(rank_hands_batch(ids).tolist(), [HandRanker.hand_strength(hand) for hand in hands])
+
+    def test_rejects_bad_shape(self) -> None:
+        """Test that only (N, 3) arrays are accepted"""
+        with self.assertRaises(ValueError):
+            rank_hands_batch(np.zeros((4, 2), dtype=np.int8))
+
+class TestDetermineWinner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.players = [Player(player_ID=i, stack=200, hand=[], status=True, chips_in_play=0) for i in range(2)]
+
+    def test_lookup_matches_hand_ranker(self) -> None:
+        """Test that both rankers pick the same winners"""
+        deck = Deck()
+        for _ in range(200):
+            deck.shuffle()
+            for player in self.players:
+                player.hand = deck.deal_cards(1)
+            board = deck.deal_cards(2)
+            results = []
+            for ranker in (HandRanker, LookupHandRanker):
+                dealer = Dealer(pot=Pot(), deck=deck, hand_ranker=ranker)
+                dealer.board = board
+                results.append(dealer.determine_winner(players=self.players))
+            self.assertEqual(results[0], results[1])
+
+    def test_split_pot(self) -> None:
+        """Test that equal hands both win"""
+        dealer = Dealer(pot=Pot(), deck=Deck(), hand_ranker=LookupHandRanker)
+        dealer.board = [Card(Rank.ACE, Suit.CLUBS), Card(Rank.ACE, Suit.HEARTS)]
+        self.players[0].hand = [Card(Rank.KING, Suit.CLUBS)]
+        self.players[1].hand = [Card(Rank.KING, Suit.HEARTS)]
+        self.assertEqual(dealer.determine_winner(players=self.players), self.players)
+
+    def test_folded_player_cannot_win(self) -> None:
+        """Test that a folded player is skipped"""
+        dealer = Dealer(pot=Pot(), deck=Deck(), hand_ranker=LookupHandRanker)
+        dealer.board = [Card(Rank.TWO, Suit.CLUBS), Card(Rank.SEVEN, Suit.HEARTS)]
+        self.players[0].hand = [Card(Rank.ACE, Suit.CLUBS)]
+        self.players[1].hand = [Card(Rank.THREE, Suit.HEARTS)]
+        self.players[0].fold()
+        self.assertEqual(dealer.determine_winner(players=self.players), [self.players[1]])
+
+def reference_five(ids) -> tuple:
+    """Rank a 5-card poker hand as a comparable tuple, straight from the rules"""
+    ranks = sorted(((i >> 2) + 2 for i in ids), reverse=True)
+    flush = len({i & 3 for i in ids}) == 1
+    wheel = ranks == [14, 5, 4, 3, 2]
+    straight = wheel or (len(set(ranks)) == 5 and ranks[0] - ranks[4] == 4)
+    high = 5 if wheel else ranks[0]
+    # Ranks ordered by how often they appear, then by rank
+    groups = sorted(((ranks.count(r), r) for r in set(ranks)), reverse=True)
+    counts = [count for count, _ in groups]
+    ordered = [r for _, r in groups]
+    if straight and flush:
+        return (8, high)
+    if counts[0] == 4:
+        return (7, *ordered)
+    if counts == [3, 2]:
+        return (6, *ordered)
+    if flush:
+        return (5, *ranks)
+    if straight:
+        return (4, high)
+    if counts[0] == 3:
+        return (3, *ordered)
+    if counts == [2, 2, 1]:
+        return (2, *ordered)
+    if counts[0] == 2:
+        return (1, *ordered)
+    return (0, *ranks)
+
+class TestHoldemHandRanker(unittest.TestCase):
+    def test_five_card_category_counts(self) -> None:
+        """Test the number of 5-card hands in each category over the whole deck"""
+        hands = np.array(list(combinations(range(52), 5)), dtype=np.int8)
+        strengths = HoldemHandRanker.strength_batch(hands)
+        categories = np.bincount([HoldemHandRanker.category(s) for s in np.unique(strengths)])
+        self.assertEqual(len(np.unique(strengths)), 7462)
+        self.assertEqual(categories.sum(), 7462)
+        counts = np.bincount(HoldemHandRanker._classes[strengths - 1] >> 20, minlength=9)
+        self.assertEqual(counts.tolist(), [1302540, 1098240, 123552, 54912, 10200, 5108, 3744, 624, 40])
+
+    def test_category_builds_the_class_table(self) -> None:
+        """Test that category works before any table has been built"""
+        classes, HoldemHandRanker._classes = HoldemHandRanker._classes, None
+        try:
+            self.assertEqual((HoldemHandRanker.category(1), HoldemHandRanker.category(7462)), (0, 8))
+        finally:
+            HoldemHandRanker._classes = classes
+
+    def test_seven_cards_match_best_five(self) -> None:
+        """Test that 5-of-7 strengths order hands like the best 5-card subset"""
+        rng = random.Random(3)
+        hands = [rng.sample(range(52), 7) for _ in range(400)]
+        strengths = HoldemHandRanker.strength_batch(np.array(hands)).tolist()
+        references = [max(reference_five(five) for five in combinations(hand, 5)) for hand in hands]
+        for i in range(len(hands) - 1):
+            expected = (references[i] > references[i + 1]) - (references[i] < references[i + 1])
+            actual = (strengths[i] > strengths[i + 1]) - (strengths[i] < strengths[i + 1])
+            self.assertEqual(actual, expected, (hands[i], hands[i + 1]))
+
+    def test_scalar_matches_batch(self) -> None:
+        rng = random.Random(5)
+        for size in (5, 6, 7):
+            hands = np.array([rng.sample(range(52), size) for _ in range(200)])
+            expected = HoldemHandRanker.strength_batch(hands).tolist()
+            self.assertEqual([HoldemHandRanker.hand_strength([CARDS[i] for i in hand]) for hand in hands], expected)
+
+    def test_holdem_showdown(self) -> None:
+        """Test a Hold'em showdown where the board plays a wheel straight flush for one player"""
+        dealer = Dealer(pot=Pot(), deck=Deck(), hand_ranker=HoldemHandRanker)
+        dealer.board = [Card(Rank.ACE, Suit.CLUBS), Card(Rank.TWO, Suit.CLUBS), Card(Rank.THREE, Suit.CLUBS),
+                        Card(Rank.FOUR, Suit.CLUBS), Card(Rank.KING, Suit.HEARTS)]
+        players = [Player(player_ID=i, stack=10, hand=[], status=True, chips_in_play=0) for i in range(3)]
+        players[0].hand = [Card(Rank.ACE, Suit.HEARTS), Card(Rank.ACE, Suit.SPADES)]
+        players[1].hand = [Card(Rank.FIVE, Suit.CLUBS), Card(Rank.TWO, Suit.HEARTS)]
+        players[2].hand = [Card(Rank.KING, Suit.CLUBS), Card(Rank.NINE, Suit.HEARTS)]
+        self.assertEqual(dealer.determine_winner(players=players), [players[1]])
+        self.assertEqual(HoldemHandRanker.category(HoldemHandRanker.hand_strength(players[1].hand + dealer.board)), 8)
+
+if __name__ == '__main__':
+    unittest.main()
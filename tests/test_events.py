@@ -0,0 +1,60 @@
+import io
+import logging
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import unittest
+from unittest.mock import patch
+from events import BufferedSink, EventSink, LoggingSink, NullSink, TeeSink, render
+
+class TestRender(unittest.TestCase):
+    def test_render_raise(self) -> None:
+        """Test that a raise renders like the original print lines"""
+        self.assertEqual(render("raise", {"player": 1, "amount": 4, "pot": 10}), ["Player 1 raised to 4", "Pot: 10"])
+
+    def test_render_street(self) -> None:
+        """Test that the street name is lower cased where needed"""
+        self.assertEqual(render("betting_ended", {"street": "Pre-flop", "pot": 6}), ["End of pre-flop betting. Pot: 6"])
+
+class TestSinks(unittest.TestCase):
+    def test_print_sink(self) -> None:
+        """Test that the default sink prints each line"""
+        with patch('builtins.print') as mock_print:
+            EventSink().emit("fold", player=0)
+        mock_print.assert_called_once_with("Player 0 folded")
+
+    def test_null_sink(self) -> None:
+        """Test that the null sink prints nothing"""
+        with patch('builtins.print') as mock_print:
+            NullSink().emit("fold", player=0)
+        mock_print.assert_not_called()
+
+    def test_buffered_sink(self) -> None:
+        """Test that the buffered sink keeps events until flushed"""
+        sink = BufferedSink()
+        sink.emit("check", player=0)
+        sink.emit("call", player=1, amount=2, pot=6)
+        self.assertEqual(sink.lines(), ["Player 0 checked", "Player 1 called 2", "Pot: 6"])
+        stream = io.StringIO()
+        sink.flush(stream)
+        self.assertEqual(stream.getvalue(), "Player 0 checked\nPlayer 1 called 2\nPot: 6\n")
+        self.assertEqual(sink.events, [])
+
+    def test_logging_sink(self) -> None:
+        """Test that the logging sink attaches the event fields"""
+        logger = logging.getLogger("poker.test")
+        with self.assertLogs(logger, level=logging.DEBUG) as logs:
+            LoggingSink(logger=logger).emit("won", player=1, amount=8)
+        self.assertEqual(logs.records[0].getMessage(), "Player 1 won 8 chips")
+        self.assertEqual(logs.records[0].event, "won")
+        self.assertEqual(logs.records[0].fields, {"player": 1, "amount": 8})
+
+    def test_tee_sink(self) -> None:
+        """Test that a tee passes events to every sink"""
+        first, second = BufferedSink(), BufferedSink()
+        TeeSink(first, second).emit("fold", player=1)
+        self.assertEqual(first.lines(), ["Player 1 folded"])
+        self.assertEqual(second.lines(), ["Player 1 folded"])
+
+if __name__ == '__main__':
+    unittest.main()
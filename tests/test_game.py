@@ -1,10 +1,13 @@
 import unittest
 from unittest.mock import Mock, patch
+import numpy as np
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
 from cardecky import Deck, HandRanker, Rank, Suit
-from game import Player, Pot, Dealer, Table, PlayerAction, Game
+from game import Player, Pot, Dealer, Table, PlayerAction, Game, settle_batch
+from events import BufferedSink
+from rules import HOLDEM_BOARD_CARDS, HOLDEM_HOLE_CARDS
 
 class TestPlayer(unittest.TestCase):
     def setUp(self) -> None:
@@ -117,6 +120,75 @@ class TestPot(unittest.TestCase):
         self.pot.reset_pot()
         self.assertEqual(self.pot.total, 0)
 
+    def _bet(self, contributions: list[int], folded=()) -> list[Player]:
+        players = [Player(player_ID=i, stack=0, hand=[], status=i not in folded, chips_in_play=0)
+                   for i in range(len(contributions))]
+        for player, amount in zip(players, contributions):
+            player.stack = amount
+            player.bet(amount=amount, pot=self.pot)
+        return players
+
+    def test_award_pot_odd_chips(self) -> None:
+        """Test that a split pot gives its odd chips one each to the first winners"""
+        players = self._bet([0, 0, 0])
+        self.pot.add_to_pot(amount=11)
+        self.pot.award_pot(players)
+        self.assertEqual([player.stack for player in players], [4, 4, 3])
+        self.assertEqual(self.pot.total, 0)
+
+    def test_settle_side_pot(self) -> None:
+        """Test that a short stack only wins the main pot it covered"""
+        players = self._bet([10, 30, 30])
+        winnings = self.pot.settle(players, [9, 5, 7])
+        # The main pot is 30, the side pot 40 goes to the best of the two who covered it
+        self.assertEqual(winnings, [30, 0, 40])
+        self.assertEqual([player.stack for player in players], [30, 0, 40])
+        self.assertEqual(self.pot.total, 0)
+
+    def test_settle_odd_chips_left_of_button(self) -> None:
+        """Test that odd chips go to the tied winners starting left of the button"""
+        players = self._bet([5, 5, 5])
+        self.assertEqual(self.pot.settle(players, [3, 3, 1], button=0), [7, 8, 0])
+        players = self._bet([5, 5, 5])
+        self.assertEqual(self.pot.settle(players, [3, 3, 1], button=1), [8, 7, 0])
+
+    def test_settle_folded_dead_money(self) -> None:
+        """Test that folded players' chips and chips no player put in go to the winners"""
+        players = self._bet([20, 10, 4], folded={0})
+        self.pot.add_to_pot(amount=6)
+        # Player 2 wins the main pot of 12 plus the dead 6, player 1 the side pot of 12 and the 10 nobody covered
+        self.assertEqual(self.pot.settle(players, [9, 1, 2]), [0, 22, 18])
+
+    def test_settle_covering_winner_takes_all(self) -> None:
+        """Test that a unique best hand that put in the most chips wins every pot and the dead chips"""
+        players = self._bet([10, 30, 20, 30], folded={3})
+        self.pot.add_to_pot(amount=3)
+        self.assertEqual(self.pot.settle(players, [7, 8, 2, 9], button=2), [0, 93, 0, 0])
+
+    def test_settle_fold_out(self) -> None:
+        """Test that the last player standing wins everything"""
+        players = self._bet([2, 6, 6], folded={0, 2})
+        self.assertEqual(self.pot.settle(players, [-1, 0, -1]), [0, 14, 0])
+
+    def test_settle_batch_matches_settle(self) -> None:
+        """Test the array settlement against Pot.settle on random tables"""
+        rng = np.random.default_rng(0)
+        for num_players in (2, 3, 6):
+            contributions = rng.integers(0, 6, size=(300, num_players)) * rng.integers(1, 4, size=(300, 1))
+            strengths = rng.integers(0, 3, size=(300, num_players))
+            status = rng.random((300, num_players)) < 0.7
+            status[np.arange(300), rng.integers(0, num_players, 300)] = True
+            strengths = np.where(status, strengths, -1)
+            buttons = rng.integers(0, num_players, 300)
+            batch = settle_batch(contributions, strengths, buttons)
+            for table in range(300):
+                self.pot = Pot()
+                players = self._bet(contributions[table].tolist(),
+                                    folded={i for i in range(num_players) if not status[table, i]})
+                expected = self.pot.settle(players, strengths[table].tolist(), int(buttons[table]))
+                self.assertEqual(batch[table].tolist(), expected)
+                self.assertEqual(sum(expected), contributions[table].sum())
+
 class TestDealer(unittest.TestCase):
     def setUp(self) -> None:
         """Setup before each test"""
@@ -155,6 +227,19 @@ class TestDealer(unittest.TestCase):
         self.dealer.move_button(players=players)
         self.assertEqual(self.dealer.button, 0)
 
+    def test_holdem_deal_schedule(self) -> None:
+        """Test dealing two hole cards each and a 3-card flop, turn and river"""
+        dealer = Dealer(pot=Pot(), deck=Deck(), hole_cards=HOLDEM_HOLE_CARDS, board_cards=HOLDEM_BOARD_CARDS)
+        dealer.deck.shuffle()
+        players = [Player(player_ID=i, stack=10, hand=[], status=True, chips_in_play=0) for i in range(6)]
+        dealer.deal_hand(players=players)
+        self.assertEqual([len(player.hand) for player in players], [2] * 6)
+        self.assertEqual(len(dealer.deal_flop()), 3)
+        self.assertEqual(len(dealer.deal_turn()), 1)
+        self.assertEqual(len(dealer.deal_river()), 1)
+        self.assertEqual(len(dealer.board), 5)
+        self.assertEqual(dealer.deck.cardsLeft(), 52 - 12 - 5)
+
     def test_move_button_with_none_player(self) -> None:
         """Test moving the button with a None player"""
         # Mock the players
@@ -191,5 +276,33 @@ class TestTable(unittest.TestCase):
         with self.assertRaises(IndexError, msg="Should raise error for floating-point seat index"):
             self.table.seat_player(player=player, seat=2.5)
 
+class TestGame(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pot = Pot()
+        self.dealer = Dealer(pot=self.pot, deck=Deck())
+        self.players = [Player(player_ID=i, stack=200, hand=[], status=True, chips_in_play=0) for i in range(2)]
+        self.sink = BufferedSink()
+        self.game = Game(players=self.players, dealer=self.dealer, betting_limit=2, sink=self.sink)
+
+    @patch('builtins.print')
+    def test_betting_round_uses_sink(self, mock_print) -> None:
+        """Test that actions go to the sink instead of stdout"""
+        with patch('game.random.choice', side_effect=[PlayerAction.CHECK, PlayerAction.CHECK]):
+            self.game.betting_round(button=0, start_offset=1, round_limit=2)
+        mock_print.assert_not_called()
+        self.assertEqual(self.sink.lines(), ["Player 1 checked", "Player 0 checked"])
+
+    def test_betting_round_only_offers_affordable_bets(self) -> None:
+        """Test that a player who cannot cover a raise is not offered one"""
+        self.players[1].stack = 1
+        offered = []
+        def choose(actions):
+            offered.append(list(actions))
+            return PlayerAction.CHECK
+        with patch('game.random.choice', side_effect=choose):
+            self.game.betting_round(button=0, start_offset=1, round_limit=2)
+        self.assertEqual(offered[0], [PlayerAction.CHECK])
+        self.assertEqual(offered[1], [PlayerAction.CHECK, PlayerAction.RAISE])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,123 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import contextlib
+import tempfile
+import unittest
+import numpy as np
+from agents import RandomAgent
+from cardecky import Deck, PartialDeck
+from events import BufferedSink, TeeSink
+from game import Dealer, Game, Player, PlayerAction, Pot
+from handlog import (MAX_ACTIONS, RECORD, HandHistorySink, HandHistoryWriter, decode_actions, encode_action,
+                     read_hands, summarize)
+from run import main, play_round, rebuy
+from seeding import PokerRNG, hand_seed
+
+class TestHandLog(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "hands.rihh")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def play(self, num_hands: int, seed: int = 0):
+        """Play seeded hands into a log, returning each hand's events and stack changes"""
+        pot = Pot()
+        dealer = Dealer(pot=pot, deck=Deck(), button=1)
+        players = [Player(player_ID=i, stack=200, hand=[], status=True, chips_in_play=0) for i in range(2)]
+        buffer = BufferedSink()
+        hands = []
+        with HandHistoryWriter(self.path, buffer_size=7) as writer:
+            log = HandHistorySink(writer, num_players=2, button=1)
+            game = Game(players=players, dealer=dealer, betting_limit=2, sink=TeeSink(buffer, log))
+            for hand in range(num_hands):
+                rebuy(players)
+                before = [player.stack for player in players]
+                log.seed = hand_seed(seed, hand)
+                game.reseed(PokerRNG(log.seed))
+                play_round(players, dealer, pot, game, button=1)
+                hands.append((list(buffer.events), [p.stack - b for p, b in zip(players, before)]))
+                buffer.events.clear()
+        return hands
+
+    def test_records_match_hands(self) -> None:
+        """Test that every record holds the hand's cards, actions and stack changes"""
+        hands = self.play(50)
+        records = read_hands(self.path)
+        self.assertIsInstance(records, np.memmap)
+        self.assertEqual(len(records), 50)
+        for record, (events, deltas) in zip(records, hands):
+            self.assertEqual(record["stack_deltas"][:2].tolist(), deltas)
+            holes = {fields["player"]: fields["hand"][0].id for event, fields in events if event == "hand"}
+            self.assertEqual(record["hole"][:2].tolist(), [holes[0], holes[1]])
+            actions = [(fields["player"], PlayerAction[event.upper()]) for event, fields in events
+                       if event in ("fold", "check", "call", "raise")]
+            self.assertEqual([(seat, action) for seat, _, action in decode_actions(record)], actions)
+            board = [fields["cards"][0].id for event, fields in events if event == "board"]
+            self.assertEqual([card for card in record["board"].tolist() if card >= 0], board)
+
+    def test_replay_from_seed(self) -> None:
+        """Test that replaying a record's seed deals the same hand"""
+        first = self.play(5, seed=3)
+        records = np.array(read_hands(self.path))
+        again = self.play(5, seed=3)
+        self.assertEqual(first, again)
+        np.testing.assert_array_equal(read_hands(self.path), records)
+
+    def test_run_records_replay_from_seed(self) -> None:
+        """Test that every hand logged by run.py deals the same cards again from its seed alone"""
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            main(["--rounds", "50", "--log", self.path, "--seed", "11", "--sink", "null", "--no-progress"])
+        records = read_hands(self.path)
+        self.assertEqual(len(records), 50)
+        for record in records:
+            deck = PartialDeck(rng=PokerRNG(int(record["seed"])))
+            deck.shuffle()
+            self.assertEqual([card.id for card in deck.deal_cards(2)], record["hole"][:2].tolist())
+
+    def test_summarize_in_chunks(self) -> None:
+        hands = self.play(40)
+        totals = summarize(read_hands(self.path), chunk_size=16)
+        self.assertEqual(totals["hands"], 40)
+        self.assertEqual(totals["stack_deltas"][:2].tolist(), [sum(d[i] for _, d in hands) for i in range(2)])
+
+    def test_long_hand_is_truncated(self) -> None:
+        """Test that a raise war past MAX_ACTIONS is written with its first actions and exact chips"""
+        class Aggressive(RandomAgent):
+            def act(self, states):
+                return [state.legal_actions[-1] for state in states]
+        pot = Pot()
+        dealer = Dealer(pot=pot, deck=Deck(), button=1)
+        players = [Player(player_ID=i, stack=3000, hand=[], status=True, chips_in_play=0) for i in range(3)]
+        buffer = BufferedSink()
+        with HandHistoryWriter(self.path) as writer:
+            game = Game(players=players, dealer=dealer, betting_limit=2,
+                        sink=TeeSink(buffer, HandHistorySink(writer, num_players=3, button=1)),
+                        agents={i: Aggressive() for i in range(3)})
+            game.reseed(PokerRNG(5))
+            play_round(players, dealer, pot, game, button=1)
+        actions = [(fields["player"], PlayerAction[event.upper()]) for event, fields in buffer.events
+                   if event in ("fold", "check", "call", "raise")]
+        self.assertGreater(len(actions), MAX_ACTIONS)
+        record = read_hands(self.path)[0]
+        self.assertTrue(record["truncated"])
+        self.assertEqual(record["num_actions"], MAX_ACTIONS)
+        self.assertEqual([(seat, action) for seat, _, action in decode_actions(record)], actions[:MAX_ACTIONS])
+        self.assertEqual(record["stack_deltas"][:3].tolist(), [player.stack - 3000 for player in players])
+
+    def test_encode_action(self) -> None:
+        record = np.zeros(1, dtype=RECORD)[0]
+        record["actions"][:2] = [encode_action(1, 0, PlayerAction.RAISE), encode_action(0, 2, PlayerAction.FOLD)]
+        record["num_actions"] = 2
+        self.assertEqual(decode_actions(record), [(1, 0, PlayerAction.RAISE), (0, 2, PlayerAction.FOLD)])
+
+    def test_rejects_other_files(self) -> None:
+        with open(self.path, "wb") as file:
+            file.write(b"not a log" * 4)
+        with self.assertRaises(ValueError):
+            read_hands(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
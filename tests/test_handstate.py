@@ -0,0 +1,153 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import random
+import unittest
+from agents import RandomAgent
+from betting import CALL, CHECK, RAISE, RAISE_BIT
+from cardecky import CARDS, Deck
+from events import NullSink
+from evaluator import HoldemHandRanker
+from game import Dealer, Game, Player, Pot
+from handstate import HandState
+from rules import HOLDEM_BOARD_CARDS, HOLDEM_HOLE_CARDS, HOLDEM_ROUND_LIMITS, HOLDEM_START_OFFSETS
+from run import play_round, rebuy
+
+class FixedOrder:
+    """Stand-in for a random module whose shuffle deals a given order."""
+    def __init__(self) -> None:
+        self.order = list(range(52))
+
+    def shuffle(self, deck) -> None:
+        deck[:] = [CARDS[i] for i in self.order]
+
+class CheckingAgent(RandomAgent):
+    """Pick the k-th legal action from a shared stream, checking HandState.from_game at every decision."""
+    def __init__(self, stream, test) -> None:
+        super().__init__()
+        self.stream = stream
+        self.test = test
+        self.game = None
+
+    def act(self, states):
+        state = states[0]
+        copy = HandState.from_game(self.game)
+        legal = sum(1 << (action.value - 1) for action in state.legal_actions)
+        self.test.assertEqual((copy.to_act, copy.legal_actions()), (state.player_ID, legal))
+        self.test.assertEqual(copy.board(), state.board)
+        self.test.assertEqual(copy.hand(state.player_ID), state.hand)
+        self.test.assertEqual(copy.pot, self.game.dealer.pot.total)
+        return [state.legal_actions[next(self.stream) % len(state.legal_actions)]]
+
+def random_walk(state, rng, steps):
+    """Apply up to steps random legal actions, return how many were applied"""
+    for step in range(steps):
+        legal = state.legal_actions()
+        if not legal:
+            return step
+        state.apply(rng.choice([action for action in range(4) if legal >> action & 1]))
+    return steps
+
+class TestHandState(unittest.TestCase):
+    def play_both(self, num_players: int, num_hands: int, seed: int, holdem: bool = False) -> None:
+        """Play the same cards and choices through Game and HandState and compare stacks"""
+        rng = random.Random(seed)
+        choices = [rng.randrange(12) for _ in range(num_hands * 200)]
+        schedule = {}
+        game_schedule = {}
+        if holdem:
+            schedule = dict(hole_cards=HOLDEM_HOLE_CARDS, board_cards=HOLDEM_BOARD_CARDS,
+                            round_limits=HOLDEM_ROUND_LIMITS, start_offsets=HOLDEM_START_OFFSETS)
+            game_schedule = dict(round_limits=HOLDEM_ROUND_LIMITS, start_offsets=HOLDEM_START_OFFSETS)
+        order = FixedOrder()
+        pot = Pot()
+        dealer = Dealer(pot=pot, deck=Deck(rng=order), button=1,
+                        **({"hole_cards": HOLDEM_HOLE_CARDS, "board_cards": HOLDEM_BOARD_CARDS,
+                            "hand_ranker": HoldemHandRanker} if holdem else {}))
+        players = [Player(player_ID=i, stack=30, hand=[], status=True, chips_in_play=0) for i in range(num_players)]
+        agent = CheckingAgent(iter(choices), self)
+        game = Game(players=players, dealer=dealer, betting_limit=2, sink=NullSink(),
+                    agents={i: agent for i in range(num_players)}, **game_schedule)
+        agent.game = game
+
+        stream = iter(choices)
+        for _ in range(num_hands):
+            rng.shuffle(order.order)
+            rebuy(players)
+            stacks = [player.stack for player in players]
+            play_round(players, dealer, pot, game, button=1)
+
+            state = HandState(order.order, stacks, button=1, **schedule)
+            while state.to_act >= 0:
+                legal = [action for action in range(4) if state.legal_actions() >> action & 1]
+                state.apply(legal[next(stream) % len(legal)])
+            self.assertEqual([stack + won for stack, won in zip(state.stacks, state.winnings())],
+                             [player.stack for player in players])
+
+    def test_matches_game(self) -> None:
+        self.play_both(num_players=3, num_hands=200, seed=1)
+
+    def test_matches_game_holdem(self) -> None:
+        self.play_both(num_players=4, num_hands=50, seed=2, holdem=True)
+
+    def test_undo_retraces_every_state(self) -> None:
+        """Test that undoing each action returns to the snapshot taken before it"""
+        rng = random.Random(3)
+        for _ in range(100):
+            stacks = [rng.randint(1, 15) for _ in range(4)]
+            state = HandState(rng.sample(range(52), 52), stacks, button=rng.randrange(4))
+            snapshots = []
+            while state.to_act >= 0:
+                snapshots.append(state.snapshot())
+                random_walk(state, rng, 1)
+            self.assertEqual(state.legal_actions(), 0)
+            for snapshot in reversed(snapshots):
+                state.undo()
+                self.assertEqual(state.snapshot(), snapshot)
+
+    def test_snapshot_restore_and_clone(self) -> None:
+        """Test jumping back to a snapshot and that clones do not share chips or betting"""
+        state = HandState(range(52), [20, 20, 20])
+        state.apply(RAISE)
+        root = state.snapshot()
+        clone = state.clone()
+        random_walk(state, random.Random(4), 30)
+        state.restore(root)
+        self.assertEqual(state.snapshot(), root)
+        self.assertEqual(clone.snapshot(), root)
+        clone.apply(CALL)
+        self.assertEqual(state.snapshot(), root)
+        self.assertNotEqual(clone.snapshot(), root)
+        # The undo history still reaches the root's first action
+        state.undo()
+        self.assertEqual((state.pot, state.betting.current_bet), (3, 0))
+
+    def test_hand_ends_on_fold_or_last_round(self) -> None:
+        state = HandState(range(52), [10, 10])
+        for action in (CHECK, CHECK, CHECK, CHECK, RAISE, CALL):
+            self.assertFalse(state.terminal)
+            state.apply(action)
+        self.assertTrue(state.terminal)
+        self.assertEqual(state.board(), (2, 3))
+        with self.assertRaises(ValueError):
+            state.apply(CHECK)
+        self.assertEqual(sum(state.payoffs()), 0)
+
+    def test_from_game_raise_cap(self) -> None:
+        """Test that a copy of Game's uncapped round can be capped for a search"""
+        players = [Player(player_ID=i, stack=50, hand=[], status=True, chips_in_play=0) for i in range(2)]
+        game = Game(players=players, dealer=Dealer(pot=Pot(), deck=Deck(rng=random.Random(0))), betting_limit=2)
+        seen = []
+
+        class Capped(RandomAgent):
+            def act(self, states):
+                seen.append(HandState.from_game(game, max_raises=1).legal_actions() & RAISE_BIT)
+                return [states[0].legal_actions[-1]]
+        game.agents = {0: Capped(), 1: Capped()}
+        rebuy(players)
+        game.dealer.move_button(players)
+        play_round(players, game.dealer, game.dealer.pot, game, game.dealer.button)
+        self.assertEqual(seen[:2], [RAISE_BIT, 0])
+
+if __name__ == '__main__':
+    unittest.main()
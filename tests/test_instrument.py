@@ -0,0 +1,80 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import random
+import unittest
+from cardecky import PartialDeck
+from events import NullSink
+from game import Dealer, Game, Player, Pot
+from instrument import Instrumentation
+from rules import PRE_FLOP_LIMIT, START_STACK
+from run import play_round, rebuy
+
+def make_game(seed: int) -> Game:
+    rng = random.Random(seed)
+    pot = Pot()
+    dealer = Dealer(pot=pot, deck=PartialDeck(rng=rng))
+    players = [Player(player_ID=i, stack=START_STACK, hand=[], status=True, chips_in_play=0) for i in range(2)]
+    dealer.move_button(players=players)
+    return Game(players=players, dealer=dealer, betting_limit=PRE_FLOP_LIMIT, sink=NullSink(), rng=rng)
+
+def play(game: Game, hands: int) -> list[int]:
+    for _ in range(hands):
+        rebuy(game.players)
+        play_round(game.players, game.dealer, game.dealer.pot, game, game.dealer.button)
+    return [player.stack for player in game.players]
+
+class TestInstrumentation(unittest.TestCase):
+    def test_phase_counts(self) -> None:
+        game = make_game(seed=3)
+        with Instrumentation().attach(game) as instrumentation:
+            play(game, 200)
+        calls = instrumentation.calls
+        self.assertEqual(calls["shuffle"], 200)
+        self.assertEqual(calls["pre-flop betting"], 200)
+        self.assertEqual(calls["pot award"], 200)
+        self.assertGreaterEqual(calls["flop betting"], calls["turn betting"])
+        self.assertEqual(calls["deal"], 200 + calls["flop betting"] + calls["turn betting"])
+        self.assertLessEqual(sum(instrumentation.seconds.values()), instrumentation.elapsed)
+        self.assertIn("pre-flop betting", instrumentation.summary())
+
+    def test_detach_restores_engine(self) -> None:
+        """Test that instrumentation changes no results and leaves the original classes behind"""
+        plain = make_game(seed=5)
+        timed = make_game(seed=5)
+        classes = [type(timed), type(timed.dealer), type(timed.dealer.deck), type(timed.dealer.pot)]
+        instrumentation = Instrumentation().attach(timed)
+        self.assertIsInstance(timed.dealer.deck, PartialDeck)
+        self.assertEqual(play(plain, 100), play(timed, 100))
+        instrumentation.detach()
+        self.assertEqual([type(timed), type(timed.dealer), type(timed.dealer.deck), type(timed.dealer.pot)], classes)
+
+    def test_rejects_misuse(self) -> None:
+        """Test that stopping before starting and attaching twice raise instead of miscounting"""
+        instrumentation = Instrumentation()
+        with self.assertRaises(ValueError):
+            instrumentation.stop()
+        game = make_game(seed=2)
+        instrumentation.attach(game)
+        classes = [type(game), type(game.dealer), type(game.dealer.deck), type(game.dealer.pot)]
+        with self.assertRaises(ValueError):
+            instrumentation.attach(game)
+        with self.assertRaises(ValueError):
+            Instrumentation().attach(game)
+        self.assertEqual([type(game), type(game.dealer), type(game.dealer.deck), type(game.dealer.pot)], classes)
+        instrumentation.detach()
+        Instrumentation().attach(game).detach()
+
+    def test_profile_and_memory(self) -> None:
+        game = make_game(seed=1)
+        instrumentation = Instrumentation(profile=True, trace_memory=True)
+        instrumentation.count("hands", 20)
+        with instrumentation:
+            play(game, 20)
+        summary = instrumentation.summary()
+        self.assertIn("play_round", summary)
+        self.assertIn("KiB peak", summary)
+        self.assertIn("hands: 20", summary)
+
+if __name__ == '__main__':
+    unittest.main()
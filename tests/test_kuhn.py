@@ -0,0 +1,61 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import unittest
+import numpy as np
+from solvers.kuhn import (BET, GAME_VALUE, HISTORIES, NUM_ACTIONS, NUM_CARDS, NUM_INFOSETS, PASS,
+                          KuhnCFR, best_response_value, infoset_id)
+
+class TestInfosets(unittest.TestCase):
+    def test_infoset_ids_are_unique(self) -> None:
+        """Test that every card and history gets its own table row"""
+        ids = {infoset_id(card, history) for card in range(NUM_CARDS) for history in HISTORIES}
+        self.assertEqual(ids, set(range(NUM_INFOSETS)))
+
+class TestKuhnCFR(unittest.TestCase):
+    def test_tables_are_preallocated(self) -> None:
+        """Test the shape of the regret and strategy tables"""
+        solver = KuhnCFR()
+        self.assertEqual(solver.regrets.shape, (NUM_INFOSETS, NUM_ACTIONS))
+        self.assertEqual(solver.strategy_sum.shape, (NUM_INFOSETS, NUM_ACTIONS))
+
+    def test_cfr_plus_converges(self) -> None:
+        """Test that CFR+ reaches the equilibrium game value"""
+        solver = KuhnCFR(plus=True)
+        reports = solver.train(2000, report_every=1000)
+        self.assertEqual([report["iteration"] for report in reports], [1000, 2000])
+        self.assertLess(reports[-1]["exploitability"], 1e-3)
+        self.assertAlmostEqual(solver.game_value(), GAME_VALUE, places=3)
+
+    def test_vanilla_cfr_improves(self) -> None:
+        """Test that vanilla CFR gets less exploitable with more iterations"""
+        solver = KuhnCFR()
+        reports = solver.train(1000, report_every=100)
+        self.assertLess(reports[-1]["exploitability"], reports[0]["exploitability"])
+        self.assertLess(reports[-1]["exploitability"], 0.02)
+
+    def test_chance_sampling_improves(self) -> None:
+        """Test that chance-sampling CFR converges as well"""
+        solver = KuhnCFR(sampling=True, seed=0)
+        uniform = solver.exploitability()
+        solver.train(5000)
+        self.assertLess(solver.exploitability(), uniform / 10)
+
+    def test_equilibrium_strategy(self) -> None:
+        """Test known equilibrium facts: the king always calls a bet and the jack never does"""
+        solver = KuhnCFR(plus=True)
+        solver.train(2000)
+        strategy = solver.average_strategy()
+        self.assertGreater(strategy[infoset_id(2, "b"), BET], 0.99)
+        self.assertGreater(strategy[infoset_id(0, "b"), PASS], 0.99)
+
+class TestBestResponse(unittest.TestCase):
+    def test_always_bet_is_exploitable(self) -> None:
+        """Test that a best response beats a strategy that always bets"""
+        strategy = np.zeros((NUM_INFOSETS, NUM_ACTIONS))
+        strategy[:, BET] = 1.0
+        self.assertGreater(best_response_value(strategy, 1), 0.0)
+        self.assertGreater(KuhnCFR().exploitability(strategy), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import contextlib
+import io
+import tempfile
+import unittest
+from rules import ANTE, MAX_RAISES, ROUND_LIMITS
+from solvers.mccfr import (CALL, FOLD, NUM_ACTIONS, RAISE, RegretStore, RhodeIslandMCCFR,
+                           append_action, append_card, infoset_key, legal_actions, main)
+
+class TestBettingRules(unittest.TestCase):
+    def test_legal_actions(self) -> None:
+        """Test the actions offered with and without a bet to call"""
+        self.assertEqual(legal_actions(facing_bet=False, raises=0), (CALL, RAISE))
+        self.assertEqual(legal_actions(facing_bet=True, raises=1), (FOLD, CALL, RAISE))
+        self.assertEqual(legal_actions(facing_bet=True, raises=MAX_RAISES), (FOLD, CALL))
+
+    def test_infoset_keys_are_distinct(self) -> None:
+        """Test that different histories and hole cards give different keys"""
+        checked = append_action(1, CALL)
+        raised = append_action(1, RAISE)
+        keys = {infoset_key(public, hole) for public in (1, checked, raised, append_card(checked, 0)) for hole in range(52)}
+        self.assertEqual(len(keys), 4 * 52)
+
+    def test_round_transitions(self) -> None:
+        """Test that check-check and raise-call close a round and a fold ends the hand"""
+        solver = RhodeIslandMCCFR(seed=0)
+        cards = [0, 1, 2, 3]
+        node = (1, 0, [ANTE, ANTE], 0, 0, 0)
+        after_check = solver._after(cards, *node, CALL)
+        self.assertEqual(after_check[3], 1)
+        flop = solver._after(cards, *after_check, CALL)
+        self.assertEqual(flop[1], 1)
+        self.assertEqual(flop[3], 0)
+        after_raise = solver._after(cards, *node, RAISE)
+        self.assertEqual(after_raise[2], [ANTE + ROUND_LIMITS[0], ANTE])
+        # Player 1 folds and loses only the ante
+        self.assertEqual(solver._after(cards, *after_raise, FOLD), ANTE)
+        called = solver._after(cards, *after_raise, CALL)
+        self.assertEqual(called[2], [ANTE + ROUND_LIMITS[0]] * 2)
+        self.assertEqual(called[1], 1)
+
+class TestRegretStore(unittest.TestCase):
+    def test_rows_grow(self) -> None:
+        """Test that the store grows past its initial capacity"""
+        store = RegretStore(capacity=2)
+        rows = [store.row(key) for key in (10, 20, 30, 10)]
+        self.assertEqual(rows, [0, 1, 2, 0])
+        self.assertEqual(len(store), 3)
+        self.assertGreaterEqual(len(store.regrets), 3)
+        self.assertEqual(store.regrets.shape[1], NUM_ACTIONS)
+
+    def test_average_strategy_defaults_to_uniform(self) -> None:
+        """Test the strategy of an unseen information set"""
+        self.assertEqual(RegretStore().average_strategy(123, (CALL, RAISE)), [0.5, 0.5])
+
+class TestRhodeIslandMCCFR(unittest.TestCase):
+    def test_external_sampling(self) -> None:
+        """Test that external sampling visits information sets and reports speed and memory"""
+        solver = RhodeIslandMCCFR(method="external", seed=1)
+        reports = solver.train(50, report_every=25)
+        self.assertEqual([report["iteration"] for report in reports], [25, 50])
+        self.assertGreater(reports[-1]["infosets"], reports[0]["infosets"])
+        self.assertGreater(reports[-1]["bytes_per_infoset"], 0)
+        self.assertGreater(reports[-1]["iterations_per_second"], 0)
+
+    def test_outcome_sampling(self) -> None:
+        """Test that outcome sampling updates the strategy sums"""
+        solver = RhodeIslandMCCFR(method="outcome", seed=1)
+        solver.train(200)
+        self.assertGreater(len(solver.store), 0)
+        self.assertGreater(solver.store.strategy_sum[:len(solver.store)].sum(), 0)
+
+    def test_invalid_method(self) -> None:
+        with self.assertRaises(ValueError):
+            RhodeIslandMCCFR(method="full")
+
+    def test_checkpoint_round_trip(self) -> None:
+        """Test that training resumes from a checkpoint with the same tables"""
+        solver = RhodeIslandMCCFR(method="external", seed=2)
+        solver.train(20)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checkpoint.npz")
+            solver.save(path)
+            resumed = RhodeIslandMCCFR.load(path)
+        size = len(solver.store)
+        self.assertEqual(resumed.iteration, 20)
+        self.assertEqual(resumed.method, "external")
+        self.assertEqual(resumed.store.index, solver.store.index)
+        self.assertTrue((resumed.store.regrets[:size] == solver.store.regrets[:size]).all())
+        resumed.train(5)
+        self.assertEqual(resumed.iteration, 25)
+
+    def test_command_line_resume(self) -> None:
+        """Test that --resume continues from the exact --checkpoint path written, with no suffix added"""
+        with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+            path = os.path.join(directory, "run")
+            main(["--iterations", "10", "--report-every", "10", "--seed", "1", "--checkpoint", path,
+                  "--checkpoint-every", "5"])
+            self.assertEqual(os.listdir(directory), ["run"])
+            main(["--iterations", "5", "--report-every", "5", "--checkpoint", path, "--resume"])
+            self.assertEqual(RhodeIslandMCCFR.load(path).iteration, 15)
+            with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+                main(["--resume"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import unittest
+from parallel import ACTIONS, SimulationStats, play_batch, run_parallel
+
+class TestPlayBatch(unittest.TestCase):
+    def test_batch_is_reproducible(self) -> None:
+        """Test that a batch replays identically from its seed"""
+        first = play_batch(seed=1, batch_index=4, num_hands=50)
+        second = play_batch(seed=1, batch_index=4, num_hands=50)
+        self.assertEqual(first.stack_deltas, second.stack_deltas)
+        self.assertEqual(first.actions, second.actions)
+
+    def test_batch_totals(self) -> None:
+        """Test the totals of a single batch"""
+        stats = play_batch(seed=0, batch_index=0, num_hands=100)
+        self.assertEqual(stats.hands, 100)
+        # Chips only move between players, apart from odd chips lost on split pots
+        self.assertLessEqual(abs(sum(stats.stack_deltas)), stats.hands)
+        self.assertGreaterEqual(sum(stats.wins), 100)
+        for player_ID in range(2):
+            self.assertAlmostEqual(sum(stats.action_frequencies(player_ID).values()), 1.0)
+
+class TestRunParallel(unittest.TestCase):
+    def test_independent_of_worker_count(self) -> None:
+        """Test that the merged results do not depend on the number of workers"""
+        serial = run_parallel(num_hands=250, workers=1, seed=9, batch_size=100)
+        parallel = run_parallel(num_hands=250, workers=2, seed=9, batch_size=100)
+        self.assertEqual(serial.hands, 250)
+        self.assertEqual(serial.stack_deltas, parallel.stack_deltas)
+        self.assertEqual(serial.wins, parallel.wins)
+        self.assertEqual(serial.actions, parallel.actions)
+
+    def test_seed_changes_results(self) -> None:
+        """Test that different master seeds play different hands"""
+        first = run_parallel(num_hands=200, workers=1, seed=1)
+        second = run_parallel(num_hands=200, workers=1, seed=2)
+        self.assertNotEqual(first.actions, second.actions)
+
+class TestSimulationStats(unittest.TestCase):
+    def test_merge(self) -> None:
+        """Test that merging sums every total"""
+        first = SimulationStats()
+        first.hands, first.stack_deltas, first.wins = 2, [3, -3], [1, 1]
+        first.actions["raise", 0] = 2
+        second = SimulationStats()
+        second.hands, second.stack_deltas, second.wins = 1, [-1, 1], [0, 1]
+        second.actions["raise", 0] = 1
+        first.merge(second)
+        self.assertEqual(first.hands, 3)
+        self.assertEqual(first.stack_deltas, [2, -2])
+        self.assertEqual(first.win_rates(), [1 / 3, 2 / 3])
+        self.assertEqual(first.action_frequencies(0), {action: 1.0 if action == "raise" else 0.0 for action in ACTIONS})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import unittest
+import numpy as np
+from cardecky import Deck
+from events import BufferedSink
+from game import Dealer, Game, Player, Pot
+from run import play_round
+from seeding import PokerRNG, hand_seed, shuffle_batch, stream
+
+def play_hand(rng) -> list:
+    """Play one heads-up hand with every random draw taken from rng, returning its events"""
+    pot = Pot()
+    dealer = Dealer(pot=pot, deck=Deck(), button=1)
+    players = [Player(player_ID=i, stack=200, hand=[], status=True, chips_in_play=0) for i in range(2)]
+    sink = BufferedSink()
+    game = Game(players=players, dealer=dealer, betting_limit=2, sink=sink)
+    game.reseed(rng)
+    play_round(players, dealer, pot, game, button=1)
+    return sink.lines()
+
+class TestStreams(unittest.TestCase):
+    def test_streams_are_addressed_by_key(self) -> None:
+        """Test that a stream only depends on the seed and its key"""
+        first = np.random.default_rng(stream(7, 3)).random(4)
+        np.testing.assert_array_equal(first, np.random.default_rng(stream(7, 3)).random(4))
+        self.assertFalse(np.array_equal(first, np.random.default_rng(stream(7, 4)).random(4)))
+        self.assertFalse(np.array_equal(first, np.random.default_rng(stream(8, 3)).random(4)))
+
+    def test_hand_seeds(self) -> None:
+        seeds = {hand_seed(1, hand, table) for hand in range(100) for table in range(3)}
+        self.assertEqual(len(seeds), 300)
+        self.assertEqual(hand_seed(1, 5, 2), hand_seed(1, 5, 2))
+        self.assertLess(max(seeds), 1 << 64)
+
+    def test_hand_replays_from_seed(self) -> None:
+        """Test that a hand's seed alone replays it"""
+        seed = hand_seed(42, 17)
+        self.assertEqual(play_hand(PokerRNG(seed)), play_hand(PokerRNG(seed)))
+        self.assertNotEqual(play_hand(PokerRNG(seed)), play_hand(PokerRNG(hand_seed(42, 18))))
+
+class TestPokerRNG(unittest.TestCase):
+    def test_choice_and_shuffle(self) -> None:
+        rng = PokerRNG(0)
+        picks = [rng.choice("abc") for _ in range(3000)]
+        for letter in "abc":
+            self.assertAlmostEqual(picks.count(letter) / 3000, 1 / 3, delta=0.05)
+        cards = list(range(52))
+        rng.shuffle(cards)
+        self.assertEqual(sorted(cards), list(range(52)))
+        self.assertNotEqual(cards, list(range(52)))
+
+    def test_spawn_independent(self) -> None:
+        """Test that spawned streams differ from each other but not between runs"""
+        children = PokerRNG(5).spawn(2)
+        again = PokerRNG(5).spawn(2)
+        draws = [[child.random() for _ in range(3)] for child in children]
+        self.assertNotEqual(draws[0], draws[1])
+        self.assertEqual(draws[1], [again[1].random() for _ in range(3)])
+
+class TestShuffleBatch(unittest.TestCase):
+    def test_rows_are_permutations(self) -> None:
+        decks = shuffle_batch(np.random.default_rng(0), 100)
+        self.assertEqual(decks.shape, (100, 52))
+        self.assertTrue((np.sort(decks, axis=1) == np.arange(52)).all())
+        # Short deals take the partial Fisher-Yates path
+        short = np.sort(shuffle_batch(np.random.default_rng(0), 1000, num_cards=4), axis=1)
+        self.assertTrue((np.diff(short, axis=1) > 0).all())
+
+    def test_uniform_positions(self) -> None:
+        """Test that every card is equally likely in each dealt position"""
+        decks = shuffle_batch(np.random.default_rng(1), 52_000, num_cards=4)
+        self.assertEqual(decks.shape, (52_000, 4))
+        for position in range(4):
+            counts = np.bincount(decks[:, position], minlength=52)
+            # Chi-square with 51 degrees of freedom, far beyond its 99.9th percentile of about 90
+            self.assertLess(((counts - 1000) ** 2 / 1000).sum(), 110)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import random
+import unittest
+from unittest.mock import patch
+from betting import CHECK, FOLD, RAISE
+from cardecky import Deck
+from evaluator import LookupHandRanker
+from events import NullSink
+from game import Dealer, Game, Player, Pot
+from handstate import HandState
+from rules import START_STACK
+import run
+from run import play_round, rebuy
+from solvers.subgame import SubgameAgent, SubgameCFR, SubgameSolver
+
+# Hero (seat 0) holds a two, the board is a king and a queen of different suits
+HERO, VILLAIN, FLOP, TURN = 3, 50, 44, 41
+
+def facing_turn_raise(hero: int = HERO) -> HandState:
+    """Heads-up, checked to the turn, where seat 1 raises into seat 0"""
+    rest = [card for card in range(52) if card not in (hero, VILLAIN, FLOP, TURN)]
+    state = HandState([hero, VILLAIN, FLOP, TURN] + rest, [50, 50], button=1, max_raises=3)
+    for action in (CHECK, CHECK, CHECK, CHECK, CHECK, RAISE):
+        state.apply(action)
+    return state
+
+class TestSubgameCFR(unittest.TestCase):
+    def test_folds_to_a_range_that_always_wins(self) -> None:
+        """Test that hero folds high card against a range of only better hands"""
+        mine = LookupHandRanker.strength_from_ids(HERO, FLOP, TURN)
+        weights = [float(card not in (HERO, FLOP, TURN)
+                         and LookupHandRanker.strength_from_ids(card, FLOP, TURN) > mine) for card in range(52)]
+        cfr = SubgameCFR(facing_turn_raise(), ranges={1: weights}, seed=0)
+        cfr.run(iterations=300)
+        self.assertGreater(cfr.strategy()[FOLD], 0.9)
+
+    def test_never_folds_the_nuts(self) -> None:
+        """Test that hero holding the ace-high straight keeps playing against a uniform range"""
+        cfr = SubgameCFR(facing_turn_raise(hero=48), seed=0)
+        cfr.run(iterations=300)
+        strategy = cfr.strategy()
+        self.assertLess(strategy[FOLD], 0.05)
+        self.assertAlmostEqual(sum(strategy), 1.0)
+
+    def test_range_on_dealt_cards_falls_back_to_unseen(self) -> None:
+        """Test that a range with all its weight on the hero's card still deals the villain a card"""
+        weights = [float(card == HERO) for card in range(52)]
+        cfr = SubgameCFR(facing_turn_raise(), ranges={1: weights}, seed=0, focus=1.0)
+        self.assertEqual(cfr.run(iterations=200), 200)
+        self.assertAlmostEqual(sum(cfr.strategy()), 1.0)
+
+    def test_does_not_change_the_state(self) -> None:
+        state = facing_turn_raise()
+        before = state.snapshot()
+        cfr = SubgameCFR(state, seed=1, depth=1)
+        cfr.run(iterations=20)
+        self.assertEqual(state.snapshot(), before)
+        self.assertEqual(cfr.state.snapshot(), before)
+
+    def test_uniform_before_any_iteration(self) -> None:
+        cfr = SubgameCFR(facing_turn_raise(), seed=0)
+        self.assertEqual(cfr.strategy(), [1 / 3, 0.0, 1 / 3, 1 / 3])
+
+    def test_rejects_finished_hand(self) -> None:
+        state = facing_turn_raise()
+        state.apply(FOLD)
+        with self.assertRaises(ValueError):
+            SubgameCFR(state)
+
+class TestSubgameSolver(unittest.TestCase):
+    def test_answers_within_latency(self) -> None:
+        state = HandState(random.Random(0).sample(range(52), 52), [200, 200, 200], button=1, max_raises=3)
+        with SubgameSolver(latency=0.05, workers=1, seed=0) as solver:
+            result = solver.solve(state)
+        self.assertGreater(result["iterations"], 0)
+        self.assertLess(result["seconds"], 0.5)
+        self.assertAlmostEqual(sum(result["strategy"]), 1.0)
+        self.assertEqual(result["strategy"][FOLD], 0.0)
+
+    def test_merges_worker_processes(self) -> None:
+        with SubgameSolver(latency=0.1, workers=2, seed=0) as solver:
+            result = solver.solve(facing_turn_raise(hero=48))
+        self.assertGreater(result["iterations"], 0)
+        self.assertAlmostEqual(sum(result["strategy"]), 1.0)
+
+    def test_agent_plays_a_game(self) -> None:
+        """Test that the agent only takes legal actions in a live game"""
+        players = [Player(player_ID=i, stack=50, hand=[], status=True, chips_in_play=0) for i in range(2)]
+        dealer = Dealer(pot=Pot(), deck=Deck(rng=random.Random(0)))
+        decisions = []
+
+        class RecordingAgent(SubgameAgent):
+            def act(self, states):
+                actions = super().act(states)
+                decisions.extend(action in state.legal_actions for state, action in zip(states, actions))
+                return actions
+        with SubgameSolver(latency=0.01, workers=1, seed=0) as solver:
+            agent = RecordingAgent(solver, seed=0)
+            game = Game(players=players, dealer=dealer, betting_limit=2, sink=NullSink(), rng=random.Random(1),
+                        agents={0: agent})
+            agent.game = game
+            rebuys = 0
+            for _ in range(5):
+                rebuys += len(rebuy(players))
+                play_round(players, dealer, dealer.pot, game, dealer.button)
+        self.assertTrue(decisions)
+        self.assertTrue(all(decisions))
+        self.assertEqual(sum(player.stack for player in players), 100 + START_STACK * rebuys)
+
+    def test_run_closes_the_solver_when_a_hand_fails(self) -> None:
+        close = SubgameSolver.close
+        with patch.object(SubgameSolver, "close", autospec=True, side_effect=close) as closed, \
+                patch("run.play_round", side_effect=RuntimeError("hand failed")):
+            with self.assertRaises(RuntimeError):
+                run.main(["--rounds", "2", "--subgame", "5", "--workers", "1", "--sink", "null", "--no-progress"])
+        closed.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import unittest
+import numpy as np
+from game import PlayerAction
+from rules import ANTE, PRE_FLOP_LIMIT
+from solvers.tree import CHANCE, FOLDED, SHOWDOWN, GameTree, kuhn_tree, rhode_island_tree
+
+class TestKuhnTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tree = kuhn_tree()
+
+    def test_size(self) -> None:
+        """Test the Kuhn tree has 4 decision and 5 terminal nodes"""
+        self.assertEqual(self.tree.num_nodes, 9)
+        self.assertEqual(len(self.tree.decision_nodes()), 4)
+        self.assertEqual(self.tree.infoset_count(deck_size=3), 12)
+
+    def test_bet_fold(self) -> None:
+        """Test that a bet followed by a fold ends the hand with the bettor ahead"""
+        bet = [child for child in self.tree.children(0) if self.tree.action[child] == PlayerAction.RAISE.value][0]
+        self.assertEqual(self.tree.player[bet], 1)
+        fold = [child for child in self.tree.children(bet) if self.tree.action[child] == PlayerAction.FOLD.value][0]
+        self.assertEqual(self.tree.player[fold], FOLDED)
+        self.assertEqual(self.tree.contributions[fold].tolist(), [2, 1])
+        self.assertEqual(self.tree.active[fold], 0b01)
+
+class TestRhodeIslandTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tree = rhode_island_tree()
+
+    def test_layout(self) -> None:
+        """Test that children are contiguous and point back at their parent"""
+        for node in range(self.tree.num_nodes):
+            for child in self.tree.children(node):
+                self.assertEqual(self.tree.parent[child], node)
+                self.assertGreater(child, node)
+        self.assertEqual(int(self.tree.num_children.sum()), self.tree.num_nodes - 1)
+        np.testing.assert_array_equal(self.tree.pot, self.tree.contributions.sum(axis=1))
+
+    def test_node_kinds(self) -> None:
+        """Test that terminals have no children and chance nodes have one"""
+        terminal = np.isin(self.tree.player, (FOLDED, SHOWDOWN))
+        self.assertTrue((self.tree.num_children[terminal] == 0).all())
+        self.assertTrue((self.tree.num_children[self.tree.player == CHANCE] == 1).all())
+        showdowns = self.tree.player == SHOWDOWN
+        contributions = self.tree.contributions[showdowns]
+        self.assertTrue((contributions[:, 0] == contributions[:, 1]).all())
+        self.assertTrue((self.tree.round[showdowns] == 2).all())
+
+    def test_check_check_deals_the_flop(self) -> None:
+        """Test that two checks end the pre-flop round"""
+        check = self.tree.children(0)[0]
+        self.assertEqual(self.tree.action[check], PlayerAction.CHECK.value)
+        check_back = self.tree.children(check)[0]
+        self.assertEqual(self.tree.player[check_back], CHANCE)
+        self.assertEqual(self.tree.round[check_back], 1)
+        self.assertEqual(self.tree.pot[check_back], 2 * ANTE)
+
+    def test_raise_cap(self) -> None:
+        """Test that no betting round has more raises than the cap"""
+        tree = GameTree.build(max_raises=1)
+        raise_node = tree.children(0)[-1]
+        self.assertEqual(tree.contributions[raise_node].tolist(), [ANTE + PRE_FLOP_LIMIT, ANTE])
+        actions = [tree.action[child] for child in tree.children(raise_node)]
+        self.assertEqual(actions, [PlayerAction.FOLD.value, PlayerAction.CALL.value])
+        self.assertLess(tree.num_nodes, self.tree.num_nodes)
+
+    def test_report(self) -> None:
+        """Test the infoset count and memory report"""
+        self.assertGreater(self.tree.infoset_count(), len(self.tree.decision_nodes()) * 52)
+        self.assertGreater(self.tree.memory_bytes(), 0)
+        self.assertIn("Nodes:", self.tree.summary())
+
+class TestMultiwayTree(unittest.TestCase):
+    def test_three_players(self) -> None:
+        """Test that a three-handed tree uses the start offsets and handles folds"""
+        tree = GameTree.build(num_players=3)
+        self.assertEqual(tree.player[0], (2 + 3) % 3)
+        self.assertEqual(tree.contributions.shape[1], 3)
+        folded = tree.player == FOLDED
+        self.assertTrue(all(bin(mask).count("1") == 1 for mask in tree.active[folded]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'poker')))
+import random
+import unittest
+import numpy as np
+from agents import RandomAgent, TabularAgent
+from cardecky import CARDS, Deck
+from events import NullSink
+from game import Dealer, Game, Player, PlayerAction, Pot
+from run import play_round, rebuy
+from solvers.mccfr import RAISE, RegretStore, infoset_key
+from vector_env import VectorEnv
+
+class ScriptedAgent(RandomAgent):
+    """Pick the k-th legal action, with k drawn from a shared stream."""
+    def __init__(self, stream) -> None:
+        super().__init__()
+        self.stream = stream
+
+    def act(self, states):
+        return [state.legal_actions[next(self.stream) % len(state.legal_actions)] for state in states]
+
+class FixedOrder:
+    """Stand-in for a random module whose shuffle deals a given order."""
+    def __init__(self) -> None:
+        self.order = list(range(52))
+
+    def shuffle(self, deck) -> None:
+        deck[:] = [CARDS[i] for i in self.order]
+
+class TestVectorEnv(unittest.TestCase):
+    def play_both(self, num_players: int, num_hands: int, seed: int) -> None:
+        """Play the same cards and choices through Game and VectorEnv and compare stacks"""
+        rng = random.Random(seed)
+        choices = [rng.randrange(12) for _ in range(num_hands * 200)]
+        env = VectorEnv(num_tables=1, num_players=num_players, seed=seed, button=1)
+
+        order = FixedOrder()
+        pot = Pot()
+        dealer = Dealer(pot=pot, deck=Deck(rng=order), button=1)
+        players = [Player(player_ID=i, stack=200, hand=[], status=True, chips_in_play=0) for i in range(num_players)]
+        stream = iter(choices)
+        agent = ScriptedAgent(stream)
+        game = Game(players=players, dealer=dealer, betting_limit=2, sink=NullSink(),
+                    agents={i: agent for i in range(num_players)})
+
+        env_stream = iter(choices)
+        for _ in range(num_hands):
+            deal = rng.sample(range(52), num_players + 2)
+            order.order = deal + [card for card in range(52) if card not in deal]
+            rebuy(players)
+            play_round(players, dealer, pot, game, button=1)
+
+            env.reset(deals=np.array([deal]))
+            ended = np.zeros(1, dtype=bool)
+            while not ended[0]:
+                legal = np.flatnonzero(env.legal_actions()[0])
+                ended = env.step(np.array([legal[next(env_stream) % len(legal)]]))
+            self.assertEqual(env.stacks[0].tolist(), [player.stack for player in players])
+            self.assertEqual(int(env.pot[0]), pot.total)
+
+    def test_matches_game_heads_up(self) -> None:
+        self.play_both(num_players=2, num_hands=300, seed=1)
+
+    def test_matches_game_three_players(self) -> None:
+        self.play_both(num_players=3, num_hands=300, seed=2)
+
+    def test_step_rejects_illegal_action(self) -> None:
+        env = VectorEnv(num_tables=2, seed=0)
+        env.reset()
+        with self.assertRaises(ValueError):
+            env.step(np.array([0, 0]))  # fold with nothing to call
+
+    def test_play_totals(self) -> None:
+        """Test that chips only move between seats and every hand is counted"""
+        env = VectorEnv(num_tables=64, seed=3)
+        totals = env.play(1000)
+        self.assertEqual(totals["hands"], 1000)
+        self.assertLessEqual(abs(sum(totals["payoffs"])), 1000)
+        self.assertTrue(env.done.all())
+
+    def test_play_with_agent(self) -> None:
+        """Test that agents are asked for their seat's decisions in batches"""
+        store = RegretStore()
+        for card in range(52):
+            store.strategy_sum[store.row(infoset_key(1, card)), RAISE] = 1.0
+        env = VectorEnv(num_tables=16, seed=4)
+        env.reset()
+        states = env.states()
+        self.assertTrue((states.player == 0).all())
+        actions = TabularAgent.from_store(store, seed=0).act_batch(states)
+        self.assertTrue((actions == PlayerAction.RAISE.value - 1).all())
+        self.assertEqual(env.play(200, agents={0: TabularAgent.from_store(store)})["hands"], 200)
+
+if __name__ == '__main__':
+    unittest.main()